@@ -1,12 +1,33 @@
 from django.contrib import admin
+
+from qcs.search import SearchAdminMixin
+from . import catalogue
 from .models import Product, Supplier, Package
 
 
-class ProductAdmin(admin.ModelAdmin):
+@admin.register(Product)
+class ProductAdmin(SearchAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'product_type', 'package')
     list_filter = ('product_type', 'supplier')
+    list_select_related = ('package',)
+    search_fields = ('name', 'code', 'product_id')
+    autocomplete_fields = ('supplier',)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'package':
+            # Render cached package choices instead of querying packages
+            formfield.choices = [
+                ('', formfield.empty_label), *catalogue.package_choices()
+            ]
+        return formfield
+
+
+@admin.register(Supplier)
+class SupplierAdmin(SearchAdminMixin, admin.ModelAdmin):
+    search_fields = ('name', 'country', 'city')
 
 
-admin.site.register(Product, ProductAdmin)
-admin.site.register(Supplier)
 admin.site.register(Package)
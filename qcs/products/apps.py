@@ -5,3 +5,23 @@ class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
     # verbose_name = 'products management'
+
+    def ready(self):
+        from django.urls import reverse
+
+        from qcs import search
+        from . import signals  # noqa: F401
+        from .models import Product, Supplier
+
+        search.register(
+            'supplier', 1, Supplier, ['name', 'country', 'city'],
+            url=lambda supplier: (
+                f"{reverse('products:index')}?supplier={supplier.pk}"
+            )
+        )
+        search.register(
+            'product', 2, Product, ['product_id', 'code', 'name'],
+            url=lambda product: reverse(
+                'products:product_detail', args=[product.pk]
+            )
+        )
@@ -0,0 +1,116 @@
+"""
+Cached catalogue lookups.
+
+Suppliers, packages and products change rarely but are looked up and
+listed in choice fields on almost every page. Products by primary key,
+with their supplier and package, and rendered (pk, str(obj)) choice lists
+are kept in the default cache and dropped by post_save/post_delete signal
+handlers (products.signals) of the changed object only: its own entry and
+the choice list of its model. A changed supplier or package also drops
+the products embedding it.
+
+Hits and misses are counted per lookup in the current process, stats()
+returns them for monitoring.
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Package, Product, Supplier
+
+KEY_PREFIX = 'qcs:catalogue:'
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(lookup, hit):
+    with _counters_lock:
+        _counters[lookup, hit] += 1
+
+
+def stats():
+    """Return {lookup: {'hits', 'misses', 'hit_ratio'}} of this process."""
+    with _counters_lock:
+        counters = dict(_counters)
+    result = {}
+    for lookup in sorted({lookup for lookup, _ in counters}):
+        hits = counters.get((lookup, True), 0)
+        misses = counters.get((lookup, False), 0)
+        result[lookup] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses),
+        }
+    return result
+
+
+def reset_stats():
+    """Reset hit and miss counters."""
+    with _counters_lock:
+        _counters.clear()
+
+
+def _cached(lookup, key, build):
+    """Return cached value of key, build and store it on miss."""
+    value = cache.get(key)
+    if value is not None:
+        _count(lookup, True)
+        return value
+    _count(lookup, False)
+    value = build()
+    if value is not None:
+        cache.set(key, value, settings.CATALOGUE_CACHE_TIMEOUT)
+    return value
+
+
+def _object_key(model, pk):
+    return f'{KEY_PREFIX}{model._meta.model_name}:{pk}'
+
+
+def _choices_key(model):
+    return f'{KEY_PREFIX}{model._meta.model_name}:choices'
+
+
+def _choices(model):
+    """Return [(pk, str(obj))] of all model objects in default ordering."""
+    return _cached(
+        f'{model._meta.model_name}_choices',
+        _choices_key(model),
+        lambda: [(obj.pk, str(obj)) for obj in model.objects.all()]
+    )
+
+
+def get_product(pk):
+    """Return Product with supplier and package by primary key or None."""
+    return _cached(
+        'product',
+        _object_key(Product, pk),
+        lambda: Product.objects.select_related(
+            'supplier', 'package'
+        ).filter(pk=pk).first()
+    )
+
+
+def supplier_choices():
+    """Return [(pk, str(supplier))] choices of all suppliers."""
+    return _choices(Supplier)
+
+
+def package_choices():
+    """Return [(pk, str(package))] choices of all packages."""
+    return _choices(Package)
+
+
+def invalidate(model, pk):
+    """Drop cached entries depending on changed model instance."""
+    invalidate_many(model, [pk])
+
+
+def invalidate_many(model, pks):
+    """Drop cached entries of model instances changed by bulk operation."""
+    cache.delete_many(
+        [*[_object_key(model, pk) for pk in pks], _choices_key(model)]
+    )
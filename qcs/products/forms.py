@@ -0,0 +1,49 @@
+from django import forms
+
+from . import catalogue
+from .models import Product
+
+
+class ProductFilterForm(forms.Form):
+    """
+    Product list filter form.
+
+    Invalid values are ignored, filter() applies valid ones only.
+    """
+
+    # Form field -> queryset lookup
+    LOOKUPS = {
+        'formula': 'formula',
+        'product_type': 'product_type',
+        'supplier': 'supplier',
+    }
+
+    formula = forms.ChoiceField(
+        label='Formula technology',
+        choices=[('', 'All formulas'), *Product.FORMULA_CHOICES],
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        required=False
+    )
+    product_type = forms.ChoiceField(
+        label='Product type',
+        choices=[('', 'All types'), *Product.TYPE_CHOICES],
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        required=False
+    )
+    supplier = forms.TypedChoiceField(
+        label='Supplier',
+        choices=lambda: [('', 'All suppliers'), *catalogue.supplier_choices()],
+        coerce=int,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+        required=False
+    )
+
+    def filter(self, queryset):
+        """Return queryset filtered by valid form values."""
+        self.is_valid()
+        lookups = {
+            lookup: self.cleaned_data[name]
+            for name, lookup in self.LOOKUPS.items()
+            if self.cleaned_data.get(name) not in (None, '')
+        }
+        return queryset.filter(**lookups)
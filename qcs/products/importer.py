@@ -0,0 +1,293 @@
+"""
+Bulk product catalogue import.
+
+Supplier spreadsheets (CSV or XLSX) are streamed row by row, rows are
+validated without touching the database and collected into chunks.
+Suppliers and packages are resolved through lookup maps loaded with one
+query each, missing ones are created once and added to the maps. Each
+chunk is upserted keyed on product_id: existing products are fetched with
+one query, new ones are written with bulk_create() and changed ones with
+bulk_update(), all in one transaction per chunk.
+
+Choice columns accept codes or display labels in any case. Invalid rows
+are reported by spreadsheet line number and skipped. openpyxl is optional,
+XLSX files can not be imported without it.
+"""
+import csv
+import os
+
+from django.conf import settings
+from django.db import transaction
+
+from qcs import search
+from . import catalogue, versions
+from .models import Package, Product, Supplier
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # pragma: no cover
+    load_workbook = None
+
+REQUIRED_COLUMNS = [
+    'product_id', 'code', 'name', 'formula', 'product_type',
+    'supplier', 'supplier_country', 'supplier_city',
+]
+PACKAGE_COLUMNS = ['package_type', 'package_uom', 'package_size']
+
+# Product fields written by import
+PRODUCT_FIELDS = [
+    'code', 'name', 'formula', 'product_type', 'supplier_id', 'package_id'
+]
+
+# Column -> (model, field) limiting its length
+MAX_LENGTHS = {
+    'product_id': (Product, 'product_id'),
+    'code': (Product, 'code'),
+    'name': (Product, 'name'),
+    'supplier': (Supplier, 'name'),
+    'supplier_country': (Supplier, 'country'),
+    'supplier_city': (Supplier, 'city'),
+}
+
+
+class CatalogueImportError(Exception):
+    """Unreadable catalogue file."""
+
+
+def _choice_map(choices):
+    """Return {lower case code or label: code} of choices."""
+    mapping = {}
+    for value, label in choices:
+        mapping[label.lower()] = value
+        mapping[value.lower()] = value
+    return mapping
+
+
+# Choice column -> accepted values
+CHOICES = {
+    'formula': _choice_map(Product.FORMULA_CHOICES),
+    'product_type': _choice_map(Product.TYPE_CHOICES),
+    'package_type': _choice_map(Package.PKG_TYPE_CHOICES),
+    'package_uom': _choice_map(Package.UOM_CHOICES),
+}
+
+
+def _header(row):
+    """Return normalized column names of header row."""
+    return [
+        str(name or '').strip().lower().replace(' ', '_') for name in row
+    ]
+
+
+def _cell(value):
+    """Return cell value as stripped string."""
+    if value is None:
+        return ''
+    # Spreadsheets store numeric ids as floats
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _rows(header, rows):
+    header = _header(header)
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise CatalogueImportError(
+            f"Missing columns: {', '.join(missing)}"
+        )
+    # Header is line 1, blank lines are counted before they are skipped
+    for line, row in enumerate(rows, start=2):
+        values = [_cell(value) for value in row]
+        if any(values):
+            yield line, dict(zip(header, values))
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        yield from _rows(next(reader, []), reader)
+
+
+def _read_xlsx(path):
+    if load_workbook is None:
+        raise CatalogueImportError('XLSX import requires openpyxl')
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        yield from _rows(next(rows, ()), rows)
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    """
+    Yield (line number, row dict) of CSV or XLSX file.
+
+    Blank lines are skipped. Raises CatalogueImportError for unsupported
+    files or missing required columns.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    readers = {'.csv': _read_csv, '.xlsx': _read_xlsx}
+    if extension not in readers:
+        raise CatalogueImportError(
+            f"Unsupported file type '{extension}', use .csv or .xlsx"
+        )
+    yield from readers[extension](path)
+
+
+def clean_row(row):
+    """Return (cleaned values, errors) for one row dict."""
+    cleaned = {}
+    errors = {}
+    for name in REQUIRED_COLUMNS:
+        value = row.get(name, '')
+        if not value:
+            errors[name] = ['This field is required.']
+        else:
+            cleaned[name] = value
+    for name, (model, field) in MAX_LENGTHS.items():
+        max_length = model._meta.get_field(field).max_length
+        if len(cleaned.get(name, '')) > max_length:
+            errors[name] = [
+                f'Ensure this value has at most {max_length} characters '
+                f'(it has {len(cleaned[name])}).'
+            ]
+    package = [row.get(name, '') for name in PACKAGE_COLUMNS]
+    if any(package) and not all(package):
+        for name, value in zip(PACKAGE_COLUMNS, package):
+            if not value:
+                errors[name] = ['Required with other package columns.']
+    for name, choices in CHOICES.items():
+        value = cleaned.get(name, row.get(name, ''))
+        if not value:
+            continue
+        if value.lower() not in choices:
+            errors[name] = [
+                f'Select a valid choice. {value} is not one of the '
+                'available choices.'
+            ]
+        else:
+            cleaned[name] = choices[value.lower()]
+    if all(package):
+        try:
+            size = int(package[2])
+            if size <= 0:
+                raise ValueError
+        except ValueError:
+            errors['package_size'] = ['Enter a positive whole number.']
+        else:
+            cleaned['package_size'] = size
+    return cleaned, errors
+
+
+def _lookup_maps():
+    """Return ({supplier key: pk}, {package key: pk}) in two queries."""
+    suppliers = {}
+    for pk, *key in Supplier.objects.order_by('pk').values_list(
+            'pk', 'name', 'country', 'city'):
+        suppliers.setdefault(tuple(key), pk)
+    packages = {}
+    for pk, *key in Package.objects.order_by('pk').values_list(
+            'pk', 'package_type', 'uom', 'size'):
+        packages.setdefault(tuple(key), pk)
+    return suppliers, packages
+
+
+def _product(cleaned, suppliers, packages):
+    """Return unsaved Product of cleaned row, create missing relations."""
+    supplier_key = (cleaned['supplier'], cleaned['supplier_country'],
+                    cleaned['supplier_city'])
+    if supplier_key not in suppliers:
+        suppliers[supplier_key] = Supplier.objects.create(
+            name=supplier_key[0], country=supplier_key[1],
+            city=supplier_key[2]
+        ).pk
+    package_id = None
+    if 'package_type' in cleaned:
+        package_key = (cleaned['package_type'], cleaned['package_uom'],
+                       cleaned['package_size'])
+        if package_key not in packages:
+            packages[package_key] = Package.objects.create(
+                package_type=package_key[0], uom=package_key[1],
+                size=package_key[2]
+            ).pk
+        package_id = packages[package_key]
+    return Product(
+        product_id=cleaned['product_id'],
+        code=cleaned['code'],
+        name=cleaned['name'],
+        formula=cleaned['formula'],
+        product_type=cleaned['product_type'],
+        supplier_id=suppliers[supplier_key],
+        package_id=package_id
+    )
+
+
+def _upsert(chunk, suppliers, packages):
+    """Store chunk of cleaned rows, return (created, updated pks)."""
+    # Last row of repeated product id wins
+    rows = {cleaned['product_id']: cleaned for cleaned in chunk}
+    existing = Product.objects.in_bulk(list(rows), field_name='product_id')
+    created = []
+    updated = []
+    with transaction.atomic():
+        for product_id, cleaned in rows.items():
+            product = _product(cleaned, suppliers, packages)
+            current = existing.get(product_id)
+            if current is None:
+                created.append(product)
+                continue
+            changed = False
+            for field in PRODUCT_FIELDS:
+                if getattr(current, field) != getattr(product, field):
+                    setattr(current, field, getattr(product, field))
+                    changed = True
+            if changed:
+                updated.append(current)
+        Product.objects.bulk_create(created)
+        Product.objects.bulk_update(updated, PRODUCT_FIELDS)
+    return len(created), [product.pk for product in updated]
+
+
+def import_rows(rows, chunk_size=None):
+    """
+    Validate and upsert (line number, row dict) pairs keyed on product_id.
+
+    Returns dict with numbers of 'rows', 'created', 'updated' and
+    'unchanged' products and 'rejects', the list of invalid rows with
+    their line number and errors. Invalid rows are skipped.
+    """
+    chunk_size = chunk_size or settings.CATALOGUE_IMPORT_CHUNK_SIZE
+    suppliers, packages = _lookup_maps()
+    result = {'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0,
+              'rejects': []}
+    chunk = []
+
+    def flush():
+        created, updated = _upsert(chunk, suppliers, packages)
+        # bulk_create() and bulk_update() send no signals
+        catalogue.invalidate_many(Product, updated)
+        result['created'] += created
+        result['updated'] += len(updated)
+        result['unchanged'] += (
+            len({cleaned['product_id'] for cleaned in chunk})
+            - created - len(updated)
+        )
+        chunk.clear()
+
+    for line, row in rows:
+        result['rows'] += 1
+        cleaned, errors = clean_row(row)
+        if errors:
+            result['rejects'].append({'row': line, 'errors': errors})
+            continue
+        chunk.append(cleaned)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    if result['created'] or result['updated']:
+        versions.bump()
+        search.rebuild(['product'])
+    return result
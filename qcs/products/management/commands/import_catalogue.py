@@ -0,0 +1,64 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products import importer
+
+# Rejected rows printed to output, all are written to --rejects file
+MAX_PRINTED_REJECTS = 20
+
+
+class Command(BaseCommand):
+    help = ('Import products from a CSV or XLSX supplier spreadsheet, '
+            'creating missing suppliers and packages and updating existing '
+            'products by product id.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import')
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Products upserted per transaction'
+        )
+        parser.add_argument(
+            '--rejects', metavar='PATH',
+            help='Write rejected rows with their errors to CSV file'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            result = importer.import_rows(
+                importer.read_rows(options['path']),
+                chunk_size=options['chunk_size']
+            )
+        except (importer.CatalogueImportError, OSError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+        messages = [
+            f"Line {reject['row']}: {field}: {message}"
+            for reject in result['rejects']
+            for field, errors in reject['errors'].items()
+            for message in errors
+        ]
+        for message in messages[:MAX_PRINTED_REJECTS]:
+            self.stderr.write(message)
+        if len(messages) > MAX_PRINTED_REJECTS:
+            self.stderr.write(
+                f'... {len(messages) - MAX_PRINTED_REJECTS} more errors'
+            )
+        if options['rejects']:
+            with open(options['rejects'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'field', 'error'])
+                for reject in result['rejects']:
+                    for field, errors in reject['errors'].items():
+                        for message in errors:
+                            writer.writerow([reject['row'], field, message])
+        rate = result['rows'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} rows imported in {elapsed:.2f} s "
+            f"({rate:.0f} rows/s): {result['created']} created, "
+            f"{result['updated']} updated, {result['unchanged']} unchanged, "
+            f"{len(result['rejects'])} rejected"
+        ))
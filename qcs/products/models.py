@@ -23,6 +23,9 @@ class Supplier(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='supplier_name_idx')
+        ]
         verbose_name = 'supplier'
         verbose_name_plural = 'suppliers'
 
@@ -181,6 +184,10 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='product_name_idx'),
+            models.Index(fields=['code'], name='product_code_idx')
+        ]
         verbose_name = 'product'
         verbose_name_plural = 'products'
 
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import catalogue, versions
+from .models import Package, Product, Supplier
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_save, sender=Package)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Supplier)
+@receiver(post_delete, sender=Package)
+@receiver(post_delete, sender=Product)
+def invalidate_catalogue(sender, instance, **kwargs):
+    """Drop cached lookups of changed object and cached catalogue pages."""
+    catalogue.invalidate(sender, instance.pk)
+    versions.bump()
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_save, sender=Package)
+@receiver(pre_delete, sender=Supplier)
+@receiver(pre_delete, sender=Package)
+def invalidate_dependent_products(sender, instance, created=False,
+                                  **kwargs):
+    """
+    Drop cached products embedding changed supplier or package.
+
+    Deleting a package sets package of its products to NULL without
+    signals, so products are looked up before the delete.
+    """
+    if created:
+        return
+    field = 'supplier' if sender is Supplier else 'package'
+    catalogue.invalidate_many(
+        Product,
+        Product.objects.filter(**{field: instance}).order_by().values_list(
+            'pk', flat=True
+        )
+    )
@@ -0,0 +1,4 @@
+import logging
+
+# Keep sampled request metrics out of test output
+logging.getLogger('qcs.requests').setLevel(logging.WARNING)
@@ -0,0 +1,120 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import catalogue
+from ..models import Package, Product, Supplier
+
+
+class CatalogueCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.packages = [
+            Package.objects.create(package_type='TOTE', uom='KG', size=size)
+            for size in (200, 1000)
+        ]
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier,
+            package=cls.packages[0]
+        )
+
+    def setUp(self):
+        cache.clear()
+        catalogue.reset_stats()
+
+    def test_lookups_are_cached(self):
+        """Test repeated lookups hit cache and are counted."""
+        product = CatalogueCacheTest.product
+        with self.assertNumQueries(2):
+            self.assertEqual(catalogue.get_product(product.pk), product)
+            self.assertEqual(
+                catalogue.package_choices(),
+                [(package.pk, str(package))
+                 for package in CatalogueCacheTest.packages]
+            )
+        with self.assertNumQueries(0):
+            cached = catalogue.get_product(product.pk)
+            self.assertEqual(cached.supplier, CatalogueCacheTest.supplier)
+            self.assertEqual(cached.package, CatalogueCacheTest.packages[0])
+            catalogue.get_product(product.pk)
+            catalogue.package_choices()
+        self.assertIsNone(catalogue.get_product(0))
+        stats = catalogue.stats()
+        self.assertEqual(stats['product'], {
+            'hits': 2, 'misses': 2, 'hit_ratio': 0.5
+        })
+        self.assertEqual(stats['package_choices']['hits'], 1)
+
+    def test_invalidation(self):
+        """Test changes drop entries of changed object only."""
+        package = Package.objects.get(pk=CatalogueCacheTest.packages[1].pk)
+        product = CatalogueCacheTest.product
+        catalogue.get_product(product.pk)
+        catalogue.package_choices()
+        package.size = 500
+        package.save()
+        # Product embeds other package
+        with self.assertNumQueries(0):
+            catalogue.get_product(product.pk)
+        with self.assertNumQueries(1):
+            self.assertIn((package.pk, str(package)),
+                          catalogue.package_choices())
+        product.name = 'renamed base coat'
+        product.save()
+        self.assertEqual(
+            catalogue.get_product(product.pk).name, 'renamed base coat'
+        )
+
+    def test_dependent_products(self):
+        """Test supplier and package changes drop products embedding them."""
+        product = CatalogueCacheTest.product
+        package = Package.objects.get(pk=CatalogueCacheTest.packages[0].pk)
+        catalogue.get_product(product.pk)
+        package.size = 300
+        package.save()
+        self.assertEqual(catalogue.get_product(product.pk).package.size, 300)
+        supplier = Supplier.objects.get(pk=CatalogueCacheTest.supplier.pk)
+        supplier.city = 'Town'
+        supplier.save()
+        self.assertEqual(
+            catalogue.get_product(product.pk).supplier.city, 'Town'
+        )
+        # Deleting package sets product package to NULL without signals
+        package.delete()
+        self.assertIsNone(catalogue.get_product(product.pk).package)
+
+    def test_admin_package_choices(self):
+        """Test product admin renders cached package choices."""
+        user = User.objects.create_superuser('admin', password='password')
+        self.client.force_login(user)
+        url = reverse('admin:products_product_change',
+                      args=[CatalogueCacheTest.product.pk])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertContains(response, str(CatalogueCacheTest.packages[1]))
+        self.assertEqual(catalogue.stats()['package_choices']['misses'], 1)
+        self.assertGreater(catalogue.stats()['package_choices']['hits'], 0)
+
+    def test_stats_view(self):
+        """Test cache stats are exposed to staff only."""
+        url = reverse('products:cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        user = User.objects.create_user('staff', is_staff=True)
+        self.client.force_login(user)
+        catalogue.supplier_choices()
+        response = self.client.get(url)
+        self.assertEqual(
+            response.json()['catalogue']['supplier_choices']['misses'], 1
+        )
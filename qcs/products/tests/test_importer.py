@@ -0,0 +1,174 @@
+import csv
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from qcs import search
+from .. import catalogue, importer
+from ..models import Package, Product, Supplier
+
+HEADER = ['Product ID', 'Code', 'Name', 'Formula', 'Product type',
+          'Supplier', 'Supplier country', 'Supplier city',
+          'Package type', 'Package UOM', 'Package size']
+
+
+class CatalogueImportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.package = Package.objects.create(
+            package_type='TOTE', uom='KG', size=1000
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier,
+            package=cls.package
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, rows, name='catalogue.csv'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(rows)
+        return path
+
+    def test_import(self):
+        """Test rows are upserted by product id with resolved relations."""
+        path = self.write([
+            ['YZR123', '234-2', 'silver base coat', 'WB', 'BC',
+             'Company', 'Country', 'City', 'TOTE', 'KG', '1000'],
+            ['YZR124', '234-3', 'clear coat', 'solventborne', 'clear coat',
+             'Company', 'Country', 'City', '', '', ''],
+            [],
+            ['YZR125', '234-4', 'primer', 'SB', 'PR',
+             'New Company', 'Country', 'Town', 'drum', 'ltr', '200'],
+            ['YZR126', '234-5', 'primer', 'SB', 'PR',
+             'New Company', 'Country', 'Town', 'drum', 'ltr', '200'],
+        ])
+        cache.clear()
+        # Cached product is dropped by import
+        catalogue.get_product(CatalogueImportTest.product.pk)
+        # Supplier and package maps, existing products, new supplier with
+        # its index row, new package, bulk insert and update in savepoint,
+        # product index rebuild
+        with self.assertNumQueries(13):
+            result = importer.import_rows(importer.read_rows(path))
+        self.assertEqual(result, {'rows': 4, 'created': 3, 'updated': 1,
+                                  'unchanged': 0, 'rejects': []})
+        product = catalogue.get_product(CatalogueImportTest.product.pk)
+        self.assertEqual(product.name, 'silver base coat')
+        clear = Product.objects.get(product_id='YZR124')
+        self.assertEqual((clear.formula, clear.product_type, clear.package),
+                         ('SB', 'CC', None))
+        primers = Product.objects.filter(product_id__in=['YZR125', 'YZR126'])
+        self.assertEqual(
+            {(p.supplier.name, p.package.package_type, p.package.uom,
+              p.package.size) for p in primers},
+            {('New Company', 'DRUM', 'LTR', 200)}
+        )
+        self.assertEqual(Supplier.objects.count(), 2)
+        self.assertEqual(Package.objects.count(), 2)
+        self.assertEqual(
+            [str(result.object) for result in search.search('clear coat')],
+            ['clear coat']
+        )
+        # Importing again changes nothing
+        result = importer.import_rows(importer.read_rows(path))
+        self.assertEqual((result['created'], result['updated'],
+                          result['unchanged']), (0, 0, 4))
+
+    def test_rejects(self):
+        """Test invalid rows are reported by line and skipped."""
+        path = self.write([
+            ['YZR200', '1', 'primer', 'XX', 'PR',
+             'Company', 'Country', 'City', '', '', ''],
+            [],
+            ['', '1', 'n' * 101, 'SB', 'PR',
+             'Company', 'Country', 'City', 'TOTE', '', '-5'],
+            ['YZR201', '1', 'primer', 'SB', 'PR',
+             'Company', 'Country', 'City', 'TOTE', 'KG', 'big'],
+            ['YZR202', '1', 'primer', 'SB', 'PR',
+             'Company', 'Country', 'City', '', '', ''],
+        ])
+        result = importer.import_rows(importer.read_rows(path))
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(
+            [(reject['row'], sorted(reject['errors']))
+             for reject in result['rejects']],
+            [(2, ['formula']),
+             (4, ['name', 'package_uom', 'product_id']),
+             (5, ['package_size'])]
+        )
+        self.assertFalse(
+            Product.objects.filter(product_id__in=['YZR200', 'YZR201'])
+        )
+
+    def test_command(self):
+        """Test import_catalogue command reports rows and writes rejects."""
+        path = self.write([
+            ['YZR300', '1', 'primer', 'SB', 'PR',
+             'Company', 'Country', 'City', '', '', ''],
+            ['YZR301', '1', 'primer', 'SB', 'XX',
+             'Company', 'Country', 'City', '', '', ''],
+        ])
+        rejects = os.path.join(self.directory.name, 'rejects.csv')
+        out = StringIO()
+        err = StringIO()
+        call_command('import_catalogue', path, '--chunk-size', '1',
+                     '--rejects', rejects, stdout=out, stderr=err)
+        self.assertIn('2 rows imported', out.getvalue())
+        self.assertIn('1 created, 0 updated, 0 unchanged, 1 rejected',
+                      out.getvalue())
+        self.assertIn('Line 3: product_type:', err.getvalue())
+        with open(rejects) as f:
+            self.assertEqual(len(list(csv.reader(f))), 2)
+        for path in (os.path.join(self.directory.name, 'catalogue.txt'),
+                     os.path.join(self.directory.name, 'missing.csv')):
+            with self.subTest(path=path):
+                with self.assertRaises(CommandError):
+                    call_command('import_catalogue', path, stdout=out)
+
+    def test_missing_columns(self):
+        """Test file without required columns is refused."""
+        path = os.path.join(self.directory.name, 'catalogue.csv')
+        with open(path, 'w') as f:
+            f.write('product_id,name\nYZR400,primer\n')
+        with self.assertRaisesMessage(importer.CatalogueImportError,
+                                      'Missing columns: code, formula'):
+            list(importer.read_rows(path))
+
+    @unittest.skipIf(importer.load_workbook is None,
+                     'openpyxl is not installed')
+    def test_xlsx(self):
+        """Test XLSX rows are imported with numeric cells as text."""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(HEADER)
+        workbook.active.append([1234.0, 77, 'primer', 'SB', 'PR',
+                                'Company', 'Country', 'City'])
+        path = os.path.join(self.directory.name, 'catalogue.xlsx')
+        workbook.save(path)
+        result = importer.import_rows(importer.read_rows(path))
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(Product.objects.get(product_id='1234').code, '77')
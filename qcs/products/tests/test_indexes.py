@@ -0,0 +1,36 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Product, Supplier
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are SQLite specific')
+class QueryPlanTest(TestCase):
+
+    def test_default_ordering_uses_index(self):
+        """Test default list queries are read in index order."""
+        # Prepare test data
+        querysets = {
+            'product_name_idx': Product.objects.all(),
+            'supplier_name_idx': Supplier.objects.all(),
+        }
+        # Run test
+        for index_name, queryset in querysets.items():
+            plan = queryset.explain()
+            with self.subTest(index_name=index_name):
+                self.assertIn(f'USING INDEX {index_name}', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_lookups_use_index(self):
+        """Test product code and supplier name lookups use indexes."""
+        # Prepare test data
+        querysets = {
+            'product_code_idx': Product.objects.filter(code='234-2'),
+            'supplier_name_idx': Supplier.objects.filter(name='Company'),
+        }
+        # Run test
+        for index_name, queryset in querysets.items():
+            with self.subTest(index_name=index_name):
+                self.assertIn(f'USING INDEX {index_name}', queryset.explain())
@@ -282,7 +282,8 @@ class ProductModelTest(TestCase):
         # Prepare test data
         field_names = ['id', 'product_id', 'code', 'name', 'formula',
                        'product_type', 'supplier', 'package']
-        foreign_key_related_names = ['batches', ]
+        foreign_key_related_names = ['batches', 'color_standard',
+                                     'control_charts', 'color_tolerance']
         all_field_names = [*field_names, *foreign_key_related_names]
         # Run test
         self.assertEqual(
@@ -0,0 +1,132 @@
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Package, Product, Supplier
+
+
+class ProductBrowserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.suppliers = [
+            Supplier.objects.create(
+                name=f'Company {index}',
+                country='Country',
+                city='City'
+            )
+            for index in range(2)
+        ]
+        cls.package = Package.objects.create(
+            package_type='TOTE',
+            uom='KG',
+            size=1000
+        )
+        cls.products = [
+            Product.objects.create(
+                product_id=f'YZR12{index}',
+                code='234-2',
+                name=f'product {index}',
+                formula='WB' if index % 2 else 'SB',
+                product_type='BC',
+                supplier=cls.suppliers[index % 2],
+                package=cls.package
+            )
+            for index in range(4)
+        ]
+        cls.url = reverse('products:index')
+        cls.user = User.objects.create_user('reviewer', password='pass')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_product')
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(ProductBrowserTest.user)
+
+    def test_filters(self):
+        """Test product list filters by formula and supplier."""
+        # Filter params -> expected product names
+        cases = [
+            ({}, ['product 0', 'product 1', 'product 2', 'product 3']),
+            ({'formula': 'WB'}, ['product 1', 'product 3']),
+            ({'supplier': ProductBrowserTest.suppliers[0].pk},
+             ['product 0', 'product 2']),
+            ({'formula': 'WB', 'supplier': ProductBrowserTest.suppliers[0].pk},
+             []),
+            ({'formula': 'XX'}, ['product 0', 'product 1', 'product 2',
+                                 'product 3']),
+        ]
+        for params, names in cases:
+            with self.subTest(params=params):
+                response = self.client.get(ProductBrowserTest.url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    [product.name for product in response.context['page']],
+                    names
+                )
+
+    def test_query_budget(self):
+        """Test cached table and conditional requests skip queries."""
+        # Session, user and two permission queries, then supplier
+        # choices, product count and product page
+        with self.assertNumQueries(7):
+            response = self.client.get(ProductBrowserTest.url)
+        self.assertContains(response, 'product 3')
+        # Table fragment and supplier choices are cached
+        with self.assertNumQueries(4):
+            cached = self.client.get(ProductBrowserTest.url)
+        self.assertEqual(cached.content, response.content)
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                ProductBrowserTest.url,
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_invalidates_cache(self):
+        """Test saved product changes ETag and cached table."""
+        response = self.client.get(ProductBrowserTest.url)
+        self.assertIn('Last-Modified', response)
+        product = ProductBrowserTest.products[0]
+        product.name = 'renamed product'
+        product.save()
+        response = self.client.get(
+            ProductBrowserTest.url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'renamed product')
+
+    def test_product_detail(self):
+        """Test product page."""
+        product = ProductBrowserTest.products[1]
+        url = reverse('products:product_detail', args=[product.pk])
+        # Session, user, two permission queries, product and batch count,
+        # empty page needs no row query
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        self.assertContains(response, product.name)
+        self.assertContains(response, 'No batches found')
+        response = self.client.get(
+            reverse('products:product_detail', args=[0])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_permissions(self):
+        """Test pages require login and view product permission."""
+        urls = [
+            ProductBrowserTest.url,
+            reverse('products:product_detail',
+                    args=[ProductBrowserTest.products[0].pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.client.force_login(User.objects.get_or_create(
+                    username='nobody'
+                )[0])
+                self.assertEqual(self.client.get(url).status_code, 403)
+                self.client.logout()
+                self.assertRedirects(
+                    self.client.get(url), f"{reverse('login')}?next={url}"
+                )
@@ -4,6 +4,8 @@ from . import views
 app_name = 'products'
 
 urlpatterns = [
-    path('', views.index, name='index')
-
+    path('', views.index, name='index'),
+    path('cache-stats/', views.cache_stats, name='cache_stats'),
+    path('products/<int:pk>/', views.product_detail, name='product_detail'),
+    path('search/', views.site_search, name='search'),
 ]
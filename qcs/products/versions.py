@@ -0,0 +1,59 @@
+"""
+Catalogue change versions for cached pages.
+
+Saving or deleting a Supplier, Package, Product or Batch bumps the
+catalogue version kept in the default cache. Rendered page fragments are
+cached under the current version and conditional responses use it as
+their ETag and its timestamp as Last-Modified, so a change invalidates
+them all without tracking which pages it affects.
+
+Versions expire after settings.BROWSER_CACHE_TIMEOUT seconds like the
+fragments cached under them. A lost or expired version is replaced with
+a new one, which only costs a cache miss. Processes sharing the database
+should share the cache backend (settings.CACHES) to see each other's
+changes at once. With the default per process local memory cache a
+change is only seen by the process making it; other processes keep
+serving their own version and fragments until it expires, for up to
+settings.BROWSER_CACHE_TIMEOUT seconds.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+CATALOGUE = 'catalogue'
+
+KEY_PREFIX = 'qcs:version:'
+
+
+def get_version(scope=CATALOGUE):
+    """Return (version, last modified datetime) of scope."""
+    key = f'{KEY_PREFIX}{scope}'
+    value = cache.get(key)
+    if value is None:
+        value = (uuid.uuid4().hex, timezone.now().replace(microsecond=0))
+        # Keep version set concurrently by another request
+        if not cache.add(key, value,
+                         timeout=settings.BROWSER_CACHE_TIMEOUT):
+            value = cache.get(key, value)
+    return value
+
+
+def bump(scope=CATALOGUE):
+    """Start new version of scope."""
+    cache.set(
+        f'{KEY_PREFIX}{scope}',
+        (uuid.uuid4().hex, timezone.now().replace(microsecond=0)),
+        timeout=settings.BROWSER_CACHE_TIMEOUT
+    )
+
+
+def etag(request, *args, **kwargs):
+    """ETag of catalogue page for condition() decorator."""
+    return get_version()[0]
+
+
+def last_modified(request, *args, **kwargs):
+    """Last-Modified of catalogue page for condition() decorator."""
+    return get_version()[1]
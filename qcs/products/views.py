@@ -1,9 +1,118 @@
+import os
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required, permission_required
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition, require_GET
+
+from qcs import search
+from . import catalogue, versions
+from .forms import ProductFilterForm
+from .models import Product
+
+
+def lazy_page(request, queryset):
+    """
+    Return paginator page evaluated on first use.
+
+    Tables are rendered inside cached template fragments, a cached table
+    runs no count or row queries at all.
+    """
+    return SimpleLazyObject(
+        lambda: Paginator(queryset, settings.BROWSER_PAGE_SIZE).get_page(
+            request.GET.get('page')
+        )
+    )
+
+
+def page_query(request):
+    """Return query string of request without page number."""
+    params = request.GET.copy()
+    params.pop('page', None)
+    return params.urlencode()
 
 
+@login_required
+@permission_required('products.view_product', raise_exception=True)
+@condition(etag_func=versions.etag, last_modified_func=versions.last_modified)
 def index(request):
-    """Index page."""
+    """Index page, product list."""
     template = 'index.html'
-    context = {}
+    form = ProductFilterForm(request.GET)
+    products = form.filter(
+        Product.objects.select_related('supplier', 'package').annotate(
+            batch_count=Count('batches')
+        ).order_by('name', 'pk')
+    )
+    context = {
+        'form': form,
+        'page': lazy_page(request, products),
+        'query': page_query(request),
+        'version': versions.get_version()[0],
+        'timeout': settings.BROWSER_CACHE_TIMEOUT,
+    }
     return render(request, context=context, template_name=template)
+
+
+@login_required
+@permission_required('products.view_product', raise_exception=True)
+@condition(etag_func=versions.etag, last_modified_func=versions.last_modified)
+def product_detail(request, pk):
+    """Product page with its batches."""
+    template = 'products/product_detail.html'
+    product = catalogue.get_product(pk)
+    if product is None:
+        raise Http404('No product matches the given query.')
+    context = {
+        'product': product,
+        'page': lazy_page(
+            request, product.batches.order_by('-m_date', 'number')
+        ),
+        'version': versions.get_version()[0],
+        'timeout': settings.BROWSER_CACHE_TIMEOUT,
+    }
+    return render(request, context=context, template_name=template)
+
+
+@staff_member_required
+def cache_stats(request):
+    """Catalogue cache hit and miss counters of serving process."""
+    return JsonResponse({'pid': os.getpid(), 'catalogue': catalogue.stats()})
+
+
+@login_required
+@permission_required('quality.view_batch', raise_exception=True)
+@require_GET
+def site_search(request):
+    """Ranked search over suppliers, products and batches (JSON)."""
+    term = request.GET.get('q', '')
+    kinds = request.GET.getlist('kind')
+    unknown = set(kinds) - set(search.KINDS)
+    if unknown:
+        return JsonResponse(
+            {'error': f"Unknown kind '{sorted(unknown)[0]}'"}, status=400
+        )
+    try:
+        limit = int(request.GET.get('limit', settings.SEARCH_RESULTS_LIMIT))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    limit = max(1, min(limit, settings.SEARCH_MAX_RESULTS))
+    results = search.search(term, kinds, limit)
+    return JsonResponse({
+        'query': term,
+        'results': [
+            {
+                'kind': result.kind,
+                'id': result.object.pk,
+                'label': str(result.object),
+                'url': search.KINDS[result.kind].url(result.object),
+                'rank': round(result.rank, 6),
+            }
+            for result in results
+        ],
+    })
@@ -0,0 +1,135 @@
+"""
+Environment driven database configuration.
+
+QCS_DB_ENGINE selects 'sqlite' (default, single node installs) or
+'postgresql'. PostgreSQL settings come from QCS_DB_NAME, QCS_DB_USER,
+QCS_DB_PASSWORD, QCS_DB_HOST and QCS_DB_PORT, its psycopg2 driver is
+pinned in requirements.txt. Connections persist for QCS_DB_CONN_MAX_AGE
+seconds (default 60) and, with QCS_DB_HEALTH_CHECKS enabled (default),
+are checked before they are reused by a new request, so a connection
+dropped by the server fails no request.
+
+Django 3.2 has no connection pool of its own. QCS_DB_POOLER=pgbouncer
+prepares the connection for an external pooler in transaction pooling
+mode, which can not keep server side cursors open between transactions.
+
+SQLite waits up to QCS_SQLITE_TIMEOUT seconds for locks and applies
+settings.SQLITE_PRAGMAS to every new connection. The defaults switch to
+a WAL journal, which lets readers work while a single writer commits,
+with synchronous=NORMAL (safe in WAL mode), a 64 MiB page cache, 256 MiB
+of memory mapped I/O and temporary tables in memory. Each pragma can be
+overridden by QCS_SQLITE_<PRAGMA>, e.g. QCS_SQLITE_CACHE_SIZE.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+
+POOLERS = ['', 'pgbouncer']
+
+
+def _env_int(environ, name, default):
+    try:
+        return int(environ.get(name, default))
+    except ValueError:
+        raise ImproperlyConfigured(f'{name} must be an integer')
+
+
+def _env_bool(environ, name, default):
+    value = environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_settings(base_dir, environ=os.environ):
+    """Return default database settings from environment."""
+    engine = environ.get('QCS_DB_ENGINE', 'sqlite')
+    if engine not in ENGINES:
+        raise ImproperlyConfigured(
+            f"QCS_DB_ENGINE must be one of {', '.join(ENGINES)}"
+        )
+    if engine == 'sqlite':
+        return {
+            'ENGINE': ENGINES[engine],
+            'NAME': environ.get('QCS_DB_NAME', base_dir / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': _env_int(environ, 'QCS_SQLITE_TIMEOUT', 20),
+            },
+        }
+    pooler = environ.get('QCS_DB_POOLER', '')
+    if pooler not in POOLERS:
+        raise ImproperlyConfigured(
+            f"QCS_DB_POOLER must be empty or one of {', '.join(POOLERS[1:])}"
+        )
+    database = {
+        'ENGINE': ENGINES[engine],
+        'NAME': environ.get('QCS_DB_NAME', 'qcs'),
+        'USER': environ.get('QCS_DB_USER', ''),
+        'PASSWORD': environ.get('QCS_DB_PASSWORD', ''),
+        'HOST': environ.get('QCS_DB_HOST', ''),
+        'PORT': environ.get('QCS_DB_PORT', ''),
+        'CONN_MAX_AGE': _env_int(environ, 'QCS_DB_CONN_MAX_AGE', 60),
+        'OPTIONS': {
+            'connect_timeout': _env_int(
+                environ, 'QCS_DB_CONNECT_TIMEOUT', 5
+            ),
+        },
+    }
+    if pooler == 'pgbouncer':
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return database
+
+
+def health_checks(environ=os.environ):
+    """Return True if persistent connections are checked before reuse."""
+    return _env_bool(environ, 'QCS_DB_HEALTH_CHECKS', True)
+
+
+def sqlite_pragmas(environ=os.environ):
+    """Return {pragma: value} applied to new SQLite connections."""
+    defaults = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        # Milliseconds, same wait as the driver timeout
+        'busy_timeout': _env_int(environ, 'QCS_SQLITE_TIMEOUT', 20) * 1000,
+        # Negative size is in KiB
+        'cache_size': -64 * 1024,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+    return {
+        name: environ.get(f'QCS_SQLITE_{name.upper()}', value)
+        for name, value in defaults.items()
+    }
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created handler applying settings.SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    from django.conf import settings
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        # Pragma values can not be bound as query parameters
+        if not (name.isidentifier()
+                and str(value).lstrip('-').isalnum()):
+            raise ImproperlyConfigured(f'Invalid SQLite pragma {name}')
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def check_connections(**kwargs):
+    """request_started handler closing broken persistent connections."""
+    from django.conf import settings
+    from django.db import connections
+    if not settings.DATABASE_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (connection.connection is not None
+                and connection.settings_dict['CONN_MAX_AGE']
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
@@ -0,0 +1,111 @@
+"""
+Per request SQL and latency instrumentation.
+
+RequestMetricsMiddleware times a sampled fraction of requests
+(settings.REQUEST_METRICS_SAMPLE_RATE). It counts and times their SQL
+queries through database execute wrappers. It logs view time, SQL time,
+query count and the slowest statements as one JSON line on the
+'qcs.requests' logger, and with settings.REQUEST_METRICS_SERVER_TIMING
+reports the timings in a Server-Timing header. Requests that are not
+sampled run without wrappers, at no cost.
+
+Queries run while a streaming response is consumed happen after the
+view has returned and are not counted.
+"""
+import contextlib
+import heapq
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('qcs.requests')
+
+# Statement length kept for slow query reports
+SQL_PREVIEW_LENGTH = 200
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing queries."""
+
+    def __init__(self, slowest=3):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = slowest
+        self._heap = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            # Min heap of (duration, order, sql) keeping slowest queries
+            item = (duration, self.count, sql)
+            if len(self._heap) < self.slowest:
+                heapq.heappush(self._heap, item)
+            elif self.slowest:
+                heapq.heappushpop(self._heap, item)
+
+    def slowest_queries(self):
+        """Return [(seconds, sql)] of slowest queries, slowest first."""
+        return [
+            (duration, sql[:SQL_PREVIEW_LENGTH])
+            for duration, _, sql in sorted(self._heap, reverse=True)
+        ]
+
+
+class RequestMetricsMiddleware:
+    """Record SQL count, SQL time and view time of sampled requests."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        recorder = QueryRecorder(settings.REQUEST_METRICS_SLOW_QUERIES)
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            start = time.perf_counter()
+            response = self.get_response(request)
+            duration = time.perf_counter() - start
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            self.add_server_timing(response, recorder, duration)
+        self.log(request, response, recorder, duration)
+        return response
+
+    def add_server_timing(self, response, recorder, duration):
+        """Append sql and view metrics to Server-Timing header."""
+        timing = (
+            f'sql;dur={recorder.duration * 1000:.1f};'
+            f'desc="{recorder.count} queries", '
+            f'view;dur={duration * 1000:.1f}'
+        )
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+    def log(self, request, response, recorder, duration):
+        """Log request metrics as one JSON line."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        metrics = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view_ms': round(duration * 1000, 1),
+            'sql_ms': round(recorder.duration * 1000, 1),
+            'queries': recorder.count,
+            'slowest': [
+                {'ms': round(seconds * 1000, 1), 'sql': sql}
+                for seconds, sql in recorder.slowest_queries()
+            ],
+        }
+        logger.info(json.dumps(metrics), extra={'metrics': metrics})
@@ -0,0 +1,316 @@
+"""
+Indexed substring search over registered models.
+
+Apps register searchable models with register() in AppConfig.ready():
+a kind name, a small numeric code, the text fields and a function
+returning the page of an object. The index structure depends on the
+database:
+
+- SQLite: one FTS5 table (SEARCH_TABLE) with the trigram tokenizer holds
+  the joined text fields of every object. Its rowid encodes kind code
+  and primary key (pk << 2 | code), so an object is updated by rowid.
+  The migration creating the table fills it, then rows are kept in sync
+  by post_save/post_delete signals. Bulk writes call rebuild(). Results
+  are ranked by bm25. Trigrams need 3 characters: shorter words only
+  filter matches of longer ones.
+- PostgreSQL: pg_trgm GIN indexes on UPPER(field) serve the icontains
+  lookups Django generates. Results are ranked by trigram similarity,
+  and no extra table needs syncing.
+- Other databases, or SQLite without FTS5 trigram support, use plain
+  icontains scans.
+
+SearchAdminMixin makes admin search use the index.
+"""
+import functools
+import re
+import sqlite3
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+
+FTS5 = 'fts5'
+TRIGRAM = 'trigram'
+
+SEARCH_TABLE = 'qcs_search'
+
+# Rowid bits holding kind code
+CODE_BITS = 2
+
+# Trigram tokenizer matches words of at least this length
+MIN_WORD_LENGTH = 3
+
+Kind = namedtuple('Kind', 'name code model fields url related')
+Result = namedtuple('Result', 'kind object rank')
+
+KINDS = {}
+
+
+def register(name, code, model, fields, url, related=()):
+    """
+    Register searchable model.
+
+    Code (1-3) identifies the kind in the index, fields are text fields
+    of the model joined into searched text and url returns the page of
+    an object. Related names models fetched with search results.
+    """
+    if not 0 < code < 2 ** CODE_BITS:
+        raise ValueError(f'Search kind code must be 1-{2 ** CODE_BITS - 1}')
+    for kind in KINDS.values():
+        if kind.code == code and kind.name != name:
+            raise ValueError(f'Search kind code {code} used by {kind.name}')
+    KINDS[name] = Kind(name, code, model, tuple(fields), url, tuple(related))
+    post_save.connect(update_object, sender=model,
+                      dispatch_uid=f'search-save-{name}')
+    post_delete.connect(remove_object, sender=model,
+                        dispatch_uid=f'search-delete-{name}')
+
+
+def _kind_of(model):
+    for kind in KINDS.values():
+        if kind.model is model:
+            return kind
+    raise LookupError(f'{model.__name__} is not registered for search')
+
+
+@functools.lru_cache(maxsize=None)
+def _fts5_trigram():
+    """Return True if SQLite library supports FTS5 trigram tokenizer."""
+    try:
+        sqlite3.connect(':memory:').execute(
+            "CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')"
+        )
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def backend(conn=None):
+    """Return FTS5, TRIGRAM or None for plain scans on connection."""
+    conn = conn or connection
+    if conn.vendor == 'postgresql':
+        return TRIGRAM
+    if conn.vendor == 'sqlite' and _fts5_trigram():
+        return FTS5
+    return None
+
+
+def _rowid(kind, pk):
+    return pk << CODE_BITS | kind.code
+
+
+def _text(kind, obj):
+    return ' '.join(str(getattr(obj, name) or '') for name in kind.fields)
+
+
+def rebuild(kinds=None, conn=None):
+    """Refill FTS5 index of kinds (all by default) from their tables."""
+    conn = conn or connection
+    if backend(conn) != FTS5:
+        return
+    with conn.cursor() as cursor:
+        for name in kinds or KINDS:
+            kind = KINDS[name]
+            opts = kind.model._meta
+            text = " || ' ' || ".join(
+                f"COALESCE({conn.ops.quote_name(opts.get_field(field).column)}"
+                f", '')"
+                for field in kind.fields
+            )
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} '
+                f'WHERE (rowid & {2 ** CODE_BITS - 1}) = %s',
+                [kind.code]
+            )
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, text) '
+                f'SELECT {conn.ops.quote_name(opts.pk.column)} '
+                f'<< {CODE_BITS} | %s, {text} '
+                f'FROM {conn.ops.quote_name(opts.db_table)}',
+                [kind.code]
+            )
+
+
+def update_object(sender, instance, raw=False, **kwargs):
+    """post_save handler storing text of saved object."""
+    if raw or backend() != FTS5:
+        return
+    kind = _kind_of(sender)
+    rowid = _rowid(kind, instance.pk)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                       [rowid])
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, text) VALUES (%s, %s)',
+            [rowid, _text(kind, instance)]
+        )
+
+
+def remove_object(sender, instance, **kwargs):
+    """post_delete handler removing text of deleted object."""
+    if backend() != FTS5:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                       [_rowid(_kind_of(sender), instance.pk)])
+
+
+def _fts_condition(term):
+    """
+    Return (SQL condition, params) matching term in FTS5 index.
+
+    Words of at least MIN_WORD_LENGTH characters are matched as phrases,
+    shorter ones by LIKE among those matches. Returns None when term has
+    no word long enough for the index.
+    """
+    words = term.split()
+    phrases = [
+        '"{}"'.format(word.replace('"', '""'))
+        for word in words if len(word) >= MIN_WORD_LENGTH
+    ]
+    if not phrases:
+        return None
+    sql = [f'{SEARCH_TABLE} MATCH %s']
+    params = [' '.join(phrases)]
+    for word in words:
+        if len(word) < MIN_WORD_LENGTH:
+            sql.append("text LIKE %s ESCAPE '\\'")
+            params.append('%{}%'.format(re.sub(r'([%_\\])', r'\\\1', word)))
+    return ' AND '.join(sql), params
+
+
+def _kind_ids(kind, term):
+    """Return RawSQL subquery of kind primary keys matching term or None."""
+    condition = _fts_condition(term)
+    if condition is None:
+        return None
+    sql, params = condition
+    return RawSQL(
+        f'SELECT rowid >> {CODE_BITS} FROM {SEARCH_TABLE} WHERE {sql} '
+        f'AND (rowid & {2 ** CODE_BITS - 1}) = %s',
+        [*params, kind.code]
+    )
+
+
+def filter_queryset(queryset, term, related=()):
+    """
+    Return queryset filtered by term through FTS5 index or None.
+
+    Related maps foreign key field names of queryset model to registered
+    kinds, objects whose related object matches are included too. None
+    means the index can not answer, filter by icontains instead.
+    """
+    if backend() != FTS5:
+        return None
+    ids = _kind_ids(_kind_of(queryset.model), term)
+    if ids is None:
+        return None
+    condition = Q(pk__in=ids)
+    for field, name in related:
+        condition |= Q(**{f'{field}__in': _kind_ids(KINDS[name], term)})
+    return queryset.filter(condition)
+
+
+def _fts_search(term, kinds, limit):
+    condition = _fts_condition(term)
+    if condition is None:
+        return None
+    sql, params = condition
+    codes = {KINDS[name].code: KINDS[name] for name in kinds}
+    placeholders = ', '.join(['%s'] * len(codes))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, rank FROM {SEARCH_TABLE} WHERE {sql} '
+            f'AND (rowid & {2 ** CODE_BITS - 1}) IN ({placeholders}) '
+            f'ORDER BY rank, rowid LIMIT %s',
+            [*params, *codes, limit]
+        )
+        rows = cursor.fetchall()
+    pks = {}
+    for rowid, _ in rows:
+        pks.setdefault(rowid & (2 ** CODE_BITS - 1), []).append(
+            rowid >> CODE_BITS
+        )
+    objects = {
+        code: codes[code].model.objects.select_related(
+            *codes[code].related
+        ).in_bulk(ids)
+        for code, ids in pks.items()
+    }
+    results = []
+    for rowid, rank in rows:
+        code = rowid & (2 ** CODE_BITS - 1)
+        # Rows of objects deleted without signals are skipped
+        obj = objects[code].get(rowid >> CODE_BITS)
+        if obj is not None:
+            # bm25 rank is negative, best match lowest
+            results.append(Result(codes[code].name, obj, -rank))
+    return results
+
+
+def _scan_search(term, kinds, limit):
+    ranked = backend() == TRIGRAM
+    results = []
+    for name in kinds:
+        kind = KINDS[name]
+        condition = Q()
+        for word in term.split():
+            condition &= functools.reduce(Q.__or__, [
+                Q(**{f'{field}__icontains': word}) for field in kind.fields
+            ])
+        queryset = kind.model.objects.filter(condition).select_related(
+            *kind.related
+        )
+        if ranked:
+            similarities = [
+                Func(F(field), Value(term), function='similarity',
+                     output_field=FloatField())
+                for field in kind.fields
+            ]
+            queryset = queryset.annotate(
+                search_rank=Greatest(*similarities)
+                if len(similarities) > 1 else similarities[0]
+            ).order_by('-search_rank')
+        for obj in queryset[:limit]:
+            results.append(
+                Result(name, obj, getattr(obj, 'search_rank', 0.0))
+            )
+    results.sort(key=lambda result: -result.rank)
+    return results[:limit]
+
+
+def search(term, kinds=None, limit=20):
+    """Return list of Result(kind, object, rank), best match first."""
+    term = term.strip()
+    kinds = [name for name in kinds or KINDS if name in KINDS]
+    if not term or not kinds:
+        return []
+    if backend() == FTS5:
+        results = _fts_search(term, kinds, limit)
+        if results is not None:
+            return results
+    return _scan_search(term, kinds, limit)
+
+
+class SearchAdminMixin:
+    """
+    ModelAdmin mixin searching through index.
+
+    search_related lists (foreign key field, kind name) pairs whose
+    matches also match the admin model. Without usable index the
+    ModelAdmin search_fields are scanned as usual.
+    """
+
+    search_related = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term:
+            filtered = filter_queryset(
+                queryset, search_term, self.search_related
+            )
+            if filtered is not None:
+                return filtered, False
+        return super().get_search_results(request, queryset, search_term)
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from qcs import database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so queries of the other middleware are counted
+    'qcs.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,11 +79,31 @@ WSGI_APPLICATION = 'qcs.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# SQLite by default, see qcs/database.py for QCS_DB_* environment variables
 
 DATABASES = {
+    'default': database.database_settings(BASE_DIR),
+}
+# Check persistent connections before reuse by a new request
+DATABASE_HEALTH_CHECKS = database.health_checks()
+# PRAGMA statements executed on every new SQLite connection
+SQLITE_PRAGMAS = database.sqlite_pragmas()
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Local memory cache by default. Set QCS_CACHE_BACKEND and
+# QCS_CACHE_LOCATION for a cache shared by all processes, e.g.
+# django.core.cache.backends.filebased.FileBasedCache and a directory, or
+# a Redis compatible backend class and server URL.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get(
+            'QCS_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('QCS_CACHE_LOCATION', 'qcs'),
     }
 }
 
@@ -101,6 +126,9 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Browser pages require login, signed in users land on the product list
+LOGIN_REDIRECT_URL = 'products:index'
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -121,10 +149,15 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static', ]
+# Batch documents are confidential: MEDIA_ROOT must not be served
+# publicly under MEDIA_URL, documents are sent by quality.downloads views
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
 COA_DIR = 'coa/'
 COLOR_DIR = 'color/'
+# Storage of batch documents and its blob directory (inside MEDIA_ROOT)
+DOCUMENT_STORAGE = 'quality.storage.ContentAddressedStorage'
+DOCUMENT_BLOB_DIR = 'blobs/'
 VALID_FILE_EXTENSIONS = [
         'pdf', 'jpg', 'jpeg', 'png', 'xls', 'xlsx', 'doc', 'docx'
 ]
@@ -135,6 +168,100 @@ VALID_FILE_TYPES = [
         'application/vnd.ms-excel',
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 ]
+# Process COA and color sheet uploads in background worker threads
+ASYNC_UPLOADS = False
+# Number of upload worker threads, 0 processes uploads in calling thread
+UPLOAD_WORKERS = 2
+# Temporary area for uploads waiting for background processing
+UPLOAD_SPOOL_DIR = BASE_DIR / 'media_spool'
+# Max number of leading bytes read to detect uploaded file type
+FILE_TYPE_SNIFF_SIZE = 8192
+# Processes sniffing document types and batches per database read of
+# media integrity scans, 0 workers sniff in the calling process
+MEDIA_SCAN_WORKERS = 4
+MEDIA_SCAN_CHUNK_SIZE = 1000
+# Batch document previews: cache directory (outside MEDIA_ROOT, previews of
+# confidential documents must not be public), max cache size in bytes,
+# thumbnail bounding box in pixels and JPEG quality
+PREVIEW_CACHE_DIR = BASE_DIR / 'media_previews'
+PREVIEW_CACHE_MAX_SIZE = 256 * 1024 * 1024
+PREVIEW_SIZE = 320
+PREVIEW_QUALITY = 80
+# PDF first page renderer command (poppler-utils) and its timeout (seconds)
+PREVIEW_PDF_RENDERER = 'pdftoppm'
+PREVIEW_RENDER_TIMEOUT = 30
+# Browser cache lifetime (seconds) of versioned preview URLs
+PREVIEW_MAX_AGE = 365 * 24 * 3600
+# Front-end server sending protected batch documents (quality.downloads):
+# 'nginx' (X-Accel-Redirect), 'apache' (X-Sendfile) or '' to stream them
+# from Django. nginx serves SENDFILE_URL_PREFIX as internal location
+# aliased to MEDIA_ROOT.
+SENDFILE_BACKEND = os.environ.get('QCS_SENDFILE_BACKEND', '')
+SENDFILE_URL_PREFIX = os.environ.get(
+    'QCS_SENDFILE_URL_PREFIX', '/protected-media/'
+)
+# Number of ColorData rows written per transaction by bulk ingestion
+COLOR_DATA_INGEST_CHUNK_SIZE = 2000
+# Max dE per angle for batch color summary pass flag
+BATCH_MAX_DELTA_E = 1.0
+# Color data history page sizes
+COLOR_DATA_PAGE_SIZE = 100
+COLOR_DATA_MAX_PAGE_SIZE = 1000
+# Number of ColorData rows fetched per database round trip by exports
+COLOR_DATA_EXPORT_CHUNK_SIZE = 2000
+# Default number of days ahead covered by batch expiry reports
+EXPIRY_REPORT_DAYS = 30
+# Cached catalogue lookup timeout (seconds)
+CATALOGUE_CACHE_TIMEOUT = 3600
+# Rows upserted per transaction by catalogue import
+CATALOGUE_IMPORT_CHUNK_SIZE = 1000
+# Rows per page and fragment cache and catalogue version timeout
+# (seconds) of browser pages
+BROWSER_PAGE_SIZE = 50
+BROWSER_CACHE_TIMEOUT = 300
+# Evaluate new color data against control charts while storing it
+SPC_INLINE = True
+# Min number of batches with readings to compute product control charts
+SPC_MIN_SUBGROUPS = 5
+# EWMA weight of new reading and width of limits in sigmas
+SPC_EWMA_LAMBDA = 0.2
+SPC_EWMA_WIDTH = 3.0
+# CUSUM slack value and decision interval in sigmas
+SPC_CUSUM_K = 0.5
+SPC_CUSUM_H = 5.0
+# Default and maximum number of results of search endpoint
+SEARCH_RESULTS_LIMIT = 20
+SEARCH_MAX_RESULTS = 100
+
+# Fraction of requests timed by qcs.middleware.RequestMetricsMiddleware
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.environ.get('QCS_REQUEST_METRICS_SAMPLE_RATE', 0.05)
+)
+# Number of slowest queries logged per sampled request
+REQUEST_METRICS_SLOW_QUERIES = 3
+# Expose SQL and view time of sampled requests to clients, timings
+# reveal query counts and are only sent in development
+REQUEST_METRICS_SERVER_TIMING = DEBUG
+
+# Sampled request metrics are logged as JSON lines to qcs.requests,
+# QCS_REQUEST_LOG_LEVEL=WARNING silences them
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'qcs.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('QCS_REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 ILLEGAL_FILENAME_CHARACTERS = [
     '#', '%', '&', '{', '}', '\\', '<', '>', '*', '?', '/', ' ', '$', '!', "'",
     '"', ':', '@', '+', '`', '|', '='
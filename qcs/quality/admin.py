@@ -1,12 +1,142 @@
 from django.contrib import admin
-from .models import Batch, ColorData
+
+from qcs.search import SearchAdminMixin
+from . import uploads
+from .forms import BatchForm
+from .models import (
+    ApiToken, Batch, BatchColorSummary, BatchUpload, ColorData,
+    ColorEvaluation, ColorStandard, ColorTolerance, ControlChart,
+    ControlViolation
+)
+
+
+class BatchUploadInline(admin.TabularInline):
+    model = BatchUpload
+    fields = ('field', 'original_name', 'status', 'error', 'updated')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Batch)
+class BatchAdmin(SearchAdminMixin, admin.ModelAdmin):
+    form = BatchForm
+    list_display = ('number', 'product', 'size', 'm_date', 'exp_date')
+    list_select_related = ('product',)
+    search_fields = ('number', 'product__name')
+    # Batches of products whose name matches are found too
+    search_related = (('product', 'product'),)
+    autocomplete_fields = ('product',)
+    inlines = (BatchUploadInline,)
+    # Sort by foreign key column instead of joined product name
+    ordering = ('product_id', 'number')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        for field, uploaded_file in form.pending_uploads.items():
+            uploads.submit(obj, field, uploaded_file)
+        if form.pending_uploads:
+            self.message_user(
+                request,
+                'Uploaded files are being processed, see upload status below.'
+            )
 
 
 @admin.register(ColorData)
 class ColorDataAdmin(admin.ModelAdmin):
     list_display = ('batch', 'timestamp', 'category')
     list_filter = ('category',)
+    list_select_related = ('batch__product',)
+    autocomplete_fields = ('batch',)
+    ordering = ('-timestamp', 'batch_id', 'category')
+
+
+@admin.register(ColorStandard)
+class ColorStandardAdmin(admin.ModelAdmin):
+    list_display = ('product', 'method')
+    list_filter = ('method',)
+    list_select_related = ('product',)
+    autocomplete_fields = ('product',)
+
+
+@admin.register(BatchColorSummary)
+class BatchColorSummaryAdmin(admin.ModelAdmin):
+    list_display = ('batch', 'count', 'last_timestamp', 'passed')
+    list_filter = ('passed',)
+    list_select_related = ('batch__product',)
+
+    # Summaries are maintained by quality.summaries only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ControlChart)
+class ControlChartAdmin(admin.ModelAdmin):
+    list_display = ('product', 'field', 'center', 'sigma', 'subgroups',
+                    'count', 'computed')
+    list_filter = ('field',)
+    list_select_related = ('product',)
+    search_fields = ('product__name', 'product__product_id')
+
+    # Charts are computed by quality.spc only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ControlViolation)
+class ControlViolationAdmin(admin.ModelAdmin):
+    list_display = ('batch', 'timestamp', 'chart', 'rule', 'value')
+    list_filter = ('rule', 'chart__field')
+    list_select_related = ('batch__product', 'chart__product')
+    ordering = ('-timestamp', 'chart_id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ColorTolerance)
+class ColorToleranceAdmin(admin.ModelAdmin):
+    list_display = ('product', 'max_de_25', 'max_de_45', 'max_de_75')
+    list_select_related = ('product',)
+    autocomplete_fields = ('product',)
+
+
+@admin.register(ColorEvaluation)
+class ColorEvaluationAdmin(admin.ModelAdmin):
+    list_display = ('reading', 'batch', 'passed', 'reasons', 'evaluated')
+    list_filter = ('passed',)
+    list_select_related = ('reading__batch__product', 'batch__product')
+    readonly_fields = ('reading', 'batch', 'passed', 'reasons', 'evaluated')
+
+    # Evaluations are stored by quality.tolerances only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'created')
+    list_select_related = ('user',)
+    readonly_fields = ('name', 'user', 'created')
 
+    # Tokens are issued by create_api_token, admin only revokes them
+    def has_add_permission(self, request):
+        return False
 
-admin.site.register(Batch)
-# admin.site.register(ColorData)
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,81 @@
+"""
+Vectorized color data statistics.
+
+Functions work on arrays returned by ColorData.objects.to_matrix(): batch
+ids sorted ascending and a float64 measurements matrix with columns in
+ColorData.MEASUREMENT_FIELDS order. Groups are reduced with
+numpy.ufunc.reduceat, so statistics for all batches are computed at once.
+"""
+import numpy as np
+
+from .models import ColorData
+
+
+def group_starts(batch_ids):
+    """Return (unique batch ids, group start indices) of sorted batch ids."""
+    return np.unique(batch_ids, return_index=True)
+
+
+def batch_statistics(batch_ids, values, percentiles=(5, 50, 95), ddof=1):
+    """
+    Return per batch statistics of measurements.
+
+    Result dict contains 'batch_id' and 'count' 1D arrays and 'mean', 'std',
+    'min', 'max' and 'p<N>' for every requested percentile as 2D arrays of
+    shape (batches, measurement fields). Std of single reading batches is
+    NaN when ddof=1.
+    """
+    unique_ids, starts = group_starts(batch_ids)
+    columns = values.shape[1]
+    if not len(unique_ids):
+        empty = np.empty((0, columns), dtype=np.float64)
+        result = {
+            'batch_id': unique_ids, 'count': np.empty(0, dtype=np.int64),
+            'mean': empty, 'std': empty, 'min': empty, 'max': empty
+        }
+        result.update({f'p{p:g}': empty for p in percentiles})
+        return result
+    counts = np.diff(np.append(starts, len(batch_ids)))
+    means = np.add.reduceat(values, starts, axis=0) / counts[:, None]
+    deviations = values - np.repeat(means, counts, axis=0)
+    squares = np.add.reduceat(deviations ** 2, starts, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stds = np.sqrt(squares / (counts - ddof)[:, None])
+    stds[counts <= ddof] = np.nan
+    result = {
+        'batch_id': unique_ids,
+        'count': counts,
+        'mean': means,
+        'std': stds,
+        'min': np.minimum.reduceat(values, starts, axis=0),
+        'max': np.maximum.reduceat(values, starts, axis=0),
+    }
+    if percentiles:
+        groups = np.split(values, starts[1:])
+        stacked = np.stack([
+            np.percentile(group, percentiles, axis=0) for group in groups
+        ], axis=1)
+        for percentile, array in zip(percentiles, stacked):
+            result[f'p{percentile:g}'] = array
+    return result
+
+
+def angle_statistics(statistics, angle):
+    """
+    Return {statistic: {channel: 1D array}} for one measurement angle.
+
+    Selects columns of the given angle ('25', '45' or '75') from
+    batch_statistics() result.
+    """
+    columns = {
+        name.split('_')[0]: index
+        for index, name in enumerate(ColorData.MEASUREMENT_FIELDS)
+        if name.endswith(f'_{angle}')
+    }
+    if not columns:
+        raise ValueError(f'Unknown measurement angle {angle!r}')
+    return {
+        key: {channel: array[:, index] for channel, index in columns.items()}
+        for key, array in statistics.items()
+        if array.ndim == 2
+    }
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class QualityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quality'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+        from django.urls import reverse
+
+        from qcs import database, search
+        from . import signals  # noqa: F401
+        from .models import Batch
+
+        connection_created.connect(database.apply_sqlite_pragmas)
+        request_started.connect(database.check_connections)
+        search.register(
+            'batch', 3, Batch, ['number'],
+            url=lambda batch: reverse(
+                'quality:batch_detail', args=[batch.pk]
+            ),
+            related=['product']
+        )
@@ -0,0 +1,231 @@
+"""
+Benchmarks of admin pages, ingestion, export and upload validation.
+
+Benchmarks run against the data already in the database, see
+quality.synthetic for generating it. Each one returns a dict of metrics,
+timings in milliseconds, throughputs per second. run() adds the commit,
+versions and dataset size, so JSON results of different commits can be
+compared with compare().
+
+Benchmarks leave no data behind, ingested readings are rolled back.
+"""
+import io
+import platform
+import statistics
+import subprocess
+import time
+import zipfile
+
+import django
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from products.models import Product, Supplier
+from . import export
+from .ingestion import ingest_readings
+from .models import Batch, ColorData
+
+
+def _timings(function, repeat):
+    """Return list of seconds taken by repeat calls of function."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _milliseconds(timings):
+    return {
+        'min_ms': round(min(timings) * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+    }
+
+
+def admin_changelist(repeat=5, **options):
+    """Time first changelist page of product, batch and color data admin."""
+    factory = RequestFactory()
+    # Unsaved superuser has all permissions without queries
+    user = User(username='benchmark', is_active=True, is_staff=True,
+                is_superuser=True)
+    results = {}
+    for model in (Product, Batch, ColorData):
+        model_admin = admin.site._registry[model]
+        opts = model._meta
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+
+        def view():
+            request = factory.get(url)
+            request.user = user
+            model_admin.changelist_view(request).render()
+
+        # Warm up and count queries
+        with CaptureQueriesContext(connection) as queries:
+            view()
+        results[opts.label_lower] = {
+            'queries': len(queries),
+            **_milliseconds(_timings(view, repeat)),
+        }
+    return results
+
+
+def ingestion(repeat=3, readings=2000, **options):
+    """Measure readings stored per second by ingest_readings()."""
+    batch = Batch.objects.select_related('product').order_by('id').first()
+    if batch is None:
+        return {'skipped': 'no batches'}
+    reading = {
+        'product_id': batch.product.product_id,
+        'batch': batch.number,
+        'category': ColorData.QC,
+    }
+    for name in ColorData.MEASUREMENT_FIELDS:
+        reading[name] = '0.50' if name.startswith('de') else '50.00'
+    rows = [reading] * readings
+
+    def ingest():
+        with transaction.atomic():
+            ingest_readings(rows)
+            transaction.set_rollback(True)
+
+    timings = _timings(ingest, repeat)
+    return {
+        'readings': readings,
+        'readings_per_s': round(readings / statistics.median(timings)),
+        **_milliseconds(timings),
+    }
+
+
+def exports(repeat=3, rows=20000, **options):
+    """Measure export rows and bytes streamed per second by format."""
+    queryset = export.export_queryset()[:rows]
+    count = queryset.count()
+    if not count:
+        return {'skipped': 'no color data'}
+    results = {}
+    for export_format in export.STREAMS:
+        size = 0
+
+        def stream():
+            nonlocal size
+            size = 0
+            for block in export.stream(export_format,
+                                       export.export_rows(queryset)):
+                size += len(block)
+
+        try:
+            timings = _timings(stream, repeat)
+        except export.ExportError as e:
+            results[export_format] = {'skipped': str(e)}
+            continue
+        median = statistics.median(timings)
+        results[export_format] = {
+            'rows': count,
+            'rows_per_s': round(count / median),
+            'mb_per_s': round(size / median / 1e6, 3),
+            **_milliseconds(timings),
+        }
+    return results
+
+
+def sample_documents():
+    """Return {file name: content} of minimal valid upload documents."""
+    documents = {
+        'sample.pdf': b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj\n<<>>\nendobj\n',
+        'sample.png': (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR'
+                       b'\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02'
+                       b'\x00\x00\x00\x90wS\xde'),
+        'sample.jpg': b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00' * 4,
+    }
+    for name, part in (('sample.xlsx', 'xl/workbook.xml'),
+                       ('sample.docx', 'word/document.xml')):
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as archive:
+            archive.writestr('[Content_Types].xml', '<Types/>')
+            archive.writestr(part, '<document/>')
+        documents[name] = content.getvalue()
+    return documents
+
+
+def upload_validation(repeat=200, **options):
+    """Time Batch.coa validators (extension and sniffed type) per file."""
+    validators = Batch._meta.get_field('coa').validators
+    results = {}
+    for name, content in sample_documents().items():
+        document = ContentFile(content, name=name)
+
+        def validate():
+            for validator in validators:
+                validator(document)
+
+        results[name.rsplit('.', 1)[-1]] = _milliseconds(
+            _timings(validate, repeat)
+        )
+    return results
+
+
+# Benchmark name -> function
+BENCHMARKS = {
+    'admin_changelist': admin_changelist,
+    'ingestion': ingestion,
+    'export': exports,
+    'upload_validation': upload_validation,
+}
+
+
+def commit():
+    """Return current git commit of project, None outside repository."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names=None, **options):
+    """Run benchmarks (all by default), return JSON serializable results."""
+    return {
+        'commit': commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'dataset': {
+            model._meta.label_lower: model.objects.count()
+            for model in (Supplier, Product, Batch, ColorData)
+        },
+        'benchmarks': {
+            name: BENCHMARKS[name](**options)
+            for name in names or BENCHMARKS
+        },
+    }
+
+
+def _metrics(results, path=()):
+    """Yield (path, value) of numeric metrics in nested results."""
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _metrics(value, path + (key,))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield '.'.join(path + (key,)), value
+
+
+def compare(baseline, current):
+    """Return [(metric, baseline, current, ratio)] of common metrics."""
+    before = dict(_metrics(baseline['benchmarks']))
+    return [
+        (metric, before[metric], value,
+         value / before[metric] if before[metric] else None)
+        for metric, value in _metrics(current['benchmarks'])
+        if metric in before
+    ]
@@ -0,0 +1,114 @@
+"""
+Vectorized color difference (delta E) formulas.
+
+All functions take reference and sample CIELAB arrays of shape (..., 3)
+and return delta E array of shape (...). Arrays broadcast, so a single
+reference color can be compared against any number of samples at once.
+"""
+import numpy as np
+
+CIE76 = 'CIE76'
+CIE94 = 'CIE94'
+CIEDE2000 = 'CIEDE2000'
+
+
+def _split(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    return lab[..., 0], lab[..., 1], lab[..., 2]
+
+
+def cie76(reference, sample):
+    """CIE 1976 color difference (euclidean distance in CIELAB)."""
+    reference = np.asarray(reference, dtype=np.float64)
+    sample = np.asarray(sample, dtype=np.float64)
+    return np.sqrt(np.sum((sample - reference) ** 2, axis=-1))
+
+
+def cie94(reference, sample, k_l=1.0, k_1=0.045, k_2=0.015):
+    """CIE 1994 color difference (graphic arts weighting by default)."""
+    l_1, a_1, b_1 = _split(reference)
+    l_2, a_2, b_2 = _split(sample)
+    c_1 = np.hypot(a_1, b_1)
+    c_2 = np.hypot(a_2, b_2)
+    delta_l = l_1 - l_2
+    delta_c = c_1 - c_2
+    delta_h_squared = (a_1 - a_2) ** 2 + (b_1 - b_2) ** 2 - delta_c ** 2
+    s_c = 1 + k_1 * c_1
+    s_h = 1 + k_2 * c_1
+    return np.sqrt(
+        (delta_l / k_l) ** 2
+        + (delta_c / s_c) ** 2
+        + np.maximum(delta_h_squared, 0) / s_h ** 2
+    )
+
+
+def ciede2000(reference, sample, k_l=1.0, k_c=1.0, k_h=1.0):
+    """CIEDE2000 color difference (Sharma, Wu, Dalal 2005)."""
+    l_1, a_1, b_1 = _split(reference)
+    l_2, a_2, b_2 = _split(sample)
+    c_mean = (np.hypot(a_1, b_1) + np.hypot(a_2, b_2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25.0 ** 7)))
+    a_1p = (1 + g) * a_1
+    a_2p = (1 + g) * a_2
+    c_1p = np.hypot(a_1p, b_1)
+    c_2p = np.hypot(a_2p, b_2)
+    h_1p = np.degrees(np.arctan2(b_1, a_1p)) % 360
+    h_2p = np.degrees(np.arctan2(b_2, a_2p)) % 360
+    chroma_product = c_1p * c_2p
+    achromatic = chroma_product == 0
+
+    delta_lp = l_2 - l_1
+    delta_cp = c_2p - c_1p
+    delta_hp = h_2p - h_1p
+    delta_hp = np.where(delta_hp > 180, delta_hp - 360, delta_hp)
+    delta_hp = np.where(delta_hp < -180, delta_hp + 360, delta_hp)
+    delta_hp = np.where(achromatic, 0, delta_hp)
+    delta_big_hp = (
+        2 * np.sqrt(chroma_product) * np.sin(np.radians(delta_hp) / 2)
+    )
+
+    l_mean = (l_1 + l_2) / 2
+    c_mean_p = (c_1p + c_2p) / 2
+    h_sum = h_1p + h_2p
+    h_mean = np.where(
+        np.abs(h_1p - h_2p) <= 180,
+        h_sum / 2,
+        np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2)
+    )
+    h_mean = np.where(achromatic, h_sum, h_mean)
+
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(h_mean - 30))
+        + 0.24 * np.cos(np.radians(2 * h_mean))
+        + 0.32 * np.cos(np.radians(3 * h_mean + 6))
+        - 0.20 * np.cos(np.radians(4 * h_mean - 63))
+    )
+    delta_theta = 30 * np.exp(-(((h_mean - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(c_mean_p ** 7 / (c_mean_p ** 7 + 25.0 ** 7))
+    s_l = 1 + (0.015 * (l_mean - 50) ** 2) / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_mean_p
+    s_h = 1 + 0.015 * c_mean_p * t
+    r_t = -np.sin(np.radians(2 * delta_theta)) * r_c
+
+    term_l = delta_lp / (k_l * s_l)
+    term_c = delta_cp / (k_c * s_c)
+    term_h = delta_big_hp / (k_h * s_h)
+    return np.sqrt(term_l ** 2 + term_c ** 2 + term_h ** 2
+                   + r_t * term_c * term_h)
+
+
+# Method name -> delta E function
+METHODS = {CIE76: cie76, CIE94: cie94, CIEDE2000: ciede2000}
+
+
+def delta_e(reference, sample, method=CIEDE2000):
+    """Return delta E of samples against reference using named method."""
+    try:
+        function = METHODS[method]
+    except KeyError:
+        raise ValueError(
+            f"Unknown delta E method '{method}', "
+            f"choose one of {', '.join(METHODS)}"
+        )
+    return function(reference, sample)
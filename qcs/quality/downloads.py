@@ -0,0 +1,156 @@
+"""
+Protected serving of batch documents.
+
+Views authorize the request in Django and return serve(), which leaves
+the byte transfer to the front-end server when settings.SENDFILE_BACKEND
+names one:
+
+- 'nginx': X-Accel-Redirect to the document under
+  settings.SENDFILE_URL_PREFIX, an internal location aliased to the
+  document storage root, e.g.
+
+      location /protected-media/ {
+          internal;
+          alias /srv/qcs/media/;
+      }
+
+- 'apache': X-Sendfile with the absolute document path (mod_xsendfile).
+
+The front-end server then sends the file, Range requests included, and
+the worker is released at once. Without a backend (development) the file
+is streamed by FileResponse, single byte range requests are answered
+with 206 Partial Content so large downloads can be resumed.
+
+The document storage root (MEDIA_ROOT) must not be served publicly,
+e.g. by a /media/ location of the front-end server: it would bypass the
+permission checks of the views.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+
+from .storage import get_document_storage
+
+NGINX = 'nginx'
+APACHE = 'apache'
+BACKENDS = ['', NGINX, APACHE]
+
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class FileRange:
+    """Binary file object reading only bytes start to end (inclusive)."""
+
+    def __init__(self, file_obj, start, end):
+        file_obj.seek(start)
+        self.file_obj = file_obj
+        self.remaining = end - start + 1
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file_obj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file_obj.close()
+
+
+def byte_range(header, size):
+    """
+    Return (start, end) of single byte range header value or None.
+
+    None means the whole file is sent: no header, or one this server
+    does not handle (multiple or malformed ranges). Raises ValueError for
+    ranges outside file of size bytes.
+    """
+    match = RANGE_RE.fullmatch(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range, last bytes of file
+        if not int(last) or not size:
+            raise ValueError('Unsatisfiable range')
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError('Unsatisfiable range')
+    return start, (min(int(last), size - 1) if last else size - 1)
+
+
+def _content_disposition(filename):
+    try:
+        filename.encode('ascii')
+        return f'inline; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"inline; filename*=utf-8''{quote(filename)}"
+
+
+def _file_response(request, path, filename):
+    file_obj = open(path, 'rb')
+    stat = os.fstat(file_obj.fileno())
+    last_modified = http_date(stat.st_mtime)
+    header = request.headers.get('Range')
+    # Resumed download of changed file restarts from first byte
+    if request.headers.get('If-Range', last_modified) != last_modified:
+        header = None
+    try:
+        bytes_range = byte_range(header, stat.st_size)
+    except ValueError:
+        file_obj.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if bytes_range is None:
+        response = FileResponse(file_obj, filename=filename)
+    else:
+        start, end = bytes_range
+        response = FileResponse(
+            FileRange(file_obj, start, end), status=206, filename=filename
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = last_modified
+    return response
+
+
+def serve(request, name):
+    """Return response sending stored document name to authorized user."""
+    backend = settings.SENDFILE_BACKEND
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"SENDFILE_BACKEND must be one of {BACKENDS}, not '{backend}'"
+        )
+    path = get_document_storage().path(name)
+    if not os.path.isfile(path):
+        raise Http404('Document file does not exist')
+    filename = os.path.basename(name)
+    if backend:
+        content_type, _ = mimetypes.guess_type(filename)
+        response = HttpResponse(
+            content_type=content_type or 'application/octet-stream'
+        )
+        response['Content-Disposition'] = _content_disposition(filename)
+        if backend == NGINX:
+            response['X-Accel-Redirect'] = quote(
+                f'{settings.SENDFILE_URL_PREFIX}{name}'
+            )
+        else:
+            response['X-Sendfile'] = path
+    else:
+        response = _file_response(request, path, filename)
+    # Confidential documents must not be kept by shared caches
+    patch_cache_control(response, private=True)
+    return response
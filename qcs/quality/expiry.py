@@ -0,0 +1,105 @@
+"""
+Batch expiry and manufacturing date window queries.
+
+Windows are inclusive date ranges on Batch.exp_date or Batch.m_date, both
+indexed, so the database range scans the index instead of the table.
+Reports are built by one aggregate query grouped by product (with its
+supplier) and nested by supplier in Python.
+"""
+import datetime
+
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .models import Batch
+
+EXPIRY = 'exp_date'
+MANUFACTURING = 'm_date'
+
+DATE_FIELDS = [EXPIRY, MANUFACTURING]
+
+
+def window(days=None, start=None, end=None):
+    """
+    Return inclusive (start, end) dates of window.
+
+    Without explicit dates the window starts today and ends days later.
+    """
+    if start is None and end is None:
+        start = timezone.localdate()
+        end = start + datetime.timedelta(days=days or 0)
+    return start, end
+
+
+def batches_in_window(start=None, end=None, field=EXPIRY):
+    """Return batches with date field inside [start, end], open ends."""
+    if field not in DATE_FIELDS:
+        raise ValueError(
+            f"Unknown date field '{field}', "
+            f"choose one of {', '.join(DATE_FIELDS)}"
+        )
+    lookups = {}
+    if start is not None:
+        lookups[f'{field}__gte'] = start
+    if end is not None:
+        lookups[f'{field}__lte'] = end
+    return Batch.objects.filter(**lookups)
+
+
+def expiring_batches(days):
+    """Return batches expiring from today to days later."""
+    return batches_in_window(*window(days))
+
+
+def manufactured_batches(start, end):
+    """Return batches manufactured inside [start, end]."""
+    return batches_in_window(start, end, field=MANUFACTURING)
+
+
+def product_totals(batches):
+    """
+    Return values queryset of batches aggregated per product.
+
+    Rows are dicts with product and supplier ids and names, number of
+    batches, stock (sum of batch sizes) and first/last expiry dates,
+    ordered by supplier and product name.
+    """
+    return batches.order_by().values(
+        'product_id', 'product__product_id', 'product__name',
+        'product__supplier_id', 'product__supplier__name'
+    ).annotate(
+        batches=Count('id'),
+        stock=Sum('size'),
+        first_expiry=Min('exp_date'),
+        last_expiry=Max('exp_date')
+    ).order_by(
+        'product__supplier__name', 'product__supplier_id',
+        'product__name', 'product_id'
+    )
+
+
+def report(batches):
+    """Return product totals of batches nested by supplier, one query."""
+    suppliers = []
+    for row in product_totals(batches):
+        if not suppliers or suppliers[-1]['id'] != row['product__supplier_id']:
+            suppliers.append({
+                'id': row['product__supplier_id'],
+                'name': row['product__supplier__name'],
+                'batches': 0,
+                'stock': 0,
+                'products': [],
+            })
+        supplier = suppliers[-1]
+        supplier['batches'] += row['batches']
+        supplier['stock'] += row['stock']
+        supplier['products'].append({
+            'id': row['product_id'],
+            'product_id': row['product__product_id'],
+            'name': row['product__name'],
+            'batches': row['batches'],
+            'stock': row['stock'],
+            'first_expiry': row['first_expiry'],
+            'last_expiry': row['last_expiry'],
+        })
+    return suppliers
@@ -0,0 +1,135 @@
+"""
+Constant memory color data exports.
+
+Rows are read with QuerySet.iterator(chunk_size) (server side cursor where
+the database supports it), so at most one chunk of ColorData objects is
+held in memory regardless of the export size. CSV is rendered while the
+response is streamed. XLSX is written by openpyxl in write-only mode to an
+anonymous temporary file (a zip archive cannot be emitted before its
+central directory is known) and then streamed from it in blocks.
+
+openpyxl is optional, XLSX exports are unavailable without it.
+"""
+import csv
+import tempfile
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ColorData
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # pragma: no cover
+    Workbook = None
+
+CSV = 'csv'
+XLSX = 'xlsx'
+
+CONTENT_TYPES = {
+    CSV: 'text/csv',
+    XLSX: ('application/vnd.openxmlformats-officedocument.'
+           'spreadsheetml.sheet'),
+}
+
+HEADER = [
+    'timestamp', 'supplier', 'product_id', 'product', 'batch', 'category',
+    *ColorData.MEASUREMENT_FIELDS, 'comment'
+]
+
+# Approximate size of streamed response blocks
+BLOCK_SIZE = 64 * 1024
+
+
+class ExportError(Exception):
+    """Export can not be produced."""
+
+
+def export_queryset():
+    """
+    Return color data queryset of export.
+
+    Filters are applied by quality.forms.ColorDataExportForm.
+    """
+    return ColorData.objects.select_related(
+        'batch__product__supplier'
+    ).order_by('timestamp', 'id')
+
+
+def export_rows(queryset, chunk_size=None):
+    """Yield export rows (lists of HEADER values) streaming queryset."""
+    chunk_size = chunk_size or settings.COLOR_DATA_EXPORT_CHUNK_SIZE
+    for reading in queryset.iterator(chunk_size=chunk_size):
+        product = reading.batch.product
+        supplier = product.supplier
+        yield [
+            timezone.localtime(reading.timestamp).replace(tzinfo=None),
+            supplier.name if supplier else '',
+            product.product_id,
+            product.name,
+            reading.batch.number,
+            reading.category,
+            *[getattr(reading, name) for name in ColorData.MEASUREMENT_FIELDS],
+            reading.comment or ''
+        ]
+
+
+class _Echo:
+    """File-like object returning written value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Yield CSV text of header and rows in blocks of about BLOCK_SIZE."""
+    writer = csv.writer(_Echo())
+    block = [writer.writerow(HEADER)]
+    size = 0
+    for row in rows:
+        line = writer.writerow(row)
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield ''.join(block)
+            block = []
+            size = 0
+    if block:
+        yield ''.join(block)
+
+
+def stream_xlsx(rows):
+    """Yield XLSX workbook of header and rows in blocks of BLOCK_SIZE."""
+    if Workbook is None:
+        raise ExportError('XLSX export requires openpyxl')
+    with tempfile.TemporaryFile() as temp_file:
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Color data')
+        sheet.append(HEADER)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(temp_file)
+        temp_file.seek(0)
+        while True:
+            block = temp_file.read(BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+# Export format -> stream function
+STREAMS = {CSV: stream_csv, XLSX: stream_xlsx}
+
+
+def stream(export_format, rows):
+    """Return iterator of export in given format."""
+    try:
+        function = STREAMS[export_format]
+    except KeyError:
+        raise ExportError(
+            f"Unknown export format '{export_format}', "
+            f"choose one of {', '.join(STREAMS)}"
+        )
+    if export_format == XLSX and Workbook is None:
+        raise ExportError('XLSX export requires openpyxl')
+    return function(rows)
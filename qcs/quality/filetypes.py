@@ -0,0 +1,110 @@
+"""
+Bounded MIME type detection for uploaded documents.
+
+libmagic only needs the leading bytes of a file to identify it, so the
+file is never read in full. Container formats are the exception: libmagic
+can only tell a DOCX/XLSX from a plain ZIP archive, or a DOC/XLS from any
+other OLE2 compound file, when the right structures happen to sit in the
+header. For these formats the container directory is inspected directly
+with a few bounded seeks instead.
+"""
+import struct
+import zipfile
+
+import magic
+from django.conf import settings
+
+DOCX = ('application/vnd.openxmlformats-officedocument'
+        '.wordprocessingml.document')
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DOC = 'application/msword'
+XLS = 'application/vnd.ms-excel'
+
+ZIP_SIGNATURE = b'PK\x03\x04'
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Generic types libmagic reports when the header alone is not conclusive
+ZIP_TYPES = {'application/zip', 'application/octet-stream'}
+OLE_TYPES = {
+    'application/x-ole-storage', 'application/CDFV2',
+    'application/octet-stream'
+}
+
+# OOXML part directory -> MIME type
+OOXML_PARTS = {'word/': DOCX, 'xl/': XLSX}
+
+# OLE2 root storage CLSID (little-endian bytes) -> MIME type
+OLE_CLSIDS = {
+    b'\x06\x09\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00\x46': DOC,
+    b'\x00\x09\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00\x46': DOC,
+    b'\x10\x08\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00\x46': XLS,
+    b'\x20\x08\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00\x46': XLS,
+}
+# OLE2 stream name -> MIME type
+OLE_STREAMS = {'WordDocument': DOC, 'Workbook': XLS, 'Book': XLS}
+
+OLE_DIR_ENTRY_SIZE = 128
+OLE_END_OF_CHAIN = 0xFFFFFFFE
+
+
+def _zip_file_type(file_obj):
+    """Return OOXML MIME type from ZIP central directory or None."""
+    try:
+        with zipfile.ZipFile(file_obj) as archive:
+            names = archive.namelist()
+    except (zipfile.BadZipFile, OSError, EOFError):
+        return None
+    for name in names:
+        for prefix, file_type in OOXML_PARTS.items():
+            if name.startswith(prefix):
+                return file_type
+    return None
+
+
+def _ole_file_type(file_obj, header, position):
+    """Return MS Office MIME type from OLE2 first directory sector or None."""
+    if len(header) < 512:
+        return None
+    sector_shift, = struct.unpack_from('<H', header, 30)
+    first_dir_sector, = struct.unpack_from('<I', header, 48)
+    if not 7 <= sector_shift <= 16 or first_dir_sector >= OLE_END_OF_CHAIN:
+        return None
+    sector_size = 1 << sector_shift
+    file_obj.seek(position + (first_dir_sector + 1) * sector_size)
+    directory = file_obj.read(sector_size)
+    for offset in range(0, len(directory), OLE_DIR_ENTRY_SIZE):
+        entry = directory[offset:offset + OLE_DIR_ENTRY_SIZE]
+        if len(entry) < OLE_DIR_ENTRY_SIZE:
+            break
+        # Root storage entry comes first and carries application CLSID
+        if offset == 0 and entry[80:96] in OLE_CLSIDS:
+            return OLE_CLSIDS[entry[80:96]]
+        name_length, = struct.unpack_from('<H', entry, 64)
+        name = entry[:max(name_length - 2, 0)].decode('utf-16-le', 'ignore')
+        if name in OLE_STREAMS:
+            return OLE_STREAMS[name]
+    return None
+
+
+def guess_file_type(file_obj):
+    """
+    Return MIME type of an open binary file object.
+
+    Reads at most settings.FILE_TYPE_SNIFF_SIZE bytes from the current
+    position (plus the container directory for ZIP/OLE2 files) and seeks
+    back to that position afterwards. The file object is never closed.
+    """
+    position = file_obj.tell()
+    try:
+        header = file_obj.read(settings.FILE_TYPE_SNIFF_SIZE)
+        file_type = magic.from_buffer(header, mime=True)
+        if header.startswith(ZIP_SIGNATURE) and file_type in ZIP_TYPES:
+            file_obj.seek(position)
+            file_type = _zip_file_type(file_obj) or file_type
+        elif header.startswith(OLE_SIGNATURE) and file_type in OLE_TYPES:
+            file_type = (
+                _ole_file_type(file_obj, header, position) or file_type
+            )
+    finally:
+        file_obj.seek(position)
+    return file_type
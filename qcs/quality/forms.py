@@ -0,0 +1,107 @@
+from django import forms
+from django.conf import settings
+
+from products.forms import ProductFilterForm
+from .models import Batch, ColorData
+
+# Batch fields holding uploaded documents
+UPLOAD_FIELDS = ['coa', 'color_sheet']
+
+
+class BatchForm(forms.ModelForm):
+    """
+    Batch form deferring document uploads to background workers.
+
+    With settings.ASYNC_UPLOADS enabled newly uploaded files are removed
+    from cleaned data before model validation and kept in pending_uploads
+    for quality.uploads.submit().
+    """
+
+    class Meta:
+        model = Batch
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_uploads = {}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not settings.ASYNC_UPLOADS:
+            return cleaned_data
+        for name in UPLOAD_FIELDS:
+            if name in self.files and cleaned_data.get(name):
+                self.pending_uploads[name] = cleaned_data[name]
+                # Keep currently stored file until upload is processed
+                cleaned_data[name] = getattr(self.instance, name)
+        return cleaned_data
+
+
+class BatchFilterForm(ProductFilterForm):
+    """Batch list filter form, product fields and expiry window."""
+
+    LOOKUPS = {
+        'formula': 'product__formula',
+        'product_type': 'product__product_type',
+        'supplier': 'product__supplier',
+        'expires_from': 'exp_date__gte',
+        'expires_to': 'exp_date__lte',
+    }
+
+    expires_from = forms.DateField(
+        label='Expires from',
+        widget=forms.DateInput(
+            attrs={'type': 'date', 'class': 'form-control'}
+        ),
+        required=False
+    )
+    expires_to = forms.DateField(
+        label='Expires to',
+        widget=forms.DateInput(
+            attrs={'type': 'date', 'class': 'form-control'}
+        ),
+        required=False
+    )
+
+
+class ColorDataFilterForm(forms.Form):
+    """
+    Color data history filter form.
+
+    Unlike list filter forms, invalid values are not ignored: views reject
+    requests with an invalid form.
+    """
+
+    # Form field -> queryset lookup
+    LOOKUPS = {
+        'product': 'batch__product_id',
+        'batch': 'batch_id',
+        'category': 'category',
+    }
+
+    product = forms.IntegerField(min_value=1, required=False)
+    batch = forms.IntegerField(min_value=1, required=False)
+    category = forms.ChoiceField(
+        choices=ColorData.CATEGORY_CHOICES,
+        required=False
+    )
+
+    def filter(self, queryset):
+        """Return queryset filtered by values of valid form."""
+        lookups = {
+            lookup: self.cleaned_data[name]
+            for name, lookup in self.LOOKUPS.items()
+            if self.cleaned_data.get(name) not in (None, '')
+        }
+        return queryset.filter(**lookups)
+
+
+class ColorDataExportForm(ColorDataFilterForm):
+    """Color data export filter form, history filters and supplier."""
+
+    LOOKUPS = {
+        **ColorDataFilterForm.LOOKUPS,
+        'supplier': 'batch__product__supplier_id',
+    }
+
+    supplier = forms.IntegerField(min_value=1, required=False)
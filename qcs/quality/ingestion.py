@@ -0,0 +1,241 @@
+"""
+Bulk color data ingestion.
+
+Readings pushed by spectrophotometer stations are validated row by row,
+batches are resolved with a single query, dE is computed against product
+color standards and valid readings are inserted in bulk in chunked
+transactions (see insert_readings()). Submitted dE values are only used
+for products without a color standard. Stored readings are evaluated
+against product tolerances and, with settings.SPC_INLINE, control charts.
+
+10k readings are ingested in about 0.7 s on SQLite. Most of that is
+validation and model construction in Python, for 12 Decimal values per
+reading; summaries, tolerance and control chart evaluation are
+vectorized per chunk.
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import spc, summaries, tolerances
+from .models import Batch, ColorData, compute_delta_e
+
+# Reading keys identifying batch
+BATCH_KEYS = ['product_id', 'batch']
+# Category choice values
+CATEGORIES = {value for value, _ in ColorData.CATEGORY_CHOICES}
+# Measurement field name -> (max decimal places, max whole digits)
+DECIMAL_LIMITS = {
+    name: (
+        ColorData._meta.get_field(name).decimal_places,
+        ColorData._meta.get_field(name).max_digits
+        - ColorData._meta.get_field(name).decimal_places
+    )
+    for name in ColorData.MEASUREMENT_FIELDS
+}
+
+
+class IngestionError(Exception):
+    """Malformed ingestion payload."""
+
+
+def parse_readings(content, content_type):
+    """Return list of reading dicts from JSON or CSV request body."""
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise IngestionError('Request body must be UTF-8 encoded')
+    if content_type == 'text/csv':
+        return list(csv.DictReader(io.StringIO(text)))
+    try:
+        data = json.loads(text)
+    except ValueError as error:
+        raise IngestionError(f'Invalid JSON: {error}')
+    if isinstance(data, dict):
+        data = data.get('readings')
+    if not isinstance(data, list):
+        raise IngestionError(
+            "JSON body must be an array or an object with 'readings' array"
+        )
+    return data
+
+
+def _clean_decimal(value, decimal_places, whole_digits):
+    """Return Decimal matching field precision or raise ValueError."""
+    try:
+        # Decimal() ignores surrounding whitespace of strings
+        number = Decimal(value if isinstance(value, str) else str(value))
+    except InvalidOperation:
+        raise ValueError('Enter a number.')
+    if not number.is_finite():
+        raise ValueError('Enter a number.')
+    if -number.as_tuple().exponent > decimal_places:
+        raise ValueError(
+            f'Ensure that there are no more than {decimal_places} '
+            'decimal places.'
+        )
+    if abs(number) >= 10 ** whole_digits:
+        raise ValueError(
+            f'Ensure that there are no more than {whole_digits} digits '
+            'before the decimal point.'
+        )
+    return number
+
+
+def clean_reading(reading):
+    """Return (cleaned values, errors) for one reading dict."""
+    if not isinstance(reading, dict):
+        return None, {'__all__': ['Reading must be an object']}
+    cleaned = {}
+    errors = {}
+    for key in BATCH_KEYS:
+        value = reading.get(key)
+        if value in (None, ''):
+            errors[key] = ['This field is required.']
+        else:
+            cleaned[key] = str(value).strip()
+    category = reading.get('category')
+    if category not in CATEGORIES:
+        errors['category'] = [
+            f'Select a valid choice. {category} is not one of the available '
+            'choices.'
+        ]
+    else:
+        cleaned['category'] = category
+    for name, limits in DECIMAL_LIMITS.items():
+        value = reading.get(name)
+        if value in (None, ''):
+            # dE may be computed from product color standard
+            if name not in ColorData.DELTA_E_FIELDS:
+                errors[name] = ['This field is required.']
+            continue
+        try:
+            cleaned[name] = _clean_decimal(value, *limits)
+        except ValueError as error:
+            errors[name] = [str(error)]
+    cleaned['comment'] = str(reading.get('comment') or '')
+    return cleaned, errors
+
+
+def resolve_batches(keys):
+    """Return {(product_id, batch number): batch id} in one query."""
+    if not keys:
+        return {}
+    product_ids = {product_id for product_id, _ in keys}
+    numbers = {number for _, number in keys}
+    candidates = Batch.objects.filter(
+        product__product_id__in=product_ids, number__in=numbers
+    ).order_by('pk').values_list('product__product_id', 'number', 'pk')
+    return {
+        (product_id, number): pk
+        for product_id, number, pk in candidates
+        if (product_id, number) in keys
+    }
+
+
+def insert_readings(objs):
+    """
+    Store new ColorData objects and set their primary keys.
+
+    Backends returning ids of bulk inserts (PostgreSQL) use bulk_create().
+    Django 3.2 returns none on SQLite, where the rows are written by one
+    executemany() of cleaned values instead, skipping the per value
+    preparation that took most of the time of bulk_create(). Called in
+    the inserting transaction: it holds the SQLite write lock and ids are
+    AUTOINCREMENT, so the objects are the last stored readings.
+    """
+    if not objs:
+        return
+    if connection.features.can_return_rows_from_bulk_insert:
+        ColorData.objects.bulk_create(objs)
+        return
+    fields = [field for field in ColorData._meta.concrete_fields
+              if not field.primary_key]
+    # Timestamp set as by auto_now_add
+    now = timezone.now()
+    for obj in objs:
+        obj.timestamp = now
+        obj._state.adding = False
+        obj._state.db = connection.alias
+    timestamp = connection.ops.adapt_datetimefield_value(now)
+    attnames = [field.attname for field in fields]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(ColorData._meta.db_table),
+        ', '.join(connection.ops.quote_name(field.column)
+                  for field in fields),
+        ', '.join(['%s'] * len(fields))
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            [timestamp if name == 'timestamp' else getattr(obj, name)
+             for name in attnames]
+            for obj in objs
+        ])
+    last = ColorData.objects.aggregate(last=Max('pk'))['last']
+    for pk, obj in enumerate(objs, start=last - len(objs) + 1):
+        obj.pk = pk
+
+
+def ingest_readings(readings, chunk_size=None):
+    """
+    Validate and store readings.
+
+    Returns (number of created ColorData objects, list of row errors).
+    Invalid rows are reported by index and skipped, valid rows are stored.
+    """
+    chunk_size = chunk_size or settings.COLOR_DATA_INGEST_CHUNK_SIZE
+    errors = []
+    valid = []
+    for index, reading in enumerate(readings):
+        cleaned, row_errors = clean_reading(reading)
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            valid.append((index, cleaned))
+    batches = resolve_batches(
+        {(cleaned['product_id'], cleaned['batch']) for _, cleaned in valid}
+    )
+    objs = []
+    rows = []
+    for index, cleaned in valid:
+        batch_id = batches.get((cleaned.pop('product_id'),
+                                cleaned.pop('batch')))
+        if batch_id is None:
+            errors.append({
+                'row': index,
+                'errors': {'batch': ['Batch does not exist.']}
+            })
+            continue
+        objs.append(ColorData(batch_id=batch_id, **cleaned))
+        rows.append(index)
+    compute_delta_e(objs)
+    complete = []
+    for index, obj in zip(rows, objs):
+        missing = [name for name in ColorData.DELTA_E_FIELDS
+                   if getattr(obj, name) is None]
+        if missing:
+            errors.append({'row': index, 'errors': {
+                name: ['This field is required when product has no color '
+                       'standard.']
+                for name in missing
+            }})
+        else:
+            complete.append(obj)
+    objs = complete
+    errors.sort(key=lambda error: error['row'])
+    for start in range(0, len(objs), chunk_size):
+        chunk = objs[start:start + chunk_size]
+        with transaction.atomic():
+            insert_readings(chunk)
+            # Bulk inserts send no signals, summaries are updated here
+            summaries.add_readings(chunk)
+            tolerances.evaluate_new(chunk)
+            if settings.SPC_INLINE:
+                spc.evaluate(chunk)
+    return len(objs), errors
@@ -0,0 +1,174 @@
+"""
+Integrity scan of stored batch documents.
+
+The document directories (settings.COA_DIR and settings.COLOR_DIR inside
+the document storage) are walked with os.scandir(), which returns file
+type and size with the directory listing instead of one stat() per file.
+The blob store of ContentAddressedStorage is skipped, it is checked by
+collect_document_blobs.
+
+Batch.coa and Batch.color_sheet names are then streamed from the
+database in chunks and joined against the walked files in memory:
+names without a file are missing, files without a name are orphans.
+Existing referenced files of every chunk are sent to a process pool
+which sniffs their headers with quality.filetypes.guess_file_type(), so
+type detection of the next chunks overlaps the database reads. At most
+two chunks per worker are queued, so memory does not grow with the
+number of documents. Files
+whose type is not in settings.VALID_FILE_TYPES are invalid.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+
+from .filetypes import guess_file_type
+from .models import Batch
+from .storage import get_document_storage
+
+
+def walk(location, directories, skip=()):
+    """
+    Return {storage name: size} of files in directories of location.
+
+    Storage names use '/' separators. Directories in skip (absolute
+    paths) are not entered.
+    """
+    skip = {os.path.normpath(path) for path in skip}
+    files = {}
+    stack = [os.path.join(location, directory) for directory in directories]
+    while stack:
+        path = stack.pop()
+        if os.path.normpath(path) in skip:
+            continue
+        try:
+            entries = os.scandir(path)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, location)
+                    files[name.replace(os.sep, '/')] = (
+                        entry.stat(follow_symlinks=False).st_size
+                    )
+    return files
+
+
+def sniff(paths):
+    """Return [(path, MIME type or None, error or None)] of files."""
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as file_obj:
+                results.append((path, guess_file_type(file_obj), None))
+        except OSError as error:
+            results.append((path, None, str(error)))
+    return results
+
+
+def _init_worker():
+    # Spawned workers start without configured settings
+    if not apps.ready:
+        django.setup()
+
+
+def references(chunk_size):
+    """Yield chunks of (batch id, field, storage name) of stored documents."""
+    rows = Batch.objects.order_by('pk').values_list(
+        'pk', *Batch.DOCUMENT_FIELDS
+    )
+    chunk = []
+    for pk, *names in rows.iterator(chunk_size=chunk_size):
+        for field, name in zip(Batch.DOCUMENT_FIELDS, names):
+            if name:
+                chunk.append((pk, field, name))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def scan(workers=None, chunk_size=None):
+    """
+    Check stored batch documents, return report dict.
+
+    The report holds numbers of scanned 'files' and 'references', and
+    lists of 'missing' and 'invalid' references ({'batch', 'field',
+    'name'} plus 'type' or 'error' of invalid ones) and of 'orphans'
+    (storage names). Workers is the number of sniffing processes
+    (settings.MEDIA_SCAN_WORKERS by default), 0 sniffs in the calling
+    process.
+    """
+    if workers is None:
+        workers = settings.MEDIA_SCAN_WORKERS
+    chunk_size = chunk_size or settings.MEDIA_SCAN_CHUNK_SIZE
+    storage = get_document_storage()
+    location = storage.location
+    files = walk(
+        location, [settings.COA_DIR, settings.COLOR_DIR],
+        skip=[os.path.join(location, settings.DOCUMENT_BLOB_DIR)]
+    )
+    orphans = set(files)
+    report = {'files': len(files), 'references': 0, 'missing': [],
+              'invalid': [], 'orphans': []}
+    executor = (ProcessPoolExecutor(workers, initializer=_init_worker)
+                if workers else None)
+    # Older results are collected while later chunks are submitted
+    pending = deque()
+    limit = max(workers, 1) * 2
+
+    def collect():
+        found, results = pending.popleft()
+        if executor:
+            results = results.result()
+        for path, file_type, error in results:
+            if error is None and file_type in settings.VALID_FILE_TYPES:
+                continue
+            for document in found[path]:
+                if error is None:
+                    document['type'] = file_type
+                else:
+                    document['error'] = error
+                report['invalid'].append(document)
+
+    try:
+        for chunk in references(chunk_size):
+            report['references'] += len(chunk)
+            found = {}
+            for pk, field, name in chunk:
+                orphans.discard(name)
+                # Names outside scanned directories are checked directly
+                if name in files or os.path.isfile(storage.path(name)):
+                    found.setdefault(storage.path(name), []).append(
+                        {'batch': pk, 'field': field, 'name': name}
+                    )
+                else:
+                    report['missing'].append(
+                        {'batch': pk, 'field': field, 'name': name}
+                    )
+            if executor:
+                pending.append((found, executor.submit(sniff, list(found))))
+            else:
+                pending.append((found, sniff(list(found))))
+            while len(pending) >= limit:
+                collect()
+        while pending:
+            collect()
+    finally:
+        if executor:
+            # Queued sniffs are not needed after an error
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown()
+    report['orphans'] = sorted(orphans)
+    for key in ('missing', 'invalid'):
+        report[key].sort(key=lambda document: (document['batch'],
+                                               document['field']))
+    return report
@@ -0,0 +1,182 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+
+from products.models import Product, Supplier
+from quality.ingestion import ingest_readings
+from quality.models import Batch, ColorData
+
+
+class Command(BaseCommand):
+    help = ('Measure color data throughput of concurrent ingestion and '
+            'reader threads against the configured database. Benchmark '
+            'data is removed afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writers', type=int, default=4,
+            help='Number of concurrent writer threads (default 4)'
+        )
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Number of concurrent reader threads (default 4)'
+        )
+        parser.add_argument(
+            '--readings', type=int, default=2000,
+            help='Number of readings stored by each writer (default 2000)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50,
+            help='Readings per ingestion transaction (default 50)'
+        )
+
+    def handle(self, *args, **options):
+        batch = self.create_batch()
+        results = []
+        reads = []
+        writing = threading.Event()
+        writing.set()
+        try:
+            writers = [
+                threading.Thread(
+                    target=self.write,
+                    args=(batch, options, results)
+                )
+                for _ in range(options['writers'])
+            ]
+            readers = [
+                threading.Thread(
+                    target=self.read,
+                    args=(batch, writing, reads)
+                )
+                for _ in range(options['readers'])
+            ]
+            started = time.perf_counter()
+            for thread in writers + readers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            writing.clear()
+            for thread in readers:
+                thread.join()
+        finally:
+            self.remove_batch(batch)
+        created = sum(result['created'] for result in results)
+        errors = sum(result['errors'] for result in results)
+        transactions = sum(result['transactions'] for result in results)
+        self.stdout.write(f'Database: {self.describe_database()}')
+        self.stdout.write(
+            f"Writers: {options['writers']}, "
+            f"readers: {options['readers']}, "
+            f"chunk size: {options['chunk_size']}"
+        )
+        self.stdout.write(
+            f'Stored {created} readings in {elapsed:.2f} s: '
+            f'{created / elapsed:.0f} readings/s, '
+            f'{transactions / elapsed:.1f} transactions/s, '
+            f'{errors} failed transactions'
+        )
+        if readers:
+            pages = sum(result['pages'] for result in reads)
+            errors = sum(result['errors'] for result in reads)
+            self.stdout.write(
+                f'Read {pages} pages: {pages / elapsed:.0f} pages/s, '
+                f'{errors} failed reads'
+            )
+
+    def create_batch(self):
+        """Create product and batch receiving benchmark readings."""
+        supplier = Supplier.objects.create(
+            name='Benchmark', country='Benchmark', city='Benchmark'
+        )
+        product = Product.objects.create(
+            product_id=f'BENCH-{uuid.uuid4().hex[:8]}',
+            code='BENCH',
+            name='Benchmark product',
+            formula=Product.WB,
+            product_type=Product.BC,
+            supplier=supplier
+        )
+        return Batch.objects.create(
+            product=product,
+            number='BENCH',
+            size=1,
+            m_date='2022-01-01',
+            exp_date='2022-12-31'
+        )
+
+    def remove_batch(self, batch):
+        """Remove benchmark readings, batch, product and supplier."""
+        # Skip per reading delete signals, summary goes with batch
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {ColorData._meta.db_table} WHERE batch_id = %s',
+                [batch.pk]
+            )
+        product = batch.product
+        batch.delete()
+        product.delete()
+        product.supplier.delete()
+
+    def write(self, batch, options, results):
+        """Writer thread storing readings chunk by chunk."""
+        reading = {
+            'product_id': batch.product.product_id,
+            'batch': batch.number,
+            'category': ColorData.QC,
+        }
+        for name in ColorData.MEASUREMENT_FIELDS:
+            reading[name] = '0.50' if name.startswith('de') else '50.00'
+        result = {'created': 0, 'errors': 0, 'transactions': 0}
+        chunk_size = options['chunk_size']
+        try:
+            for _ in range(0, options['readings'], chunk_size):
+                try:
+                    created, _ = ingest_readings(
+                        [reading] * chunk_size, chunk_size=chunk_size
+                    )
+                except OperationalError:
+                    result['errors'] += 1
+                else:
+                    result['created'] += created
+                    result['transactions'] += 1
+        finally:
+            connections.close_all()
+            results.append(result)
+
+    def read(self, batch, writing, results):
+        """Reader thread paging readings like the admin while writing."""
+        result = {'pages': 0, 'errors': 0}
+        readings = ColorData.objects.filter(batch=batch)
+        try:
+            while writing.is_set():
+                try:
+                    readings.count()
+                    list(readings.order_by('-timestamp', '-id')[:100])
+                except OperationalError:
+                    result['errors'] += 1
+                else:
+                    result['pages'] += 1
+        finally:
+            connections.close_all()
+            results.append(result)
+
+    def describe_database(self):
+        """Return database vendor and relevant connection settings."""
+        if connection.vendor != 'sqlite':
+            max_age = connection.settings_dict['CONN_MAX_AGE']
+            return f'{connection.vendor}, CONN_MAX_AGE={max_age}'
+        values = ['sqlite']
+        with connection.cursor() as cursor:
+            for name in settings.SQLITE_PRAGMAS:
+                cursor.execute(f'PRAGMA {name}')
+                row = cursor.fetchone()
+                # In memory databases do not report mmap_size
+                if row is not None:
+                    values.append(f'{name}={row[0]}')
+        return ', '.join(values)
@@ -0,0 +1,58 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from quality import integrity
+
+
+class Command(BaseCommand):
+    help = ('Check that stored COA and color sheet files exist and have a '
+            'valid type, and find files no batch refers to.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            help='Processes sniffing file types, 0 sniffs in this process'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Documents read from the database at once'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write JSON report to file'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        report = integrity.scan(
+            workers=options['workers'], chunk_size=options['chunk_size']
+        )
+        elapsed = time.perf_counter() - started
+        for document in report['missing']:
+            self.stdout.write(
+                f"Missing {document['field']} of batch {document['batch']}: "
+                f"{document['name']}"
+            )
+        for document in report['invalid']:
+            reason = document.get('type') or document.get('error')
+            self.stdout.write(
+                f"Invalid {document['field']} of batch {document['batch']}: "
+                f"{document['name']} ({reason})"
+            )
+        for name in report['orphans']:
+            self.stdout.write(f'Orphan file: {name}')
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+        problems = sum(
+            len(report[key]) for key in ('missing', 'invalid', 'orphans')
+        )
+        style = self.style.WARNING if problems else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{report['files']} files and {report['references']} documents "
+            f"checked in {elapsed:.2f} s: {len(report['missing'])} missing, "
+            f"{len(report['invalid'])} invalid, "
+            f"{len(report['orphans'])} orphans"
+        ))
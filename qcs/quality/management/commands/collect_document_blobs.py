@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from quality.storage import ContentAddressedStorage, get_document_storage
+
+
+class Command(BaseCommand):
+    help = ('Remove document blobs no longer linked from any stored batch '
+            'document.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-period', type=int, default=3600,
+            help='Keep blobs modified within this many seconds (default 3600)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report orphan blobs'
+        )
+
+    def handle(self, *args, **options):
+        storage = get_document_storage()
+        if not isinstance(storage, ContentAddressedStorage):
+            self.stdout.write('Document storage does not keep blobs')
+            return
+        removed, freed = storage.collect_garbage(
+            grace_period=options['grace_period'],
+            dry_run=options['dry_run']
+        )
+        action = 'found' if options['dry_run'] else 'removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{removed} orphan blobs {action} ({freed} bytes)'
+        ))
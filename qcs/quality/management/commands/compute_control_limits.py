@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from products.models import Product
+from quality import spc
+
+
+class Command(BaseCommand):
+    help = ('Compute product control charts from historical color data. '
+            'Replaced charts restart monitoring of new readings.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product', action='append', default=[],
+            help='Product id, may be repeated (default all products)'
+        )
+        parser.add_argument(
+            '--min-subgroups', type=int,
+            help='Min number of batches (default settings.SPC_MIN_SUBGROUPS)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of readings fetched per query (default 2000)'
+        )
+
+    def handle(self, *args, **options):
+        products = Product.objects.order_by('pk')
+        if options['product']:
+            products = products.filter(product_id__in=options['product'])
+            if not products.exists():
+                raise CommandError('No matching products')
+        created = spc.compute_limits(
+            products.iterator(),
+            min_subgroups=options['min_subgroups'],
+            chunk_size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} control charts computed'
+        ))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from quality import tokens
+
+
+class Command(BaseCommand):
+    help = ('Issue API token of a machine client acting as user, the key '
+            'is printed once and only its digest is stored.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User the client acts as')
+        parser.add_argument(
+            '--name', required=True,
+            help='Client name, e.g. station location'
+        )
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get(
+                **{user_model.USERNAME_FIELD: options['username']}
+            )
+        except user_model.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' not found")
+        token, key = tokens.create_token(user, options['name'])
+        self.stdout.write(key)
+        self.stdout.write(self.style.SUCCESS(
+            f"Token '{token.name}' created for {options['username']}"
+        ))
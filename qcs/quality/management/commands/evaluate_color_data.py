@@ -0,0 +1,53 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quality import tolerances
+
+
+class Command(BaseCommand):
+    help = ('Evaluate color data of batches or of one day against product '
+            'color tolerances and store pass/fail results.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch', type=int, action='append', dest='batches',
+            help='Batch id to evaluate, repeatable'
+        )
+        parser.add_argument(
+            '--date',
+            help='Evaluate readings taken on date (YYYY-MM-DD), default today'
+        )
+
+    def handle(self, *args, **options):
+        if options['batches'] and options['date']:
+            raise CommandError('Use either --batch or --date')
+        if options['batches']:
+            readings = tolerances.batch_readings(options['batches'])
+        else:
+            try:
+                date = (datetime.date.fromisoformat(options['date'])
+                        if options['date'] else None)
+            except ValueError:
+                raise CommandError(f"Invalid date '{options['date']}'")
+            readings = tolerances.day_readings(date)
+        started = time.perf_counter()
+        counts = tolerances.evaluate(readings)
+        elapsed = time.perf_counter() - started
+        evaluated = counts['passed'] + counts['failed']
+        if options['batches']:
+            results = tolerances.batch_results(options['batches'])
+            for batch_id, result in results.items():
+                status = {None: 'not evaluated', True: 'passed',
+                          False: 'failed'}[result['passed']]
+                self.stdout.write(
+                    f"Batch {batch_id}: {status}, "
+                    f"{result['failed']} of {result['evaluated']} "
+                    f"readings failed"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"{evaluated} readings evaluated in {elapsed:.2f} s: "
+            f"{counts['passed']} passed, {counts['failed']} failed, "
+            f"{counts['skipped']} without tolerance"
+        ))
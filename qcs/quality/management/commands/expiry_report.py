@@ -0,0 +1,84 @@
+import csv
+import datetime
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from quality import expiry
+
+
+class Command(BaseCommand):
+    help = ('Report batches expiring (or manufactured) in a date window, '
+            'grouped by supplier and product with stock size.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.EXPIRY_REPORT_DAYS,
+            help='Window from today to days later (default '
+                 'settings.EXPIRY_REPORT_DAYS)'
+        )
+        parser.add_argument(
+            '--from', dest='start', type=datetime.date.fromisoformat,
+            help='Window start date YYYY-MM-DD, replaces --days'
+        )
+        parser.add_argument(
+            '--to', dest='end', type=datetime.date.fromisoformat,
+            help='Window end date YYYY-MM-DD, replaces --days'
+        )
+        parser.add_argument(
+            '--field', choices=expiry.DATE_FIELDS, default=expiry.EXPIRY,
+            help='Batch date field of window (default exp_date)'
+        )
+        parser.add_argument(
+            '--format', choices=['text', 'csv', 'json'], default='text',
+            help='Output format (default text)'
+        )
+
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if start is None and end is None:
+            start, end = expiry.window(options['days'])
+        if start and end and start > end:
+            raise CommandError('Window start is after its end')
+        suppliers = expiry.report(
+            expiry.batches_in_window(start, end, field=options['field'])
+        )
+        if options['format'] == 'json':
+            self.stdout.write(json.dumps(
+                {'field': options['field'], 'from': start, 'to': end,
+                 'suppliers': suppliers},
+                cls=DjangoJSONEncoder, indent=2
+            ))
+        elif options['format'] == 'csv':
+            writer = csv.writer(self.stdout)
+            writer.writerow([
+                'supplier', 'product_id', 'product', 'batches', 'stock',
+                'first_expiry', 'last_expiry'
+            ])
+            for supplier in suppliers:
+                for product in supplier['products']:
+                    writer.writerow([
+                        supplier['name'], product['product_id'],
+                        product['name'], product['batches'],
+                        product['stock'], product['first_expiry'],
+                        product['last_expiry']
+                    ])
+        else:
+            self.stdout.write(
+                f"Batches by {options['field']} from {start or '-'} "
+                f"to {end or '-'}"
+            )
+            for supplier in suppliers:
+                self.stdout.write(
+                    f"{supplier['name']}: {supplier['batches']} batches, "
+                    f"stock {supplier['stock']}"
+                )
+                for product in supplier['products']:
+                    self.stdout.write(
+                        f"  {product['product_id'] or '-'} "
+                        f"{product['name']}: {product['batches']} batches, "
+                        f"stock {product['stock']}, expiry "
+                        f"{product['first_expiry']}..{product['last_expiry']}"
+                    )
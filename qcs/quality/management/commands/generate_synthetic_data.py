@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from quality import synthetic
+
+
+class Command(BaseCommand):
+    help = ('Generate synthetic suppliers, packages, products, batches and '
+            'color data with bulk inserts for benchmarking.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', choices=list(synthetic.SIZES), default='small',
+            help='Dataset size preset (default small)'
+        )
+        for name in synthetic.SIZES['small']:
+            parser.add_argument(
+                f'--{name}', type=int,
+                help=f'Number of {name}, overrides size preset'
+            )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random generator seed (default 0)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of rows per bulk insert (default 2000)'
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            name: default if options[name] is None else options[name]
+            for name, default in synthetic.SIZES[options['size']].items()
+        }
+        started = time.perf_counter()
+        created = synthetic.generate(
+            seed=options['seed'], chunk_size=options['chunk_size'], **counts
+        )
+        elapsed = time.perf_counter() - started
+        for name, count in created.items():
+            self.stdout.write(f'{count} {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Synthetic data generated in {elapsed:.1f} s'
+        ))
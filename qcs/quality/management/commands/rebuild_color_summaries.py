@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quality import summaries
+
+
+class Command(BaseCommand):
+    help = ('Rebuild batch color summaries from ColorData in streaming '
+            'chunks, or check stored summaries for consistency.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report batches with inconsistent summaries'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of batches processed per chunk (default 2000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            inconsistent = summaries.check(chunk_size=options['chunk_size'])
+            for batch_id in inconsistent:
+                self.stdout.write(f'Batch {batch_id}: summary is inconsistent')
+            if inconsistent:
+                raise CommandError(
+                    f'{len(inconsistent)} inconsistent batch summaries'
+                )
+            self.stdout.write(self.style.SUCCESS('All summaries consistent'))
+            return
+        created = summaries.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} batch summaries rebuilt'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from qcs import search
+
+
+class Command(BaseCommand):
+    help = ('Refill the full-text search index from suppliers, products and '
+            'batches, needed after bulk changes that send no signals.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', dest='kinds',
+            choices=list(search.KINDS),
+            help='Kind of objects to index, repeatable (default all)'
+        )
+
+    def handle(self, *args, **options):
+        if search.backend() != search.FTS5:
+            self.stdout.write(
+                f'No search index to rebuild on {connection.vendor}'
+            )
+            return
+        search.rebuild(options['kinds'])
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from quality import delta_e, summaries, tolerances
+from quality.models import ColorData
+
+DE_FIELDS = ColorData.DELTA_E_FIELDS
+
+
+class Command(BaseCommand):
+    help = ('Backfill or verify stored ColorData dE values against product '
+            'color standards. Rows are processed in primary key chunks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product', type=int, help='Process only this product id'
+        )
+        parser.add_argument(
+            '--batch', type=int, help='Process only this batch id'
+        )
+        parser.add_argument(
+            '--method', choices=list(delta_e.METHODS),
+            help='Override color standard delta E method'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Number of rows loaded per chunk (default 5000)'
+        )
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only report rows with mismatching stored dE values'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.01,
+            help='Allowed difference between stored and computed dE'
+        )
+
+    def handle(self, *args, **options):
+        queryset = ColorData.objects.all()
+        if options['product']:
+            queryset = queryset.filter(batch__product_id=options['product'])
+        if options['batch']:
+            queryset = queryset.filter(batch_id=options['batch'])
+        checked = mismatched = 0
+        last_pk = 0
+        while True:
+            # Upper primary key of next chunk, keeps every query index bound
+            upper = queryset.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[options['chunk_size'] - 1:options['chunk_size']]
+            upper = upper[0] if upper else None
+            chunk = queryset.filter(pk__gt=last_pk)
+            if upper is not None:
+                chunk = chunk.filter(pk__lte=upper)
+            ids, computed, stored = chunk.delta_e_matrix(
+                method=options['method']
+            )
+            computed = np.round(computed, 2)
+            mismatch = np.any(
+                np.abs(computed - stored) > options['tolerance'], axis=1
+            )
+            checked += len(ids)
+            mismatched += int(mismatch.sum())
+            if options['verify']:
+                for pk, values in zip(ids[mismatch], computed[mismatch]):
+                    self.stdout.write(
+                        f'ColorData {pk}: computed dE '
+                        f'{" ".join(f"{value:.2f}" for value in values)}'
+                    )
+            elif mismatch.any():
+                objs = [
+                    ColorData(pk=int(pk), **{
+                        name: Decimal(f'{value:.2f}')
+                        for name, value in zip(DE_FIELDS, values)
+                    })
+                    for pk, values in zip(ids[mismatch], computed[mismatch])
+                ]
+                updated = ColorData.objects.filter(
+                    pk__in=[obj.pk for obj in objs]
+                )
+                with transaction.atomic():
+                    ColorData.objects.bulk_update(objs, DE_FIELDS)
+                    # bulk_update() sends no signals
+                    summaries.refresh(
+                        updated.values_list('batch_id', flat=True).distinct()
+                    )
+                    tolerances.evaluate(updated)
+            if upper is None:
+                break
+            last_pk = upper
+        action = 'mismatched' if options['verify'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} readings checked, {mismatched} {action}'
+        ))
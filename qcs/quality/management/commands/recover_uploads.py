@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from quality import uploads
+
+
+class Command(BaseCommand):
+    help = ('Process batch document uploads left pending or processing by a '
+            'restart and remove orphan spooled files.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-period', type=int, default=3600,
+            help='Leave uploads and spooled files updated within this many '
+                 'seconds to running workers (default 3600)'
+        )
+
+    def handle(self, *args, **options):
+        processed, failed, removed = uploads.recover(
+            grace_period=options['grace_period']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{processed} uploads processed, {failed} failed, '
+            f'{removed} spooled files removed'
+        ))
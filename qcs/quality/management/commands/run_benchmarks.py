@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quality import benchmarks
+
+
+class Command(BaseCommand):
+    help = ('Run performance benchmarks against the current database and '
+            'write JSON results, optionally compared with a baseline.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark', action='append', dest='names',
+            choices=list(benchmarks.BENCHMARKS),
+            help='Benchmark to run, repeatable (default all)'
+        )
+        parser.add_argument(
+            '--repeat', type=int,
+            help='Number of timed runs per measurement'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write JSON results to file'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON results of baseline run to compare with'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Can not read baseline: {e}')
+        kwargs = {}
+        if options['repeat']:
+            kwargs['repeat'] = options['repeat']
+        results = benchmarks.run(options['names'], **kwargs)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
+        if baseline is not None:
+            self.stdout.write(
+                f"Compared with {baseline.get('commit') or 'baseline'}:"
+            )
+            for metric, before, after, ratio in benchmarks.compare(
+                    baseline, results):
+                change = f'{ratio:.2f}x' if ratio is not None else 'n/a'
+                self.stdout.write(f'{metric}: {before} -> {after} ({change})')
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(results['benchmarks'])} benchmarks run"
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 02:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_product_product_id'),
+        ('quality', '0004_auto_20220619_1339'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColorStandard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('CIE76', 'CIE76'), ('CIE94', 'CIE94'), ('CIEDE2000', 'CIEDE2000')], default='CIEDE2000', help_text='Select delta E calculation method', max_length=9, verbose_name='Delta E method')),
+                ('l_25', models.DecimalField(decimal_places=2, help_text='Enter L25 value', max_digits=5, verbose_name='L25')),
+                ('l_45', models.DecimalField(decimal_places=2, help_text='Enter L45 value', max_digits=5, verbose_name='L45')),
+                ('l_75', models.DecimalField(decimal_places=2, help_text='Enter L75 value', max_digits=5, verbose_name='L75')),
+                ('a_25', models.DecimalField(decimal_places=2, help_text='Enter a25 value', max_digits=5, verbose_name='a25')),
+                ('a_45', models.DecimalField(decimal_places=2, help_text='Enter a45 value', max_digits=5, verbose_name='a45')),
+                ('a_75', models.DecimalField(decimal_places=2, help_text='Enter a75 value', max_digits=5, verbose_name='a75')),
+                ('b_25', models.DecimalField(decimal_places=2, help_text='Enter b25 value', max_digits=5, verbose_name='b25')),
+                ('b_45', models.DecimalField(decimal_places=2, help_text='Enter b45 value', max_digits=5, verbose_name='b45')),
+                ('b_75', models.DecimalField(decimal_places=2, help_text='Enter b75 value', max_digits=5, verbose_name='b75')),
+                ('product', models.OneToOneField(help_text='Select product', on_delete=django.db.models.deletion.CASCADE, related_name='color_standard', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'color standard',
+                'verbose_name_plural': 'color standards',
+                'ordering': ['product'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0005_colorstandard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colordata',
+            index=models.Index(fields=['-timestamp', 'batch', 'category'], name='colordata_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colordata',
+            index=models.Index(fields=['batch', 'category'], name='colordata_batch_category_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='batch',
+            constraint=models.UniqueConstraint(fields=('product', 'number'), name='unique_product_batch_number'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0006_batch_colordata_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colordata',
+            index=models.Index(fields=['-timestamp', '-id'], name='colordata_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colordata',
+            index=models.Index(fields=['batch', '-timestamp', '-id'], name='colordata_batch_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 3.2 on 2026-10-18 02:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0007_colordata_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchColorSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Number of readings')),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True, verbose_name='Last reading timestamp')),
+                ('passed', models.BooleanField(blank=True, help_text='All dE maxima within settings.BATCH_MAX_DELTA_E', null=True, verbose_name='Passed')),
+                ('sum_l_25', models.FloatField(default=0, verbose_name='L25 sum')),
+                ('min_l_25', models.FloatField(blank=True, null=True, verbose_name='L25 min')),
+                ('max_l_25', models.FloatField(blank=True, null=True, verbose_name='L25 max')),
+                ('sum_l_45', models.FloatField(default=0, verbose_name='L45 sum')),
+                ('min_l_45', models.FloatField(blank=True, null=True, verbose_name='L45 min')),
+                ('max_l_45', models.FloatField(blank=True, null=True, verbose_name='L45 max')),
+                ('sum_l_75', models.FloatField(default=0, verbose_name='L75 sum')),
+                ('min_l_75', models.FloatField(blank=True, null=True, verbose_name='L75 min')),
+                ('max_l_75', models.FloatField(blank=True, null=True, verbose_name='L75 max')),
+                ('sum_a_25', models.FloatField(default=0, verbose_name='a25 sum')),
+                ('min_a_25', models.FloatField(blank=True, null=True, verbose_name='a25 min')),
+                ('max_a_25', models.FloatField(blank=True, null=True, verbose_name='a25 max')),
+                ('sum_a_45', models.FloatField(default=0, verbose_name='a45 sum')),
+                ('min_a_45', models.FloatField(blank=True, null=True, verbose_name='a45 min')),
+                ('max_a_45', models.FloatField(blank=True, null=True, verbose_name='a45 max')),
+                ('sum_a_75', models.FloatField(default=0, verbose_name='a75 sum')),
+                ('min_a_75', models.FloatField(blank=True, null=True, verbose_name='a75 min')),
+                ('max_a_75', models.FloatField(blank=True, null=True, verbose_name='a75 max')),
+                ('sum_b_25', models.FloatField(default=0, verbose_name='b25 sum')),
+                ('min_b_25', models.FloatField(blank=True, null=True, verbose_name='b25 min')),
+                ('max_b_25', models.FloatField(blank=True, null=True, verbose_name='b25 max')),
+                ('sum_b_45', models.FloatField(default=0, verbose_name='b45 sum')),
+                ('min_b_45', models.FloatField(blank=True, null=True, verbose_name='b45 min')),
+                ('max_b_45', models.FloatField(blank=True, null=True, verbose_name='b45 max')),
+                ('sum_b_75', models.FloatField(default=0, verbose_name='b75 sum')),
+                ('min_b_75', models.FloatField(blank=True, null=True, verbose_name='b75 min')),
+                ('max_b_75', models.FloatField(blank=True, null=True, verbose_name='b75 max')),
+                ('sum_de_25', models.FloatField(default=0, verbose_name='dE25 sum')),
+                ('min_de_25', models.FloatField(blank=True, null=True, verbose_name='dE25 min')),
+                ('max_de_25', models.FloatField(blank=True, null=True, verbose_name='dE25 max')),
+                ('sum_de_45', models.FloatField(default=0, verbose_name='dE45 sum')),
+                ('min_de_45', models.FloatField(blank=True, null=True, verbose_name='dE45 min')),
+                ('max_de_45', models.FloatField(blank=True, null=True, verbose_name='dE45 max')),
+                ('sum_de_75', models.FloatField(default=0, verbose_name='dE75 sum')),
+                ('min_de_75', models.FloatField(blank=True, null=True, verbose_name='dE75 min')),
+                ('max_de_75', models.FloatField(blank=True, null=True, verbose_name='dE75 max')),
+                ('batch', models.OneToOneField(help_text='Select batch', on_delete=django.db.models.deletion.CASCADE, related_name='color_summary', to='quality.batch', verbose_name='Batch')),
+            ],
+            options={
+                'verbose_name': 'batch color summary',
+                'verbose_name_plural': 'batch color summaries',
+                'ordering': ['batch'],
+            },
+        ),
+    ]
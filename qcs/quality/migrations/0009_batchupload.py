@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 02:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0008_batchcolorsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('coa', 'Certificate of analysis'), ('color_sheet', 'Color sheet')], max_length=11, verbose_name='File field')),
+                ('original_name', models.CharField(max_length=255, verbose_name='Original file name')),
+                ('spool_path', models.CharField(blank=True, max_length=255, verbose_name='Spooled file path')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10, verbose_name='Status')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Updated')),
+                ('batch', models.ForeignKey(help_text='Select batch', on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='quality.batch', verbose_name='Batch')),
+            ],
+            options={
+                'verbose_name': 'batch upload',
+                'verbose_name_plural': 'batch uploads',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 02:34
+
+import django.core.validators
+from django.db import migrations, models
+import quality.models
+import quality.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0009_batchupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='batch',
+            name='coa',
+            field=models.FileField(blank=True, help_text='Select file to upload (pdf, jpg, jpeg, png, xls, xlsx, doc, docx)', null=True, storage=quality.storage.get_document_storage, upload_to=quality.models.coa_file_path, validators=[django.core.validators.FileExtensionValidator(['pdf', 'jpg', 'jpeg', 'png', 'xls', 'xlsx', 'doc', 'docx'], 'Invalid file extension'), quality.models.file_type_validator], verbose_name='Certificate of analysis'),
+        ),
+        migrations.AlterField(
+            model_name='batch',
+            name='color_sheet',
+            field=models.FileField(blank=True, help_text='Select file to upload (pdf, jpg, jpeg, png, xls, xlsx, doc, docx)', null=True, storage=quality.storage.get_document_storage, upload_to=quality.models.color_file_path, validators=[django.core.validators.FileExtensionValidator(['pdf', 'jpg', 'jpeg', 'png', 'xls', 'xlsx', 'doc', 'docx'], 'Invalid file extension'), quality.models.file_type_validator], verbose_name='Color sheet'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.2 on 2026-10-18 02:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_supplier_indexes'),
+        ('quality', '0010_batch_document_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ControlChart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('l_25', 'L25'), ('l_45', 'L45'), ('l_75', 'L75'), ('a_25', 'a25'), ('a_45', 'a45'), ('a_75', 'a75'), ('b_25', 'b25'), ('b_45', 'b45'), ('b_75', 'b75'), ('de_25', 'dE25'), ('de_45', 'dE45'), ('de_75', 'dE75')], max_length=5, verbose_name='Measurement field')),
+                ('center', models.FloatField(help_text='Grand mean of batch means', verbose_name='Center line')),
+                ('sigma', models.FloatField(help_text='Within batch standard deviation estimate', verbose_name='Sigma')),
+                ('mean_range', models.FloatField(help_text='Mean batch range, 0 for individuals charts', verbose_name='Mean range')),
+                ('subgroups', models.PositiveIntegerField(verbose_name='Number of batches')),
+                ('computed', models.DateTimeField(auto_now=True, verbose_name='Limits computed')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Evaluated readings')),
+                ('ewma', models.FloatField(blank=True, null=True, verbose_name='EWMA')),
+                ('cusum_high', models.FloatField(default=0, verbose_name='Upper CUSUM')),
+                ('cusum_low', models.FloatField(default=0, verbose_name='Lower CUSUM')),
+                ('recent', models.CharField(blank=True, help_text='Zones of last readings, newest last', max_length=8, verbose_name='Recent zones')),
+                ('product', models.ForeignKey(help_text='Select product', on_delete=django.db.models.deletion.CASCADE, related_name='control_charts', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'control chart',
+                'verbose_name_plural': 'control charts',
+                'ordering': ['product', 'field'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ControlViolation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(verbose_name='Reading timestamp')),
+                ('rule', models.CharField(choices=[('WE1', 'One point beyond 3 sigma'), ('WE2', 'Two of three points beyond 2 sigma'), ('WE3', 'Four of five points beyond 1 sigma'), ('WE4', 'Eight points on one side of center line'), ('EWMA', 'EWMA beyond control limits'), ('CUSUM', 'CUSUM beyond decision interval')], max_length=5, verbose_name='Rule')),
+                ('value', models.FloatField(verbose_name='Value')),
+                ('statistic', models.FloatField(help_text='Sigma distance, EWMA or CUSUM value of violation', verbose_name='Statistic')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='control_violations', to='quality.batch', verbose_name='Batch')),
+                ('chart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='violations', to='quality.controlchart', verbose_name='Control chart')),
+                ('reading', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='control_violations', to='quality.colordata', verbose_name='Color data')),
+            ],
+            options={
+                'verbose_name': 'control violation',
+                'verbose_name_plural': 'control violations',
+                'ordering': ['-timestamp', 'chart'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='controlchart',
+            constraint=models.UniqueConstraint(fields=('product', 'field'), name='unique_product_control_chart'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0011_controlchart_controlviolation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['exp_date'], name='batch_exp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['m_date'], name='batch_m_date_idx'),
+        ),
+    ]
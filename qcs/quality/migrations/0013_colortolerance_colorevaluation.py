@@ -0,0 +1,68 @@
+# Generated by Django 3.2 on 2026-10-18 02:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_supplier_indexes'),
+        ('quality', '0012_batch_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColorTolerance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_l_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum L25 value', max_digits=5, null=True, verbose_name='L25 min')),
+                ('max_l_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum L25 value', max_digits=5, null=True, verbose_name='L25 max')),
+                ('min_l_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum L45 value', max_digits=5, null=True, verbose_name='L45 min')),
+                ('max_l_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum L45 value', max_digits=5, null=True, verbose_name='L45 max')),
+                ('min_l_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum L75 value', max_digits=5, null=True, verbose_name='L75 min')),
+                ('max_l_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum L75 value', max_digits=5, null=True, verbose_name='L75 max')),
+                ('min_a_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum a25 value', max_digits=5, null=True, verbose_name='a25 min')),
+                ('max_a_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum a25 value', max_digits=5, null=True, verbose_name='a25 max')),
+                ('min_a_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum a45 value', max_digits=5, null=True, verbose_name='a45 min')),
+                ('max_a_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum a45 value', max_digits=5, null=True, verbose_name='a45 max')),
+                ('min_a_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum a75 value', max_digits=5, null=True, verbose_name='a75 min')),
+                ('max_a_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum a75 value', max_digits=5, null=True, verbose_name='a75 max')),
+                ('min_b_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum b25 value', max_digits=5, null=True, verbose_name='b25 min')),
+                ('max_b_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum b25 value', max_digits=5, null=True, verbose_name='b25 max')),
+                ('min_b_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum b45 value', max_digits=5, null=True, verbose_name='b45 min')),
+                ('max_b_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum b45 value', max_digits=5, null=True, verbose_name='b45 max')),
+                ('min_b_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter minimum b75 value', max_digits=5, null=True, verbose_name='b75 min')),
+                ('max_b_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum b75 value', max_digits=5, null=True, verbose_name='b75 max')),
+                ('max_de_25', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum dE25 value', max_digits=5, null=True, verbose_name='dE25 max')),
+                ('max_de_45', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum dE45 value', max_digits=5, null=True, verbose_name='dE45 max')),
+                ('max_de_75', models.DecimalField(blank=True, decimal_places=2, help_text='Enter maximum dE75 value', max_digits=5, null=True, verbose_name='dE75 max')),
+                ('product', models.OneToOneField(help_text='Select product', on_delete=django.db.models.deletion.CASCADE, related_name='color_tolerance', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'verbose_name': 'color tolerance',
+                'verbose_name_plural': 'color tolerances',
+                'ordering': ['product'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ColorEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('passed', models.BooleanField(verbose_name='Passed')),
+                ('reasons', models.TextField(blank=True, verbose_name='Failure reasons')),
+                ('evaluated', models.DateTimeField(auto_now=True, verbose_name='Evaluated')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='color_evaluations', to='quality.batch', verbose_name='Batch')),
+                ('reading', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation', to='quality.colordata', verbose_name='Color data')),
+            ],
+            options={
+                'verbose_name': 'color evaluation',
+                'verbose_name_plural': 'color evaluations',
+                'ordering': ['batch', 'reading'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='colorevaluation',
+            index=models.Index(fields=['batch', 'passed'], name='colorevaluation_batch_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+import sqlite3
+
+from django.db import migrations
+
+# Schema of qcs.search at this migration: searched tables with kind code
+# and text columns, rowid of FTS5 table is pk << CODE_BITS | code
+SEARCH_TABLE = 'qcs_search'
+CODE_BITS = 2
+
+KINDS = [
+    ('products_supplier', 1, ['name', 'country', 'city']),
+    ('products_product', 2, ['product_id', 'code', 'name']),
+    ('quality_batch', 3, ['number']),
+]
+
+TRIGRAM_COLUMNS = [
+    (table, column) for table, _, columns in KINDS for column in columns
+]
+
+
+def fts5_trigram():
+    try:
+        sqlite3.connect(':memory:').execute(
+            "CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='trigram')"
+        )
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote_name = schema_editor.quote_name
+    if vendor == 'sqlite' and fts5_trigram():
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            f"USING fts5(text, tokenize='trigram')"
+        )
+        # Index existing objects, later writes are synced by signals
+        for table, code, columns in KINDS:
+            text = " || ' ' || ".join(
+                f"COALESCE({quote_name(column)}, '')" for column in columns
+            )
+            schema_editor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, text) '
+                f'SELECT id << {CODE_BITS} | {code}, {text} '
+                f'FROM {quote_name(table)}'
+            )
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in TRIGRAM_COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+                f'ON {table} USING gin '
+                f'(UPPER({quote_name(column)}::text) gin_trgm_ops)'
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+    elif vendor == 'postgresql':
+        for table, column in TRIGRAM_COLUMNS:
+            schema_editor.execute(
+                f'DROP INDEX IF EXISTS {table}_{column}_trgm'
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_supplier_indexes'),
+        ('quality', '0013_colortolerance_colorevaluation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
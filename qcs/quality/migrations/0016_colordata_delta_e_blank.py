@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quality', '0015_apitoken'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='colordata',
+            name='de_25',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Enter dE25 value', max_digits=5, verbose_name='dE25'),
+        ),
+        migrations.AlterField(
+            model_name='colordata',
+            name='de_45',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Enter dE45 value', max_digits=5, verbose_name='dE45'),
+        ),
+        migrations.AlterField(
+            model_name='colordata',
+            name='de_75',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Enter dE75 value', max_digits=5, verbose_name='dE75'),
+        ),
+    ]
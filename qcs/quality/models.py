@@ -1,12 +1,18 @@
-import magic
+from decimal import Decimal
+from itertools import islice
 from pathlib import PurePath
 
+import numpy as np
 from django.db import models
+from django.db.models.functions import Cast
 from django.conf import settings
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
 
 from products.models import Product
+from . import delta_e
+from .filetypes import guess_file_type
+from .storage import get_document_storage
 
 
 def coa_file_path(instance, filename):
@@ -32,8 +38,11 @@ def color_file_path(instance, filename):
 
 
 def file_type_validator(file_obj):
-    """Certificate of analysis file type validator."""
-    file_type = magic.from_buffer(file_obj.open().read(), mime=True)
+    """Certificate of analysis file type validator.
+
+    Only the file header is sniffed, see quality.filetypes.guess_file_type().
+    """
+    file_type = guess_file_type(file_obj.open())
     if file_type not in settings.VALID_FILE_TYPES:
         raise ValidationError(
             "Invalid file type '%(file_type)s'",
@@ -45,6 +54,9 @@ def file_type_validator(file_obj):
 class Batch(models.Model):
     """Batch model."""
 
+    # Document file field names
+    DOCUMENT_FIELDS = ['coa', 'color_sheet']
+
     product = models.ForeignKey(
         Product,
         verbose_name='Product',
@@ -71,6 +83,7 @@ class Batch(models.Model):
     )
     coa = models.FileField(
         upload_to=coa_file_path,
+        storage=get_document_storage,
         verbose_name='Certificate of analysis',
         help_text=(f'Select file to upload '
                    f'({", ".join(settings.VALID_FILE_EXTENSIONS)})'),
@@ -87,6 +100,7 @@ class Batch(models.Model):
 
     color_sheet = models.FileField(
         upload_to=color_file_path,
+        storage=get_document_storage,
         verbose_name='Color sheet',
         help_text=(f'Select file to upload '
                    f'({", ".join(settings.VALID_FILE_EXTENSIONS)})'),
@@ -103,6 +117,17 @@ class Batch(models.Model):
 
     class Meta:
         ordering = ['product', 'number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'number'],
+                name='unique_product_batch_number'
+            )
+        ]
+        indexes = [
+            # Expiry and manufacturing date window range scans
+            models.Index(fields=['exp_date'], name='batch_exp_date_idx'),
+            models.Index(fields=['m_date'], name='batch_m_date_idx')
+        ]
         verbose_name = 'batch'
         verbose_name_plural = 'batches'
 
@@ -110,6 +135,168 @@ class Batch(models.Model):
         return f'{self.product} {self.number}'
 
 
+class BatchUpload(models.Model):
+    """Batch document upload processed in background model."""
+
+    # Choices constants
+    PENDING = 'PENDING'
+    PROCESSING = 'PROCESSING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+    # Batch file field choices
+    FIELD_CHOICES = [
+        ('coa', 'Certificate of analysis'),
+        ('color_sheet', 'Color sheet')
+    ]
+    # Processing status choices
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed')
+    ]
+
+    batch = models.ForeignKey(
+        Batch,
+        verbose_name='Batch',
+        help_text='Select batch',
+        related_name='uploads',
+        on_delete=models.CASCADE
+    )
+    field = models.CharField(
+        verbose_name='File field',
+        max_length=11,
+        choices=FIELD_CHOICES
+    )
+    original_name = models.CharField(
+        verbose_name='Original file name',
+        max_length=255
+    )
+    spool_path = models.CharField(
+        verbose_name='Spooled file path',
+        max_length=255,
+        blank=True
+    )
+    status = models.CharField(
+        verbose_name='Status',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    error = models.TextField(
+        verbose_name='Error',
+        blank=True
+    )
+    created = models.DateTimeField(
+        verbose_name='Created',
+        auto_now_add=True
+    )
+    updated = models.DateTimeField(
+        verbose_name='Updated',
+        auto_now=True
+    )
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'batch upload'
+        verbose_name_plural = 'batch uploads'
+
+    def __str__(self):
+        return (f'{self.batch} {self.get_field_display().lower()} '
+                f'{self.get_status_display().lower()}')
+
+
+class ColorDataQuerySet(models.QuerySet):
+    """Color data queryset with columnar NumPy export."""
+
+    def to_matrix(self, chunk_size=2000):
+        """
+        Return (batch ids, measurements) NumPy arrays sorted by batch id.
+
+        Measurements is a float64 array of shape (rows, 12), columns follow
+        ColorData.MEASUREMENT_FIELDS. Values are cast to float by database
+        and streamed in chunks, no model instances or Decimals are created.
+        """
+        fields = ColorData.MEASUREMENT_FIELDS
+        rows = self.order_by('batch_id').values_list(
+            'batch_id',
+            *[Cast(name, models.FloatField()) for name in fields]
+        ).iterator(chunk_size=chunk_size)
+        chunks = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            chunks.append(np.array(chunk, dtype=np.float64))
+        if not chunks:
+            return (np.empty(0, dtype=np.int64),
+                    np.empty((0, len(fields)), dtype=np.float64))
+        data = np.concatenate(chunks)
+        return data[:, 0].astype(np.int64), data[:, 1:]
+
+    def to_arrays(self, chunk_size=2000):
+        """
+        Return {batch id: {measurement field: float64 array}}.
+
+        Arrays are views into a single matrix built by to_matrix().
+        """
+        batch_ids, values = self.to_matrix(chunk_size=chunk_size)
+        unique_ids, starts = np.unique(batch_ids, return_index=True)
+        groups = np.split(values, starts[1:])
+        return {
+            int(batch_id): {
+                name: group[:, column]
+                for column, name in enumerate(ColorData.MEASUREMENT_FIELDS)
+            }
+            for batch_id, group in zip(unique_ids, groups)
+        }
+
+    def delta_e_matrix(self, method=None):
+        """
+        Return (ids, computed dE, stored dE) arrays ordered by id.
+
+        dE is computed from L/a/b values against the ColorStandard of the
+        batch product for each angle, arrays have shape (rows, 3) with
+        columns for 25, 45 and 75 degrees. Readings of products without
+        a standard are skipped. By default each standard's own method is
+        used, a delta_e method name overrides it.
+        """
+        fields = ColorData.MEASUREMENT_FIELDS
+        rows = list(self.filter(
+            batch__product__color_standard__isnull=False
+        ).order_by('pk').values_list(
+            'pk',
+            'batch__product_id',
+            *[Cast(name, models.FloatField()) for name in fields]
+        ))
+        if not rows:
+            empty = np.empty((0, 3), dtype=np.float64)
+            return np.empty(0, dtype=np.int64), empty, empty
+        data = np.array(rows, dtype=np.float64)
+        ids = data[:, 0].astype(np.int64)
+        product_ids = data[:, 1].astype(np.int64)
+        # (rows, angles, L/a/b)
+        samples = data[:, 2:11].reshape(-1, 3, 3).transpose(0, 2, 1)
+        stored = data[:, 11:]
+        standards = ColorStandard.objects.filter(
+            product_id__in=np.unique(product_ids).tolist()
+        ).order_by('product_id')
+        standard_ids = np.array([s.product_id for s in standards])
+        references = np.array(
+            [s.lab() for s in standards], dtype=np.float64
+        )
+        methods = np.array([method or s.method for s in standards])
+        index = np.searchsorted(standard_ids, product_ids)
+        computed = np.empty_like(stored)
+        for name in np.unique(methods):
+            mask = methods[index] == name
+            computed[mask] = delta_e.delta_e(
+                references[index[mask]], samples[mask], method=name
+            )
+        return ids, computed, stored
+
+
 class ColorData(models.Model):
     """Color data model."""
 
@@ -122,6 +309,17 @@ class ColorData(models.Model):
         ('CS', 'Batch color sheet'),
         ('QC', 'Batch panel quality inspection')
     ]
+    # Measurement field names
+    MEASUREMENT_FIELDS = [
+        'l_25', 'l_45', 'l_75', 'a_25', 'a_45', 'a_75',
+        'b_25', 'b_45', 'b_75', 'de_25', 'de_45', 'de_75'
+    ]
+    # Delta E field names, computed from product color standard if any
+    DELTA_E_FIELDS = ['de_25', 'de_45', 'de_75']
+    LAB_FIELDS = [
+        'l_25', 'l_45', 'l_75', 'a_25', 'a_45', 'a_75',
+        'b_25', 'b_45', 'b_75'
+    ]
 
     timestamp = models.DateTimeField(
         verbose_name='Timestamp',
@@ -199,19 +397,22 @@ class ColorData(models.Model):
         verbose_name='dE25',
         help_text='Enter dE25 value',
         max_digits=5,
-        decimal_places=2
+        decimal_places=2,
+        blank=True
     )
     de_45 = models.DecimalField(
         verbose_name='dE45',
         help_text='Enter dE45 value',
         max_digits=5,
-        decimal_places=2
+        decimal_places=2,
+        blank=True
     )
     de_75 = models.DecimalField(
         verbose_name='dE75',
         help_text='Enter dE75 value',
         max_digits=5,
-        decimal_places=2
+        decimal_places=2,
+        blank=True
     )
     comment = models.TextField(
         verbose_name='Comment',
@@ -219,10 +420,864 @@ class ColorData(models.Model):
         blank=True
     )
 
+    objects = ColorDataQuerySet.as_manager()
+
     class Meta:
         ordering = ['-timestamp', 'batch', 'category']
+        indexes = [
+            models.Index(
+                fields=['-timestamp', 'batch', 'category'],
+                name='colordata_timestamp_idx'
+            ),
+            models.Index(
+                fields=['batch', 'category'],
+                name='colordata_batch_category_idx'
+            ),
+            # Keyset pagination by (timestamp, id) cursor
+            models.Index(
+                fields=['-timestamp', '-id'],
+                name='colordata_cursor_idx'
+            ),
+            models.Index(
+                fields=['batch', '-timestamp', '-id'],
+                name='colordata_batch_cursor_idx'
+            )
+        ]
         verbose_name = 'color data'
         verbose_name_plural = 'color data'
 
     def __str__(self):
         return f'{self.batch} {str(self.get_category_display()).lower()}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_lab = instance._lab_values()
+        return instance
+
+    def _lab_values(self):
+        # __dict__ does not load deferred fields
+        return [self.__dict__.get(name) for name in self.LAB_FIELDS]
+
+    def _lab_decimals(self):
+        # Entered values may be str or float, loaded values are Decimal
+        return [value if value is None else Decimal(str(value))
+                for value in self._lab_values()]
+
+    def needs_delta_e(self):
+        """Return True if dE is missing or L/a/b changed since loading."""
+        if any(getattr(self, name) is None for name in self.DELTA_E_FIELDS):
+            return True
+        loaded = getattr(self, '_loaded_lab', None)
+        if loaded is None:
+            return False
+        return loaded != self._lab_decimals()
+
+    def clean(self):
+        if self.batch_id is not None and self.needs_delta_e():
+            compute_delta_e([self])
+        missing = [name for name in self.DELTA_E_FIELDS
+                   if getattr(self, name) is None]
+        if missing:
+            raise ValidationError({
+                name: 'This field is required when product has no color '
+                      'standard.'
+                for name in missing
+            })
+
+    def save(self, *args, **kwargs):
+        # Entered dE is kept unless L/a/b values changed
+        if self.needs_delta_e():
+            compute_delta_e([self])
+        super().save(*args, **kwargs)
+        self._loaded_lab = self._lab_decimals()
+
+
+class ColorStandard(models.Model):
+    """Product color reference standard model."""
+
+    # Delta E method choices
+    METHOD_CHOICES = [
+        (delta_e.CIE76, 'CIE76'),
+        (delta_e.CIE94, 'CIE94'),
+        (delta_e.CIEDE2000, 'CIEDE2000')
+    ]
+
+    product = models.OneToOneField(
+        Product,
+        verbose_name='Product',
+        help_text='Select product',
+        related_name='color_standard',
+        on_delete=models.CASCADE
+    )
+    method = models.CharField(
+        verbose_name='Delta E method',
+        help_text='Select delta E calculation method',
+        max_length=9,
+        choices=METHOD_CHOICES,
+        default=delta_e.CIEDE2000
+    )
+    l_25 = models.DecimalField(
+        verbose_name='L25',
+        help_text='Enter L25 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    l_45 = models.DecimalField(
+        verbose_name='L45',
+        help_text='Enter L45 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    l_75 = models.DecimalField(
+        verbose_name='L75',
+        help_text='Enter L75 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    a_25 = models.DecimalField(
+        verbose_name='a25',
+        help_text='Enter a25 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    a_45 = models.DecimalField(
+        verbose_name='a45',
+        help_text='Enter a45 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    a_75 = models.DecimalField(
+        verbose_name='a75',
+        help_text='Enter a75 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    b_25 = models.DecimalField(
+        verbose_name='b25',
+        help_text='Enter b25 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    b_45 = models.DecimalField(
+        verbose_name='b45',
+        help_text='Enter b45 value',
+        max_digits=5,
+        decimal_places=2
+    )
+    b_75 = models.DecimalField(
+        verbose_name='b75',
+        help_text='Enter b75 value',
+        max_digits=5,
+        decimal_places=2
+    )
+
+    class Meta:
+        ordering = ['product']
+        verbose_name = 'color standard'
+        verbose_name_plural = 'color standards'
+
+    def __str__(self):
+        return f'{self.product} color standard'
+
+    def lab(self):
+        """Return [[L, a, b], ...] reference values for 25/45/75 angles."""
+        return [
+            [float(getattr(self, f'{channel}_{angle}'))
+             for channel in ('l', 'a', 'b')]
+            for angle in ('25', '45', '75')
+        ]
+
+
+def compute_delta_e(readings):
+    """
+    Set dE of ColorData readings against their product color standard.
+
+    Standards of all reading batches are loaded with one query and dE is
+    computed in one vectorized pass per delta E method. Readings of
+    products without a standard, or with missing L/a/b values, keep their
+    dE values. Returns list of updated readings.
+    """
+    readings = [
+        reading for reading in readings
+        if reading.batch_id is not None
+        and all(getattr(reading, name) is not None
+                for name in ColorData.LAB_FIELDS)
+    ]
+    if not readings:
+        return []
+    standards = {
+        batch.pk: batch.product.color_standard
+        for batch in Batch.objects.filter(
+            pk__in={reading.batch_id for reading in readings},
+            product__color_standard__isnull=False
+        ).select_related('product__color_standard')
+    }
+    readings = [reading for reading in readings
+                if reading.batch_id in standards]
+    if not readings:
+        return []
+    # (readings, angles, L/a/b)
+    samples = np.array([
+        [[float(getattr(reading, f'{channel}_{angle}'))
+          for channel in ('l', 'a', 'b')]
+         for angle in ('25', '45', '75')]
+        for reading in readings
+    ], dtype=np.float64)
+    references = np.array(
+        [standards[reading.batch_id].lab() for reading in readings],
+        dtype=np.float64
+    )
+    methods = np.array(
+        [standards[reading.batch_id].method for reading in readings]
+    )
+    values = np.empty((len(readings), 3), dtype=np.float64)
+    for name in np.unique(methods):
+        mask = methods == name
+        values[mask] = delta_e.delta_e(
+            references[mask], samples[mask], method=name
+        )
+    for reading, row in zip(readings, values):
+        for name, value in zip(ColorData.DELTA_E_FIELDS, row):
+            setattr(reading, name, Decimal(f'{value:.2f}'))
+    return readings
+
+
+class BatchColorSummary(models.Model):
+    """
+    Batch color data summary model.
+
+    Maintained incrementally by quality.summaries from ColorData changes.
+    Per measurement field it stores running sum, min and max values as
+    sum_<field>, min_<field> and max_<field> float fields.
+    """
+
+    batch = models.OneToOneField(
+        Batch,
+        verbose_name='Batch',
+        help_text='Select batch',
+        related_name='color_summary',
+        on_delete=models.CASCADE
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Number of readings',
+        default=0
+    )
+    last_timestamp = models.DateTimeField(
+        verbose_name='Last reading timestamp',
+        blank=True,
+        null=True
+    )
+    passed = models.BooleanField(
+        verbose_name='Passed',
+        help_text='All dE maxima within settings.BATCH_MAX_DELTA_E',
+        blank=True,
+        null=True
+    )
+    sum_l_25 = models.FloatField(
+        verbose_name='L25 sum',
+        default=0
+    )
+    min_l_25 = models.FloatField(
+        verbose_name='L25 min',
+        blank=True,
+        null=True
+    )
+    max_l_25 = models.FloatField(
+        verbose_name='L25 max',
+        blank=True,
+        null=True
+    )
+    sum_l_45 = models.FloatField(
+        verbose_name='L45 sum',
+        default=0
+    )
+    min_l_45 = models.FloatField(
+        verbose_name='L45 min',
+        blank=True,
+        null=True
+    )
+    max_l_45 = models.FloatField(
+        verbose_name='L45 max',
+        blank=True,
+        null=True
+    )
+    sum_l_75 = models.FloatField(
+        verbose_name='L75 sum',
+        default=0
+    )
+    min_l_75 = models.FloatField(
+        verbose_name='L75 min',
+        blank=True,
+        null=True
+    )
+    max_l_75 = models.FloatField(
+        verbose_name='L75 max',
+        blank=True,
+        null=True
+    )
+    sum_a_25 = models.FloatField(
+        verbose_name='a25 sum',
+        default=0
+    )
+    min_a_25 = models.FloatField(
+        verbose_name='a25 min',
+        blank=True,
+        null=True
+    )
+    max_a_25 = models.FloatField(
+        verbose_name='a25 max',
+        blank=True,
+        null=True
+    )
+    sum_a_45 = models.FloatField(
+        verbose_name='a45 sum',
+        default=0
+    )
+    min_a_45 = models.FloatField(
+        verbose_name='a45 min',
+        blank=True,
+        null=True
+    )
+    max_a_45 = models.FloatField(
+        verbose_name='a45 max',
+        blank=True,
+        null=True
+    )
+    sum_a_75 = models.FloatField(
+        verbose_name='a75 sum',
+        default=0
+    )
+    min_a_75 = models.FloatField(
+        verbose_name='a75 min',
+        blank=True,
+        null=True
+    )
+    max_a_75 = models.FloatField(
+        verbose_name='a75 max',
+        blank=True,
+        null=True
+    )
+    sum_b_25 = models.FloatField(
+        verbose_name='b25 sum',
+        default=0
+    )
+    min_b_25 = models.FloatField(
+        verbose_name='b25 min',
+        blank=True,
+        null=True
+    )
+    max_b_25 = models.FloatField(
+        verbose_name='b25 max',
+        blank=True,
+        null=True
+    )
+    sum_b_45 = models.FloatField(
+        verbose_name='b45 sum',
+        default=0
+    )
+    min_b_45 = models.FloatField(
+        verbose_name='b45 min',
+        blank=True,
+        null=True
+    )
+    max_b_45 = models.FloatField(
+        verbose_name='b45 max',
+        blank=True,
+        null=True
+    )
+    sum_b_75 = models.FloatField(
+        verbose_name='b75 sum',
+        default=0
+    )
+    min_b_75 = models.FloatField(
+        verbose_name='b75 min',
+        blank=True,
+        null=True
+    )
+    max_b_75 = models.FloatField(
+        verbose_name='b75 max',
+        blank=True,
+        null=True
+    )
+    sum_de_25 = models.FloatField(
+        verbose_name='dE25 sum',
+        default=0
+    )
+    min_de_25 = models.FloatField(
+        verbose_name='dE25 min',
+        blank=True,
+        null=True
+    )
+    max_de_25 = models.FloatField(
+        verbose_name='dE25 max',
+        blank=True,
+        null=True
+    )
+    sum_de_45 = models.FloatField(
+        verbose_name='dE45 sum',
+        default=0
+    )
+    min_de_45 = models.FloatField(
+        verbose_name='dE45 min',
+        blank=True,
+        null=True
+    )
+    max_de_45 = models.FloatField(
+        verbose_name='dE45 max',
+        blank=True,
+        null=True
+    )
+    sum_de_75 = models.FloatField(
+        verbose_name='dE75 sum',
+        default=0
+    )
+    min_de_75 = models.FloatField(
+        verbose_name='dE75 min',
+        blank=True,
+        null=True
+    )
+    max_de_75 = models.FloatField(
+        verbose_name='dE75 max',
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        ordering = ['batch']
+        verbose_name = 'batch color summary'
+        verbose_name_plural = 'batch color summaries'
+
+    def __str__(self):
+        return f'{self.batch} color summary'
+
+    def mean(self, field):
+        """Return mean value of measurement field or None."""
+        if not self.count:
+            return None
+        return getattr(self, f'sum_{field}') / self.count
+
+
+class ControlChart(models.Model):
+    """
+    Product measurement field control chart model.
+
+    Control limits are computed from historical readings by quality.spc,
+    the remaining fields hold running EWMA, CUSUM and Western Electric
+    rule state updated by every new reading.
+    """
+
+    # Measurement field choices
+    FIELD_CHOICES = [
+        ('l_25', 'L25'), ('l_45', 'L45'), ('l_75', 'L75'),
+        ('a_25', 'a25'), ('a_45', 'a45'), ('a_75', 'a75'),
+        ('b_25', 'b25'), ('b_45', 'b45'), ('b_75', 'b75'),
+        ('de_25', 'dE25'), ('de_45', 'dE45'), ('de_75', 'dE75')
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        verbose_name='Product',
+        help_text='Select product',
+        related_name='control_charts',
+        on_delete=models.CASCADE
+    )
+    field = models.CharField(
+        verbose_name='Measurement field',
+        max_length=5,
+        choices=FIELD_CHOICES
+    )
+    center = models.FloatField(
+        verbose_name='Center line',
+        help_text='Grand mean of batch means'
+    )
+    sigma = models.FloatField(
+        verbose_name='Sigma',
+        help_text='Within batch standard deviation estimate'
+    )
+    mean_range = models.FloatField(
+        verbose_name='Mean range',
+        help_text='Mean batch range, 0 for individuals charts'
+    )
+    subgroups = models.PositiveIntegerField(
+        verbose_name='Number of batches'
+    )
+    computed = models.DateTimeField(
+        verbose_name='Limits computed',
+        auto_now=True
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='Evaluated readings',
+        default=0
+    )
+    ewma = models.FloatField(
+        verbose_name='EWMA',
+        blank=True,
+        null=True
+    )
+    cusum_high = models.FloatField(
+        verbose_name='Upper CUSUM',
+        default=0
+    )
+    cusum_low = models.FloatField(
+        verbose_name='Lower CUSUM',
+        default=0
+    )
+    recent = models.CharField(
+        verbose_name='Recent zones',
+        help_text='Zones of last readings, newest last',
+        max_length=8,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['product', 'field']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'field'],
+                name='unique_product_control_chart'
+            )
+        ]
+        verbose_name = 'control chart'
+        verbose_name_plural = 'control charts'
+
+    def __str__(self):
+        return f'{self.product} {self.get_field_display()} control chart'
+
+
+class ControlViolation(models.Model):
+    """Control chart rule violation by color data reading model."""
+
+    # Rule choices constants
+    WE1 = 'WE1'
+    WE2 = 'WE2'
+    WE3 = 'WE3'
+    WE4 = 'WE4'
+    EWMA = 'EWMA'
+    CUSUM = 'CUSUM'
+
+    # Rule choices
+    RULE_CHOICES = [
+        (WE1, 'One point beyond 3 sigma'),
+        (WE2, 'Two of three points beyond 2 sigma'),
+        (WE3, 'Four of five points beyond 1 sigma'),
+        (WE4, 'Eight points on one side of center line'),
+        (EWMA, 'EWMA beyond control limits'),
+        (CUSUM, 'CUSUM beyond decision interval')
+    ]
+
+    chart = models.ForeignKey(
+        ControlChart,
+        verbose_name='Control chart',
+        related_name='violations',
+        on_delete=models.CASCADE
+    )
+    batch = models.ForeignKey(
+        Batch,
+        verbose_name='Batch',
+        related_name='control_violations',
+        on_delete=models.CASCADE
+    )
+    reading = models.ForeignKey(
+        ColorData,
+        verbose_name='Color data',
+        related_name='control_violations',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True
+    )
+    timestamp = models.DateTimeField(
+        verbose_name='Reading timestamp'
+    )
+    rule = models.CharField(
+        verbose_name='Rule',
+        max_length=5,
+        choices=RULE_CHOICES
+    )
+    value = models.FloatField(
+        verbose_name='Value'
+    )
+    statistic = models.FloatField(
+        verbose_name='Statistic',
+        help_text='Sigma distance, EWMA or CUSUM value of violation'
+    )
+
+    class Meta:
+        ordering = ['-timestamp', 'chart']
+        verbose_name = 'control violation'
+        verbose_name_plural = 'control violations'
+
+    def __str__(self):
+        return f'{self.batch} {self.chart.get_field_display()} {self.rule}'
+
+
+class ColorTolerance(models.Model):
+    """
+    Product color tolerance model.
+
+    Per angle it stores maximum dE as max_de_<angle> and allowed L, a and
+    b windows as min_<field> and max_<field> decimal fields. Empty limits
+    are not checked. Readings are evaluated by quality.tolerances.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        verbose_name='Product',
+        help_text='Select product',
+        related_name='color_tolerance',
+        on_delete=models.CASCADE
+    )
+    min_l_25 = models.DecimalField(
+        verbose_name='L25 min',
+        help_text='Enter minimum L25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_l_25 = models.DecimalField(
+        verbose_name='L25 max',
+        help_text='Enter maximum L25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_l_45 = models.DecimalField(
+        verbose_name='L45 min',
+        help_text='Enter minimum L45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_l_45 = models.DecimalField(
+        verbose_name='L45 max',
+        help_text='Enter maximum L45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_l_75 = models.DecimalField(
+        verbose_name='L75 min',
+        help_text='Enter minimum L75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_l_75 = models.DecimalField(
+        verbose_name='L75 max',
+        help_text='Enter maximum L75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_a_25 = models.DecimalField(
+        verbose_name='a25 min',
+        help_text='Enter minimum a25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_a_25 = models.DecimalField(
+        verbose_name='a25 max',
+        help_text='Enter maximum a25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_a_45 = models.DecimalField(
+        verbose_name='a45 min',
+        help_text='Enter minimum a45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_a_45 = models.DecimalField(
+        verbose_name='a45 max',
+        help_text='Enter maximum a45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_a_75 = models.DecimalField(
+        verbose_name='a75 min',
+        help_text='Enter minimum a75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_a_75 = models.DecimalField(
+        verbose_name='a75 max',
+        help_text='Enter maximum a75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_b_25 = models.DecimalField(
+        verbose_name='b25 min',
+        help_text='Enter minimum b25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_b_25 = models.DecimalField(
+        verbose_name='b25 max',
+        help_text='Enter maximum b25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_b_45 = models.DecimalField(
+        verbose_name='b45 min',
+        help_text='Enter minimum b45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_b_45 = models.DecimalField(
+        verbose_name='b45 max',
+        help_text='Enter maximum b45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    min_b_75 = models.DecimalField(
+        verbose_name='b75 min',
+        help_text='Enter minimum b75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_b_75 = models.DecimalField(
+        verbose_name='b75 max',
+        help_text='Enter maximum b75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_de_25 = models.DecimalField(
+        verbose_name='dE25 max',
+        help_text='Enter maximum dE25 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_de_45 = models.DecimalField(
+        verbose_name='dE45 max',
+        help_text='Enter maximum dE45 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    max_de_75 = models.DecimalField(
+        verbose_name='dE75 max',
+        help_text='Enter maximum dE75 value',
+        max_digits=5,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        ordering = ['product']
+        verbose_name = 'color tolerance'
+        verbose_name_plural = 'color tolerances'
+
+    def __str__(self):
+        return f'{self.product} color tolerance'
+
+
+class ColorEvaluation(models.Model):
+    """Color data reading evaluation against product tolerance model."""
+
+    reading = models.OneToOneField(
+        ColorData,
+        verbose_name='Color data',
+        related_name='evaluation',
+        on_delete=models.CASCADE
+    )
+    batch = models.ForeignKey(
+        Batch,
+        verbose_name='Batch',
+        related_name='color_evaluations',
+        on_delete=models.CASCADE
+    )
+    passed = models.BooleanField(
+        verbose_name='Passed'
+    )
+    reasons = models.TextField(
+        verbose_name='Failure reasons',
+        blank=True
+    )
+    evaluated = models.DateTimeField(
+        verbose_name='Evaluated',
+        auto_now=True
+    )
+
+    class Meta:
+        ordering = ['batch', 'reading']
+        indexes = [
+            models.Index(
+                fields=['batch', 'passed'],
+                name='colorevaluation_batch_idx'
+            )
+        ]
+        verbose_name = 'color evaluation'
+        verbose_name_plural = 'color evaluations'
+
+    def __str__(self):
+        return f"{self.reading} {'passed' if self.passed else 'failed'}"
+
+
+class ApiToken(models.Model):
+    """API token of machine client (spectrophotometer station) model."""
+
+    name = models.CharField(
+        verbose_name='Name',
+        max_length=100,
+        help_text='Enter client name, e.g. station location'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name='User',
+        help_text='Client acts with permissions of this user',
+        related_name='api_tokens',
+        on_delete=models.CASCADE
+    )
+    # Only SHA-256 hex digest of token is stored
+    digest = models.CharField(
+        verbose_name='Token digest',
+        max_length=64,
+        unique=True,
+        editable=False
+    )
+    created = models.DateTimeField(
+        verbose_name='Created',
+        auto_now_add=True
+    )
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'API token'
+        verbose_name_plural = 'API tokens'
+
+    def __str__(self):
+        return f'{self.name}'
@@ -0,0 +1,66 @@
+"""
+Keyset (cursor) pagination over ColorData history.
+
+Pages are ordered by (-timestamp, -id) and the next page starts strictly
+after the last row of the previous one, so every page is an index range
+scan no matter how deep the client pages, unlike OFFSET pagination.
+"""
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+ORDERING = ['-timestamp', '-id']
+
+
+class InvalidCursor(Exception):
+    """Cursor cannot be decoded."""
+
+
+def encode_cursor(timestamp, pk):
+    """Return opaque cursor string for (timestamp, id) position."""
+    value = f'{timestamp.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(value).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, id) position decoded from cursor string."""
+    try:
+        value = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)
+        ).decode()
+        timestamp, pk = value.split('|')
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(f"Invalid cursor '{cursor}'")
+    if timestamp is None:
+        raise InvalidCursor(f"Invalid cursor '{cursor}'")
+    return timestamp, pk
+
+
+def keyset_page(queryset, cursor=None, limit=100):
+    """
+    Return (rows, next cursor) page of queryset after cursor position.
+
+    Queryset may be a values() queryset but must include 'timestamp' and
+    'id'. Next cursor is None on the last page.
+    """
+    queryset = queryset.order_by(*ORDERING)
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        # Leading range condition lets database seek in index
+        queryset = queryset.filter(timestamp__lte=timestamp).filter(
+            Q(timestamp__lt=timestamp) | Q(id__lt=pk)
+        )
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['timestamp'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.timestamp, last.pk)
+    return rows, next_cursor
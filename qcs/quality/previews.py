@@ -0,0 +1,222 @@
+"""
+Thumbnail previews of batch documents.
+
+Previews are JPEG thumbnails fitting settings.PREVIEW_SIZE, generated on
+first request: images are downscaled by Pillow (JPEG files are decoded
+directly at reduced scale), PDFs get their first page rendered by the
+pdftoppm command (settings.PREVIEW_PDF_RENDERER). Both are optional,
+documents without an available renderer have no preview.
+
+Generated previews are kept in settings.PREVIEW_CACHE_DIR under a key
+derived from document name, size and modification time, so a replaced
+document gets a new preview. The cache is bounded by
+settings.PREVIEW_CACHE_MAX_SIZE bytes: modification time of a preview is
+refreshed on every use and least recently used previews are removed once
+the cache grows over the limit. The directory sits outside MEDIA_ROOT,
+previews of confidential documents are only served by the batch preview
+view.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import PurePath
+
+from django.conf import settings
+from django.urls import reverse
+
+from .storage import get_document_storage
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+PDF_EXTENSION = '.pdf'
+CONTENT_TYPE = 'image/jpeg'
+
+# Length of key prefix versioning preview URLs
+VERSION_LENGTH = 16
+
+# Eviction removes previews until cache is below this fraction of limit
+LOW_WATERMARK = 0.9
+
+# Estimated cache size in bytes, None until first scan
+_cache_size = None
+_cache_lock = threading.Lock()
+
+
+def _render_image(source, size, output):
+    with Image.open(source) as image:
+        # JPEG decoder scales down by powers of two while decoding
+        image.draft('RGB', (size, size))
+        image.thumbnail((size, size))
+        image.convert('RGB').save(
+            output, 'JPEG', quality=settings.PREVIEW_QUALITY
+        )
+
+
+def _render_pdf(source, size, output):
+    prefix = os.path.splitext(output)[0]
+    subprocess.run(
+        [shutil.which(settings.PREVIEW_PDF_RENDERER), '-jpeg',
+         '-jpegopt', f'quality={settings.PREVIEW_QUALITY}',
+         '-f', '1', '-l', '1', '-scale-to', str(size), '-singlefile',
+         source, prefix],
+        check=True, capture_output=True,
+        timeout=settings.PREVIEW_RENDER_TIMEOUT
+    )
+    # pdftoppm adds extension to output prefix
+    os.replace(f'{prefix}.jpg', output)
+
+
+def renderer(name):
+    """Return preview render function of document name or None."""
+    extension = PurePath(name).suffix.lower()
+    if extension in IMAGE_EXTENSIONS and Image is not None:
+        return _render_image
+    if (extension == PDF_EXTENSION
+            and shutil.which(settings.PREVIEW_PDF_RENDERER)):
+        return _render_pdf
+    return None
+
+
+def preview_key(name, stat, size):
+    """Return cache key of document preview."""
+    return hashlib.sha256(
+        f'{name}:{stat.st_size}:{stat.st_mtime_ns}:{size}'.encode()
+    ).hexdigest()
+
+
+def cache_path(key):
+    """Return cached preview path of key."""
+    return os.path.join(settings.PREVIEW_CACHE_DIR, key[:2], f'{key}.jpg')
+
+
+def _entries():
+    """Return [(mtime, size, path)] of cached previews."""
+    entries = []
+    stack = [str(settings.PREVIEW_CACHE_DIR)]
+    while stack:
+        try:
+            iterator = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with iterator:
+            for entry in iterator:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    return entries
+
+
+def evict(max_size=None):
+    """
+    Remove least recently used previews while cache exceeds max_size.
+
+    Removes down to LOW_WATERMARK of max_size (settings.
+    PREVIEW_CACHE_MAX_SIZE by default), so eviction does not run on every
+    new preview. Returns (count, bytes) removed.
+    """
+    global _cache_size
+    max_size = max_size or settings.PREVIEW_CACHE_MAX_SIZE
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    if total > max_size:
+        for _, size, path in entries:
+            if total <= max_size * LOW_WATERMARK:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+            freed += size
+    with _cache_lock:
+        _cache_size = total
+    return removed, freed
+
+
+def _account(size):
+    """Add size of new preview to cache size, evict when over limit."""
+    global _cache_size
+    with _cache_lock:
+        if _cache_size is not None:
+            _cache_size += size
+        over = (_cache_size is None
+                or _cache_size > settings.PREVIEW_CACHE_MAX_SIZE)
+    if over:
+        evict()
+
+
+def get_preview(name, size=None):
+    """
+    Return (path, key) of cached preview of stored document or None.
+
+    The preview is generated on first use. None means the document does
+    not exist or can not be previewed.
+    """
+    size = size or settings.PREVIEW_SIZE
+    render = renderer(name)
+    if render is None:
+        return None
+    source = get_document_storage().path(name)
+    try:
+        stat = os.stat(source)
+    except FileNotFoundError:
+        return None
+    key = preview_key(name, stat, size)
+    path = cache_path(key)
+    try:
+        # Modification time tracks last use for eviction
+        os.utime(path)
+        return path, key
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                     suffix='.jpg')
+    os.close(fd)
+    try:
+        render(source, size, temp_path)
+        os.replace(temp_path, path)
+    except Exception:
+        logger.exception('Preview of %s failed', name)
+        return None
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    _account(os.path.getsize(path))
+    return path, key
+
+
+def preview_url(batch, field):
+    """
+    Return versioned preview URL of batch document or None.
+
+    The version changes with the document, so responses to versioned
+    URLs can be cached indefinitely.
+    """
+    name = getattr(batch, field).name
+    if not name or renderer(name) is None:
+        return None
+    try:
+        stat = os.stat(get_document_storage().path(name))
+    except FileNotFoundError:
+        return None
+    key = preview_key(name, stat, settings.PREVIEW_SIZE)
+    url = reverse('quality:batch_preview', args=[batch.pk, field])
+    return f'{url}?v={key[:VERSION_LENGTH]}'
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from products import versions
+from . import spc, summaries, tolerances
+from .models import Batch, ColorData, ColorEvaluation, ColorTolerance
+
+
+@receiver(pre_save, sender=ColorData)
+def remember_color_data(sender, instance, raw, **kwargs):
+    """Keep stored version of changed reading to subtract it later."""
+    instance._summary_previous = None
+    if instance.pk and not raw and not instance._state.adding:
+        instance._summary_previous = ColorData.objects.filter(
+            pk=instance.pk
+        ).first()
+
+
+@receiver(post_save, sender=ColorData)
+def update_color_summary(sender, instance, created, raw, **kwargs):
+    """Fold saved reading into batch color summary."""
+    if raw:
+        return
+    previous = getattr(instance, '_summary_previous', None)
+    refreshed = set()
+    if previous is not None:
+        refreshed = summaries.remove_readings([previous])
+    if instance.batch_id not in refreshed:
+        summaries.add_readings([instance])
+    if created:
+        tolerances.evaluate_new([instance])
+        if settings.SPC_INLINE:
+            spc.evaluate([instance])
+    else:
+        # Replace evaluation of changed reading
+        tolerances.evaluate(ColorData.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=ColorData)
+def remove_color_summary(sender, instance, **kwargs):
+    """Subtract deleted reading from batch color summary."""
+    summaries.remove_readings([instance])
+
+
+@receiver(post_save, sender=Batch)
+@receiver(post_delete, sender=Batch)
+def bump_catalogue_version(sender, **kwargs):
+    """Invalidate cached catalogue pages."""
+    versions.bump()
+
+
+@receiver(post_save, sender=ColorTolerance)
+def evaluate_product_readings(sender, instance, raw, **kwargs):
+    """
+    Evaluate readings of product against changed tolerance.
+
+    The product history is evaluated in chunks after the saving
+    transaction commits, not while it holds the database write lock.
+    """
+    if raw:
+        return
+    readings = ColorData.objects.filter(
+        batch__product_id=instance.product_id
+    )
+    transaction.on_commit(lambda: tolerances.evaluate(readings))
+
+
+@receiver(post_delete, sender=ColorTolerance)
+def delete_product_evaluations(sender, instance, **kwargs):
+    """Drop evaluations of product readings against deleted tolerance."""
+    ColorEvaluation.objects.filter(
+        batch__product_id=instance.product_id
+    ).delete()
@@ -0,0 +1,219 @@
+"""
+Statistical process control of color data.
+
+Control limits are computed per product and measurement field (channel
+and angle) from historical readings, with batches as rational subgroups:
+the center line is the grand mean of batch means and sigma is estimated
+from batch ranges (X-bar/R, sigma = mean of R / d2(n)). Batches of more
+than 10 readings do not contribute ranges; products whose batches all
+have a single reading get an individuals chart with sigma estimated from
+the moving range of batch means.
+
+New readings are evaluated one by one, as individual values against the
+within-batch sigma, by the Western Electric rules, a EWMA chart and a
+tabular CUSUM. Each chart keeps the state needed for
+that (EWMA, CUSUM sums, zones of the last 8 readings), so evaluation is
+O(1) per reading and never reads history. Changed or deleted readings are
+not rewound from the state; recompute limits to start monitoring afresh.
+"""
+import math
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Batch, ColorData, ControlChart, ControlViolation
+
+# Subgroup size -> d2 control chart constant
+D2 = {2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704,
+      8: 2.847, 9: 2.970, 10: 3.078}
+
+# Zone characters of points above and below center line by number of
+# sigma lines exceeded, '0' marks a point on the center line
+UPPER_ZONES = 'abcd'
+LOWER_ZONES = 'ABCD'
+RECENT_SIZE = 8
+
+STATE_FIELDS = ['count', 'ewma', 'cusum_high', 'cusum_low', 'recent']
+
+
+def estimate(batch_ids, values):
+    """
+    Return control chart parameters per measurement column.
+
+    Takes batch ids and measurements sorted by batch (see to_matrix()) and
+    returns dict of arrays: center, sigma, mean_range and subgroups.
+    """
+    unique_ids, starts, counts = np.unique(
+        batch_ids, return_index=True, return_counts=True
+    )
+    means = np.add.reduceat(values, starts) / counts[:, None]
+    ranges = (np.maximum.reduceat(values, starts)
+              - np.minimum.reduceat(values, starts))
+    center = means.mean(axis=0)
+    usable = (counts >= 2) & (counts <= max(D2))
+    if usable.any():
+        d2 = np.array([D2[n] for n in counts[usable]])
+        sigma = (ranges[usable] / d2[:, None]).mean(axis=0)
+        mean_range = ranges[usable].mean(axis=0)
+    elif len(unique_ids) >= 2:
+        sigma = np.abs(np.diff(means, axis=0)).mean(axis=0) / D2[2]
+        mean_range = np.zeros(values.shape[1])
+    else:
+        sigma = mean_range = np.zeros(values.shape[1])
+    return {
+        'center': center,
+        'sigma': sigma,
+        'mean_range': mean_range,
+        'subgroups': len(unique_ids),
+    }
+
+
+def compute_limits(products, min_subgroups=None, chunk_size=2000):
+    """
+    Compute control charts of products from their readings.
+
+    Charts are replaced, which resets their monitoring state. Products
+    with fewer than min_subgroups batches, and fields without variation,
+    get no chart. Returns number of charts created.
+    """
+    if min_subgroups is None:
+        min_subgroups = settings.SPC_MIN_SUBGROUPS
+    created = 0
+    for product in products:
+        batch_ids, values = ColorData.objects.filter(
+            batch__product=product
+        ).to_matrix(chunk_size=chunk_size)
+        charts = []
+        if len(np.unique(batch_ids)) >= min_subgroups:
+            params = estimate(batch_ids, values)
+            for column, name in enumerate(ColorData.MEASUREMENT_FIELDS):
+                if not params['sigma'][column] > 0:
+                    continue
+                charts.append(ControlChart(
+                    product=product,
+                    field=name,
+                    center=float(params['center'][column]),
+                    sigma=float(params['sigma'][column]),
+                    mean_range=float(params['mean_range'][column]),
+                    subgroups=params['subgroups']
+                ))
+        with transaction.atomic():
+            ControlChart.objects.filter(product=product).delete()
+            ControlChart.objects.bulk_create(charts)
+        created += len(charts)
+    return created
+
+
+def _zone(z):
+    """Return zone character of sigma distance."""
+    level = sum(abs(z) > limit for limit in (1, 2, 3))
+    if z > 0:
+        return UPPER_ZONES[level]
+    if z < 0:
+        return LOWER_ZONES[level]
+    return '0'
+
+
+def _count(recent, side, level):
+    """Count recent points of side zones beyond level sigma lines."""
+    return sum(1 for char in recent if char in side[level:])
+
+
+def step(chart, value):
+    """
+    Fold reading value into chart state.
+
+    Returns list of (rule, statistic) tuples of violated rules.
+    """
+    violations = []
+    z = (value - chart.center) / chart.sigma
+    zone = _zone(z)
+    recent = (chart.recent + zone)[-RECENT_SIZE:]
+    chart.count += 1
+    # Western Electric rules, current point has to take part in pattern
+    if zone != '0':
+        side = UPPER_ZONES if zone in UPPER_ZONES else LOWER_ZONES
+        level = side.index(zone)
+        if level == 3:
+            violations.append((ControlViolation.WE1, z))
+        if level >= 2 and _count(recent[-3:], side, 2) >= 2:
+            violations.append((ControlViolation.WE2, z))
+        if level >= 1 and _count(recent[-5:], side, 1) >= 4:
+            violations.append((ControlViolation.WE3, z))
+        if _count(recent, side, 0) == RECENT_SIZE:
+            violations.append((ControlViolation.WE4, z))
+    chart.recent = recent
+    # EWMA with time varying limits
+    weight = settings.SPC_EWMA_LAMBDA
+    previous = chart.center if chart.ewma is None else chart.ewma
+    chart.ewma = weight * value + (1 - weight) * previous
+    width = settings.SPC_EWMA_WIDTH * chart.sigma * math.sqrt(
+        weight / (2 - weight) * (1 - (1 - weight) ** (2 * chart.count))
+    )
+    if abs(chart.ewma - chart.center) > width:
+        violations.append((ControlViolation.EWMA, chart.ewma))
+    # Tabular CUSUM, sums restart after a signal
+    slack = settings.SPC_CUSUM_K * chart.sigma
+    interval = settings.SPC_CUSUM_H * chart.sigma
+    chart.cusum_high = max(0.0, chart.cusum_high + value - chart.center
+                           - slack)
+    chart.cusum_low = max(0.0, chart.cusum_low + chart.center - value
+                          - slack)
+    if chart.cusum_high > interval:
+        violations.append((ControlViolation.CUSUM, chart.cusum_high))
+        chart.cusum_high = 0.0
+    if chart.cusum_low > interval:
+        violations.append((ControlViolation.CUSUM, -chart.cusum_low))
+        chart.cusum_low = 0.0
+    return violations
+
+
+def evaluate(readings):
+    """
+    Evaluate new readings against control charts of their products.
+
+    Readings are processed in timestamp order, violations are stored and
+    chart state is saved. Returns list of created ControlViolation objects.
+    """
+    readings = [reading for reading in readings if reading.batch_id]
+    if not readings:
+        return []
+    batch_ids = {reading.batch_id for reading in readings}
+    violations = []
+    products = dict(
+        Batch.objects.filter(pk__in=batch_ids).order_by().values_list(
+            'pk', 'product_id'
+        )
+    )
+    # No savepoint, callers already storing readings in a transaction
+    with transaction.atomic(savepoint=False):
+        charts = {}
+        for chart in ControlChart.objects.select_for_update().filter(
+            product_id__in=set(products.values())
+        ):
+            charts.setdefault(chart.product_id, []).append(chart)
+        if not charts:
+            return []
+        readings.sort(key=lambda reading: (
+            reading.timestamp is None, reading.timestamp, reading.pk or 0
+        ))
+        for reading in readings:
+            for chart in charts.get(products.get(reading.batch_id), []):
+                value = float(getattr(reading, chart.field))
+                for rule, statistic in step(chart, value):
+                    violations.append(ControlViolation(
+                        chart=chart,
+                        batch_id=reading.batch_id,
+                        reading_id=reading.pk,
+                        timestamp=reading.timestamp,
+                        rule=rule,
+                        value=value,
+                        statistic=statistic
+                    ))
+        ControlViolation.objects.bulk_create(violations)
+        ControlChart.objects.bulk_update(
+            [chart for group in charts.values() for chart in group],
+            STATE_FIELDS
+        )
+    return violations
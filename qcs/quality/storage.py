@@ -0,0 +1,126 @@
+"""
+Content-addressed deduplicating storage for batch documents.
+
+Every saved file is hashed (SHA-256) while it is streamed into a blob
+store under settings.DOCUMENT_BLOB_DIR. The human-readable name produced
+by coa_file_path/color_file_path is then created as a hard link to that
+blob, so identical documents attached to many batches occupy disk space
+once, while names, paths and URLs behave like FileSystemStorage ones.
+
+A blob's hard link count is its reference count: blobs linked from no
+document (link count 1) are orphans removed by collect_garbage().
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import PurePath
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage hard linking documents to SHA-256 blobs."""
+
+    @property
+    def blob_location(self):
+        return os.path.join(self.location, settings.DOCUMENT_BLOB_DIR)
+
+    def blob_path(self, digest, suffix=''):
+        """Return blob path of SHA-256 hex digest."""
+        return os.path.join(
+            self.blob_location, digest[:2], digest[2:4], f'{digest}{suffix}'
+        )
+
+    def _store_blob(self, content, suffix):
+        """Stream content into blob store, return blob path."""
+        os.makedirs(self.blob_location, exist_ok=True)
+        sha256 = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.blob_location)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks(HASH_CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    sha256.update(chunk)
+                    temp_file.write(chunk)
+            blob_path = self.blob_path(sha256.hexdigest(), suffix)
+            if os.path.exists(blob_path):
+                os.remove(temp_path)
+                # Protect reused blob from concurrent garbage collection
+                os.utime(blob_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, blob_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return blob_path
+
+    def _save(self, name, content):
+        blob_path = self._store_blob(content, PurePath(name).suffix.lower())
+        while True:
+            full_path = self.path(name)
+            directory = os.path.dirname(full_path)
+            os.makedirs(directory, exist_ok=True)
+            try:
+                os.link(blob_path, full_path)
+            except FileExistsError:
+                # Name taken since get_available_name(), pick another one
+                name = self.get_available_name(name)
+                continue
+            except OSError:
+                # File system without hard links, keep a private copy
+                shutil.copyfile(blob_path, full_path)
+            break
+        return str(name).replace('\\', '/')
+
+    def digest(self, name):
+        """Return SHA-256 hex digest of stored file."""
+        sha256 = hashlib.sha256()
+        with self.open(name, 'rb') as file_obj:
+            for chunk in file_obj.chunks(HASH_CHUNK_SIZE):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def collect_garbage(self, grace_period=3600, dry_run=False):
+        """
+        Remove blobs no document links to, return (count, bytes) removed.
+
+        Blobs modified within grace_period seconds are kept, they may
+        belong to a save in progress.
+        """
+        removed = freed = 0
+        if not os.path.isdir(self.blob_location):
+            return removed, freed
+        deadline = time.time() - grace_period
+        stack = [self.blob_location]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_nlink > 1 or stat.st_mtime > deadline:
+                        continue
+                    if not dry_run:
+                        os.remove(entry.path)
+                    removed += 1
+                    freed += stat.st_size
+        return removed, freed
+
+
+def get_document_storage():
+    """Return storage of batch documents (settings.DOCUMENT_STORAGE)."""
+    return import_string(settings.DOCUMENT_STORAGE)()
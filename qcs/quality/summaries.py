@@ -0,0 +1,276 @@
+"""
+Incremental maintenance of BatchColorSummary.
+
+Inserted readings are folded into the summary with running sums and
+Least/Greatest updates executed by the database, so a summary is never
+recomputed from all of its batch readings on insert. Deleting or changing
+a reading subtracts it from the running sums; only when the removed value
+was a batch minimum/maximum (which cannot be reversed incrementally) the
+extremes of that batch are refreshed with one aggregate query.
+
+Signal handlers in quality.signals cover single object saves and deletes,
+bulk operations call add_readings()/refresh() explicitly.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, Count, DateTimeField, F, FloatField, Max, Min, Q,
+    Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, Least
+
+from .models import BatchColorSummary, ColorData
+
+FIELDS = ColorData.MEASUREMENT_FIELDS
+DE_FIELDS = ColorData.DELTA_E_FIELDS
+
+
+def _group(readings):
+    """Return {batch id: count, last timestamp, sums, minima, maxima}."""
+    if not readings:
+        return {}
+    batch_ids = np.array([reading.batch_id for reading in readings])
+    values = np.array(
+        [[getattr(reading, name) for name in FIELDS] for reading in readings],
+        dtype=np.float64
+    )
+    order = np.argsort(batch_ids, kind='stable')
+    batch_ids, values = batch_ids[order], values[order]
+    unique_ids, starts, counts = np.unique(
+        batch_ids, return_index=True, return_counts=True
+    )
+    sums = np.add.reduceat(values, starts).tolist()
+    minima = np.minimum.reduceat(values, starts).tolist()
+    maxima = np.maximum.reduceat(values, starts).tolist()
+    groups = {
+        batch_id: {
+            'count': count, 'last': None,
+            'sum': dict(zip(FIELDS, sums[row])),
+            'min': dict(zip(FIELDS, minima[row])),
+            'max': dict(zip(FIELDS, maxima[row])),
+        }
+        for row, (batch_id, count) in enumerate(
+            zip(unique_ids.tolist(), counts.tolist())
+        )
+    }
+    for reading in readings:
+        group = groups[reading.batch_id]
+        if reading.timestamp is not None and (
+            group['last'] is None or reading.timestamp > group['last']
+        ):
+            group['last'] = reading.timestamp
+    return groups
+
+
+def _update_passed(batch_ids):
+    """Set pass flag of batch summaries from their dE maxima."""
+    tolerance = settings.BATCH_MAX_DELTA_E
+    BatchColorSummary.objects.filter(batch_id__in=batch_ids).update(
+        passed=Case(
+            When(count=0, then=Value(None)),
+            When(
+                Q(**{f'max_{name}__lte': tolerance for name in DE_FIELDS}),
+                then=Value(True)
+            ),
+            default=Value(False),
+            output_field=BooleanField()
+        )
+    )
+
+
+def add_readings(readings):
+    """Fold new readings into their batch summaries."""
+    groups = _group(readings)
+    if not groups:
+        return
+    with transaction.atomic():
+        BatchColorSummary.objects.bulk_create(
+            [BatchColorSummary(batch_id=batch_id) for batch_id in groups],
+            ignore_conflicts=True
+        )
+        for batch_id, group in groups.items():
+            updates = {'count': F('count') + group['count']}
+            if group['last'] is not None:
+                last = Value(group['last'], output_field=DateTimeField())
+                updates['last_timestamp'] = Greatest(
+                    Coalesce('last_timestamp', last), last
+                )
+            for name in FIELDS:
+                minimum = Value(group['min'][name], output_field=FloatField())
+                maximum = Value(group['max'][name], output_field=FloatField())
+                updates[f'sum_{name}'] = (
+                    F(f'sum_{name}') + group['sum'][name]
+                )
+                updates[f'min_{name}'] = Least(
+                    Coalesce(f'min_{name}', minimum), minimum
+                )
+                updates[f'max_{name}'] = Greatest(
+                    Coalesce(f'max_{name}', maximum), maximum
+                )
+            BatchColorSummary.objects.filter(batch_id=batch_id).update(
+                **updates
+            )
+        _update_passed(list(groups))
+
+
+def remove_readings(readings):
+    """
+    Subtract removed readings (or old versions) from batch summaries.
+
+    Returns set of batch ids whose summaries had to be refreshed from the
+    database, those already reflect the current state of their readings.
+    """
+    groups = _group(readings)
+    if not groups:
+        return set()
+    with transaction.atomic():
+        for batch_id, group in groups.items():
+            updates = {'count': F('count') - group['count']}
+            for name in FIELDS:
+                updates[f'sum_{name}'] = (
+                    F(f'sum_{name}') - group['sum'][name]
+                )
+            BatchColorSummary.objects.filter(batch_id=batch_id).update(
+                **updates
+            )
+        stale = []
+        for summary in BatchColorSummary.objects.filter(batch_id__in=groups):
+            group = groups[summary.batch_id]
+            if summary.count <= 0 or (
+                group['last'] is not None
+                and summary.last_timestamp is not None
+                and group['last'] >= summary.last_timestamp
+            ) or any(
+                group['min'][name] <= getattr(summary, f'min_{name}')
+                or group['max'][name] >= getattr(summary, f'max_{name}')
+                for name in FIELDS
+            ):
+                stale.append(summary.batch_id)
+        if stale:
+            refresh(stale)
+        _update_passed(list(groups))
+    return set(stale)
+
+
+def aggregate(queryset=None):
+    """
+    Return values queryset of exact summary values grouped by batch.
+
+    Rows are dicts with 'batch_id' and BatchColorSummary field names.
+    """
+    if queryset is None:
+        queryset = ColorData.objects.all()
+    annotations = {'count': Count('id'), 'last_timestamp': Max('timestamp')}
+    for name in FIELDS:
+        value = Cast(name, FloatField())
+        annotations[f'sum_{name}'] = Sum(value)
+        annotations[f'min_{name}'] = Min(value)
+        annotations[f'max_{name}'] = Max(value)
+    return queryset.order_by('batch_id').values('batch_id').annotate(
+        **annotations
+    )
+
+
+def _empty_summary(batch_id):
+    """Return summary of batch without readings."""
+    summary = BatchColorSummary(batch_id=batch_id)
+    for name in FIELDS:
+        setattr(summary, f'sum_{name}', 0)
+    return summary
+
+
+def refresh(batch_ids):
+    """Recompute summaries of given batches exactly from their readings."""
+    batch_ids = set(batch_ids)
+    if not batch_ids:
+        return
+    summaries = {
+        batch_id: _empty_summary(batch_id) for batch_id in batch_ids
+    }
+    for row in aggregate(ColorData.objects.filter(batch_id__in=batch_ids)):
+        summaries[row['batch_id']] = BatchColorSummary(**row)
+    update_fields = [
+        field.name for field in BatchColorSummary._meta.concrete_fields
+        if field.name not in ('id', 'batch', 'passed')
+    ]
+    with transaction.atomic():
+        existing = dict(
+            BatchColorSummary.objects.filter(
+                batch_id__in=batch_ids
+            ).values_list('batch_id', 'pk')
+        )
+        for batch_id, summary in summaries.items():
+            summary.pk = existing.get(batch_id)
+        BatchColorSummary.objects.bulk_create(
+            [summary for summary in summaries.values() if summary.pk is None]
+        )
+        BatchColorSummary.objects.bulk_update(
+            [summary for summary in summaries.values()
+             if summary.pk is not None],
+            update_fields
+        )
+        _update_passed(batch_ids)
+
+
+def rebuild(chunk_size=2000):
+    """Rebuild all summaries from scratch, streaming grouped aggregates."""
+    created = 0
+    with transaction.atomic():
+        BatchColorSummary.objects.all().delete()
+        chunk = []
+        for row in aggregate().iterator(chunk_size=chunk_size):
+            chunk.append(BatchColorSummary(**row))
+            if len(chunk) >= chunk_size:
+                BatchColorSummary.objects.bulk_create(chunk)
+                created += len(chunk)
+                chunk = []
+        BatchColorSummary.objects.bulk_create(chunk)
+        created += len(chunk)
+        _update_passed(BatchColorSummary.objects.values('batch_id'))
+    return created
+
+
+def _differs(stored, expected, tolerance):
+    """Return True if stored value differs from expected one."""
+    if stored is None or expected is None:
+        return stored != expected
+    if isinstance(expected, float):
+        return abs(stored - expected) > tolerance * max(1.0, abs(expected))
+    return stored != expected
+
+
+def check(chunk_size=2000, tolerance=1e-6):
+    """Return ids of batches whose stored summary differs from readings."""
+    inconsistent = []
+    chunk = []
+
+    def compare(rows):
+        stored = {
+            summary.batch_id: summary
+            for summary in BatchColorSummary.objects.filter(
+                batch_id__in=[row['batch_id'] for row in rows]
+            )
+        }
+        for row in rows:
+            summary = stored.get(row['batch_id'])
+            if summary is None or any(
+                _differs(getattr(summary, key), value, tolerance)
+                for key, value in row.items()
+            ):
+                inconsistent.append(row['batch_id'])
+
+    for row in aggregate().iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            compare(chunk)
+            chunk = []
+    if chunk:
+        compare(chunk)
+    # Summaries still counting readings of batches without any
+    inconsistent.extend(
+        BatchColorSummary.objects.filter(count__gt=0).exclude(
+            batch_id__in=ColorData.objects.values('batch_id')
+        ).values_list('batch_id', flat=True)
+    )
+    return sorted(inconsistent)
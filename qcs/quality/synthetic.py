@@ -0,0 +1,227 @@
+"""
+Synthetic catalogue and color data for benchmarks.
+
+Rows are generated from a seeded random generator and stored with
+bulk_create in chunks, so millions of readings take minutes instead of
+hours. Every product gets a base color and its readings scatter
+around it. Readings are timestamped on the manufacturing date of their
+batch, spread over about three years. bulk_create stores the insert time
+in the auto_now_add timestamp field, so timestamps are set afterwards
+with one update() per manufacturing date.
+
+bulk_create sends no signals. After generation, batch color summaries
+and the search index are rebuilt, cached choice lists dropped and the
+catalogue version is bumped. Control charts are left to compute_control_limits.
+"""
+import datetime
+import random
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from products import catalogue, versions
+from qcs import search
+from products.models import Package, Product, Supplier
+from . import summaries
+from .models import Batch, ColorData
+
+# Preset name -> dataset size
+SIZES = {
+    'small': {
+        'suppliers': 10, 'products': 200, 'batches': 2000,
+        'readings': 20000,
+    },
+    'medium': {
+        'suppliers': 20, 'products': 2000, 'batches': 50000,
+        'readings': 500000,
+    },
+    'large': {
+        'suppliers': 50, 'products': 5000, 'batches': 200000,
+        'readings': 2000000,
+    },
+}
+
+PACKAGE_SIZES = [1, 5, 20, 200, 1000]
+
+COUNTRIES = [
+    ('Germany', 'Stuttgart'), ('France', 'Lyon'), ('Italy', 'Turin'),
+    ('Poland', 'Wroclaw'), ('USA', 'Detroit'), ('Japan', 'Nagoya'),
+]
+
+ANGLES = ('25', '45', '75')
+
+# Product id prefix of generated products
+PREFIX = 'SYN'
+
+
+def _bulk_create(model, objects, chunk_size):
+    """Store objects in chunks, return number of stored objects."""
+    created = 0
+    chunk = []
+    for obj in objects:
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            model.objects.bulk_create(chunk)
+            created += len(chunk)
+            chunk = []
+    model.objects.bulk_create(chunk)
+    return created + len(chunk)
+
+
+def _decimal(value):
+    return Decimal(f'{value:.2f}')
+
+
+def _packages():
+    """Return packages of every type, unit and size, created if missing."""
+    existing = set(Package.objects.values_list('package_type', 'uom', 'size'))
+    Package.objects.bulk_create([
+        Package(package_type=package_type, uom=uom, size=size)
+        for package_type, _ in Package.PKG_TYPE_CHOICES
+        for uom, _ in Package.UOM_CHOICES
+        for size in PACKAGE_SIZES
+        if (package_type, uom, size) not in existing
+    ])
+    return list(Package.objects.values_list('id', flat=True))
+
+
+def generate_catalogue(rng, run, suppliers, products, chunk_size):
+    """Create suppliers and products, return {product pk: base color}."""
+    _bulk_create(Supplier, (
+        Supplier(
+            name=f'{PREFIX} {run} supplier {index}',
+            country=COUNTRIES[index % len(COUNTRIES)][0],
+            city=COUNTRIES[index % len(COUNTRIES)][1]
+        )
+        for index in range(suppliers)
+    ), chunk_size)
+    supplier_ids = list(Supplier.objects.filter(
+        name__startswith=f'{PREFIX} {run} '
+    ).values_list('id', flat=True))
+    package_ids = _packages()
+    formulas = [choice for choice, _ in Product.FORMULA_CHOICES]
+    types = [choice for choice, _ in Product.TYPE_CHOICES]
+    _bulk_create(Product, (
+        Product(
+            product_id=f'{PREFIX}-{run}-{index:06d}',
+            code=f'{rng.randint(100, 999)}-{rng.randint(1, 9)}',
+            name=f'synthetic {rng.choice(types).lower()} {index}',
+            formula=rng.choice(formulas),
+            product_type=rng.choice(types),
+            supplier_id=rng.choice(supplier_ids),
+            package_id=rng.choice(package_ids)
+        )
+        for index in range(products)
+    ), chunk_size)
+    # Base L, a, b of every product
+    return {
+        pk: (rng.uniform(30, 80), rng.uniform(-40, 40),
+             rng.uniform(-40, 40))
+        for pk in Product.objects.filter(
+            product_id__startswith=f'{PREFIX}-{run}-'
+        ).values_list('id', flat=True)
+    }
+
+
+def generate_batches(rng, run, colors, batches, chunk_size):
+    """Create batches of products, return [(batch pk, product pk, date)]."""
+    product_ids = list(colors)
+    start = datetime.date(2020, 1, 1)
+
+    def generate():
+        for index in range(batches):
+            m_date = start + datetime.timedelta(days=rng.randrange(1000))
+            yield Batch(
+                product_id=rng.choice(product_ids),
+                number=f'{PREFIX}{run}-{index:07d}',
+                size=rng.choice([500, 1000, 3500, 10000, 20000]),
+                m_date=m_date,
+                exp_date=m_date + datetime.timedelta(
+                    days=rng.choice([180, 365, 730])
+                )
+            )
+
+    _bulk_create(Batch, generate(), chunk_size)
+    return list(Batch.objects.filter(
+        number__startswith=f'{PREFIX}{run}-'
+    ).order_by('id').values_list('id', 'product_id', 'm_date'))
+
+
+def generate_readings(rng, colors, batches, readings, chunk_size):
+    """Create readings spread evenly over batches, return created."""
+    per_batch, extra = divmod(readings, max(len(batches), 1))
+    categories = [ColorData.QC] * 3 + [ColorData.CS]
+
+    def generate():
+        for position, (batch_id, product_id, m_date) in enumerate(batches):
+            count = per_batch + (position < extra)
+            l, a, b = colors[product_id]
+            # Batch shade offset from product color
+            l += rng.gauss(0, 0.5)
+            a += rng.gauss(0, 0.3)
+            b += rng.gauss(0, 0.3)
+            for _ in range(count):
+                values = {}
+                # Lightness drops from near specular to flop angle
+                for angle, flop in zip(ANGLES, (5, 0, -10)):
+                    dl = rng.gauss(0, 0.3)
+                    da = rng.gauss(0, 0.2)
+                    db = rng.gauss(0, 0.2)
+                    values[f'l_{angle}'] = _decimal(l + flop + dl)
+                    values[f'a_{angle}'] = _decimal(a + da)
+                    values[f'b_{angle}'] = _decimal(b + db)
+                    values[f'de_{angle}'] = _decimal(
+                        (dl * dl + da * da + db * db) ** 0.5
+                    )
+                yield ColorData(
+                    batch_id=batch_id,
+                    category=rng.choice(categories),
+                    **values
+                )
+
+    created = _bulk_create(ColorData, generate(), chunk_size)
+    dates = {}
+    for batch_id, _, m_date in batches:
+        dates.setdefault(m_date, []).append(batch_id)
+    for m_date, batch_ids in sorted(dates.items()):
+        timestamp = timezone.make_aware(
+            datetime.datetime.combine(m_date, datetime.time(8))
+        )
+        for start in range(0, len(batch_ids), chunk_size):
+            ColorData.objects.filter(
+                batch_id__in=batch_ids[start:start + chunk_size]
+            ).update(timestamp=timestamp)
+    return created
+
+
+def generate(suppliers, products, batches, readings, seed=0,
+             chunk_size=2000):
+    """
+    Generate synthetic dataset, return {model name: created rows}.
+
+    Values depend on seed only. Names of generated rows carry a random
+    per run tag, so repeated runs add data next to previous ones instead
+    of colliding with them.
+    """
+    rng = random.Random(seed)
+    run = uuid.uuid4().hex[:6]
+    with transaction.atomic():
+        colors = generate_catalogue(rng, run, suppliers, products,
+                                    chunk_size)
+        stored = generate_batches(rng, run, colors, batches, chunk_size)
+        created = generate_readings(rng, colors, stored, readings,
+                                    chunk_size)
+    summaries.rebuild(chunk_size=chunk_size)
+    search.rebuild()
+    # Only choice lists change, pk None drops no cached object
+    for model in (Supplier, Package, Product):
+        catalogue.invalidate(model, None)
+    versions.bump(versions.CATALOGUE)
+    return {
+        'suppliers': suppliers,
+        'products': len(colors),
+        'batches': len(stored),
+        'readings': created,
+    }
@@ -0,0 +1,5 @@
+import logging
+
+# Requests sampled by the metrics middleware stay out of test output,
+# RequestMetricsTest captures its records with assertLogs()
+logging.getLogger('qcs.requests').setLevel(logging.WARNING)
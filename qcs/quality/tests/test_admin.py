@@ -0,0 +1,106 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from products.models import Product, Supplier, Package
+from ..models import Batch, ColorData, ColorStandard
+
+
+class AdminChangelistQueryCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.package = Package.objects.create(
+            package_type='TOTE',
+            uom='KG',
+            size=1000
+        )
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.user = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+
+    def setUp(self):
+        self.client.force_login(AdminChangelistQueryCountTest.user)
+
+    def create_rows(self, start, stop):
+        """Create product, batch, color data and standard per index."""
+        for index in range(start, stop):
+            product = Product.objects.create(
+                product_id=f'YZR{index}',
+                code=f'234-{index}',
+                name=f'some base coat {index}',
+                formula='WB',
+                product_type='BC',
+                supplier=AdminChangelistQueryCountTest.supplier,
+                package=AdminChangelistQueryCountTest.package
+            )
+            batch = Batch.objects.create(
+                product=product,
+                number=f'bx{index}',
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            ColorData.objects.create(
+                batch=batch,
+                category='CS',
+                **{name: 1 for name in ColorData.MEASUREMENT_FIELDS}
+            )
+            ColorStandard.objects.create(
+                product=product,
+                **{f'{channel}_{angle}': 1
+                   for channel in 'lab' for angle in ('25', '45', '75')}
+            )
+
+    def count_queries(self, url):
+        """Return number of queries executed to render url."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelist_query_count(self):
+        """Test changelist query count does not depend on number of rows."""
+        # Prepare test data
+        urls = [
+            reverse('admin:quality_batch_changelist'),
+            reverse('admin:quality_colordata_changelist'),
+            reverse('admin:quality_colorstandard_changelist'),
+            reverse('admin:products_product_changelist'),
+        ]
+        self.create_rows(0, 2)
+        query_counts = {url: self.count_queries(url) for url in urls}
+        self.create_rows(2, 20)
+        # Run test
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url),
+                    query_counts[url],
+                    f'Number of queries grows with number of rows on {url}'
+                )
+
+    def test_autocomplete_fields(self):
+        """Test foreign key fields use autocomplete widgets."""
+        # Prepare test data
+        self.create_rows(0, 1)
+        urls = {
+            reverse('admin:quality_batch_add'): 'product',
+            reverse('admin:quality_colordata_add'): 'batch',
+            reverse('admin:products_product_add'): 'supplier',
+        }
+        # Run test
+        for url, field in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, f'id="id_{field}"')
+                self.assertContains(response, 'admin-autocomplete')
@@ -0,0 +1,121 @@
+import datetime
+import statistics
+
+import numpy as np
+from django.test import TestCase
+
+from products.models import Product, Supplier, Package
+from ..models import Batch, ColorData
+from ..analytics import angle_statistics, batch_statistics
+
+
+class ColorDataAnalyticsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.package = Package.objects.create(
+            package_type='TOTE',
+            uom='KG',
+            size=1000
+        )
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier,
+            package=cls.package
+        )
+        cls.batches = [
+            Batch.objects.create(
+                product=cls.product,
+                number=number,
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            for number in ('bx123', 'bx124', 'bx125')
+        ]
+        # Batch index -> list of L25 values, other fields derived from it
+        cls.l_25_values = {0: [50.5, 51.5, 49.0], 1: [60.0, 62.5], 2: [70.0]}
+        for index, values in cls.l_25_values.items():
+            for value in values:
+                ColorData.objects.create(
+                    batch=cls.batches[index],
+                    category='QC',
+                    **{
+                        name: value / 10 if name.startswith('de') else value
+                        for name in ColorData.MEASUREMENT_FIELDS
+                    }
+                )
+
+    def test_to_arrays(self):
+        """Test to_arrays() returns float64 arrays per batch and field."""
+        arrays = ColorData.objects.to_arrays()
+        self.assertCountEqual(
+            arrays,
+            [batch.pk for batch in ColorDataAnalyticsTest.batches],
+            'Incorrect batch ids'
+        )
+        for index, values in ColorDataAnalyticsTest.l_25_values.items():
+            batch_arrays = arrays[ColorDataAnalyticsTest.batches[index].pk]
+            with self.subTest(batch=index):
+                self.assertCountEqual(
+                    batch_arrays, ColorData.MEASUREMENT_FIELDS,
+                    'Incorrect measurement fields'
+                )
+                self.assertEqual(batch_arrays['l_25'].dtype, np.float64)
+                self.assertCountEqual(batch_arrays['l_75'], values)
+                self.assertCountEqual(
+                    batch_arrays['de_45'], [value / 10 for value in values]
+                )
+
+    def test_to_arrays_filtered(self):
+        """Test to_arrays() respects queryset filters."""
+        batch = ColorDataAnalyticsTest.batches[1]
+        arrays = ColorData.objects.filter(batch=batch).to_arrays()
+        self.assertEqual(list(arrays), [batch.pk])
+        self.assertEqual(ColorData.objects.none().to_arrays(), {})
+
+    def test_batch_statistics(self):
+        """Test per batch statistics match reference implementation."""
+        stats = batch_statistics(*ColorData.objects.to_matrix())
+        column = ColorData.MEASUREMENT_FIELDS.index('l_25')
+        for index, values in ColorDataAnalyticsTest.l_25_values.items():
+            row = list(stats['batch_id']).index(
+                ColorDataAnalyticsTest.batches[index].pk
+            )
+            with self.subTest(batch=index):
+                self.assertEqual(stats['count'][row], len(values))
+                self.assertAlmostEqual(
+                    stats['mean'][row, column], statistics.mean(values)
+                )
+                self.assertEqual(stats['min'][row, column], min(values))
+                self.assertEqual(stats['max'][row, column], max(values))
+                self.assertAlmostEqual(
+                    stats['p50'][row, column], statistics.median(values)
+                )
+                if len(values) > 1:
+                    self.assertAlmostEqual(
+                        stats['std'][row, column], statistics.stdev(values)
+                    )
+                else:
+                    self.assertTrue(np.isnan(stats['std'][row, column]))
+
+    def test_angle_statistics(self):
+        """Test angle_statistics() selects columns of one angle."""
+        stats = batch_statistics(*ColorData.objects.to_matrix())
+        angle_stats = angle_statistics(stats, '45')
+        self.assertCountEqual(angle_stats['mean'], ['l', 'a', 'b', 'de'])
+        np.testing.assert_array_equal(
+            angle_stats['max']['de'],
+            stats['max'][:, ColorData.MEASUREMENT_FIELDS.index('de_45')]
+        )
+        with self.assertRaises(ValueError):
+            angle_statistics(stats, '60')
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from products.models import Product, Supplier
+from .. import synthetic
+from ..models import Batch, BatchColorSummary, ColorData
+
+
+class SyntheticDataTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.created = synthetic.generate(
+            suppliers=2, products=5, batches=10, readings=45, chunk_size=7
+        )
+
+    def test_generate(self):
+        """Test generated dataset size and summaries."""
+        self.assertEqual(SyntheticDataTest.created, {
+            'suppliers': 2, 'products': 5, 'batches': 10, 'readings': 45
+        })
+        self.assertEqual(Supplier.objects.count(), 2)
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertEqual(Batch.objects.count(), 10)
+        self.assertEqual(ColorData.objects.count(), 45)
+        self.assertEqual(BatchColorSummary.objects.count(), 10)
+        # Readings are spread evenly, timestamped on manufacturing date
+        self.assertEqual(
+            sorted(BatchColorSummary.objects.values_list('count', flat=True)),
+            [4] * 5 + [5] * 5
+        )
+        self.assertGreater(
+            ColorData.objects.values('timestamp').distinct().count(), 5
+        )
+        for reading in ColorData.objects.select_related('batch'):
+            self.assertEqual(
+                timezone.localtime(reading.timestamp).date(),
+                reading.batch.m_date
+            )
+        self.assertTrue(
+            ColorData._meta.get_field('timestamp').auto_now_add
+        )
+
+    def test_benchmarks(self):
+        """Test benchmark command writes results and compares them."""
+        readings = ColorData.objects.count()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command('run_benchmarks', '--repeat', '1', '--output', path,
+                         stdout=StringIO())
+            with open(path) as f:
+                results = json.load(f)
+            self.assertEqual(results['dataset']['quality.colordata'], 45)
+            self.assertEqual(
+                list(results['benchmarks']),
+                ['admin_changelist', 'ingestion', 'export',
+                 'upload_validation']
+            )
+            self.assertEqual(results['benchmarks']['export']['csv']['rows'],
+                             45)
+            self.assertEqual(
+                set(results['benchmarks']['upload_validation']),
+                {'pdf', 'png', 'jpg', 'xlsx', 'docx'}
+            )
+            out = StringIO()
+            call_command('run_benchmarks', '--repeat', '1',
+                         '--benchmark', 'ingestion', '--compare', path,
+                         stdout=out)
+        self.assertIn('ingestion.readings: 2000 -> 2000 (1.00x)',
+                      out.getvalue())
+        # Ingested readings are rolled back
+        self.assertEqual(ColorData.objects.count(), readings)
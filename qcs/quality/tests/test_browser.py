@@ -0,0 +1,117 @@
+import datetime
+
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from products import catalogue
+from products.models import Product, Supplier
+from ..ingestion import ingest_readings
+from ..models import Batch
+from .test_ingestion import make_reading
+
+
+class BatchBrowserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=Supplier.objects.create(
+                name='Company',
+                country='Country',
+                city='City'
+            )
+        )
+        cls.batches = [
+            Batch.objects.create(
+                product=cls.product,
+                number=f'bx12{month}',
+                size=3500,
+                m_date=datetime.date(2022, 1, 31),
+                exp_date=datetime.date(2022, month, 28)
+            )
+            for month in (3, 6, 9)
+        ]
+        ingest_readings([make_reading(batch='bx123') for _ in range(3)])
+        cls.user = User.objects.create_user('reviewer', password='pass')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_batch')
+        )
+
+    def setUp(self):
+        cache.clear()
+        catalogue.supplier_choices()
+        self.client.force_login(BatchBrowserTest.user)
+
+    def test_expiry_window(self):
+        """Test batch list filters by expiry window."""
+        url = reverse('quality:batch_list')
+        # Filter params -> expected batch numbers
+        cases = [
+            ({}, ['bx123', 'bx126', 'bx129']),
+            ({'expires_from': '2022-04-01'}, ['bx126', 'bx129']),
+            ({'expires_to': '2022-06-28'}, ['bx123', 'bx126']),
+            ({'expires_from': '2022-04-01', 'expires_to': '2022-07-01',
+              'formula': 'WB'}, ['bx126']),
+            ({'formula': 'SB'}, []),
+        ]
+        for params, numbers in cases:
+            with self.subTest(params=params):
+                # Session, user, two permission queries, batch count and
+                # batch page, supplier choices are cached
+                with self.assertNumQueries(6 if numbers else 5):
+                    response = self.client.get(url, params)
+                self.assertEqual(
+                    [batch.number for batch in response.context['page']],
+                    numbers
+                )
+
+    def test_batch_detail(self):
+        """Test batch page lists readings counted by summary."""
+        url = reverse('quality:batch_detail',
+                      args=[BatchBrowserTest.batches[0].pk])
+        # Session, user, two permission queries, summary version, batch
+        # with summary and reading page
+        with self.assertNumQueries(7):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['page']), 3)
+        self.assertContains(response, 'Station 1', count=3)
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_reading_changes_batch_page(self):
+        """Test ingested reading invalidates batch page."""
+        url = reverse('quality:batch_detail',
+                      args=[BatchBrowserTest.batches[0].pk])
+        etag = self.client.get(url)['ETag']
+        ingest_readings([make_reading(batch='bx123')])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page']), 4)
+
+    def test_permissions(self):
+        """Test pages require login and view batch permission."""
+        urls = [
+            reverse('quality:batch_list'),
+            reverse('quality:batch_detail',
+                    args=[BatchBrowserTest.batches[0].pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.client.force_login(User.objects.get_or_create(
+                    username='nobody'
+                )[0])
+                self.assertEqual(self.client.get(url).status_code, 403)
+                self.client.logout()
+                self.assertRedirects(
+                    self.client.get(url), f"{reverse('login')}?next={url}"
+                )
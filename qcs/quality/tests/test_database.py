@@ -0,0 +1,114 @@
+import re
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from qcs import database
+from products.models import Product
+from ..models import Batch
+
+
+class DatabaseSettingsTest(TestCase):
+    def test_sqlite(self):
+        """Test SQLite is default engine."""
+        settings = database.database_settings(Path('/srv'), {})
+        self.assertEqual(settings['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(settings['NAME'], Path('/srv/db.sqlite3'))
+        self.assertEqual(settings['OPTIONS'], {'timeout': 20})
+
+    def test_postgresql(self):
+        """Test PostgreSQL settings with persistent connections."""
+        environ = {
+            'QCS_DB_ENGINE': 'postgresql',
+            'QCS_DB_NAME': 'quality',
+            'QCS_DB_HOST': 'db',
+            'QCS_DB_CONN_MAX_AGE': '300',
+        }
+        settings = database.database_settings(Path('/srv'), environ)
+        self.assertEqual(settings['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(settings['NAME'], 'quality')
+        self.assertEqual(settings['HOST'], 'db')
+        self.assertEqual(settings['CONN_MAX_AGE'], 300)
+        self.assertNotIn('DISABLE_SERVER_SIDE_CURSORS', settings)
+        environ['QCS_DB_POOLER'] = 'pgbouncer'
+        settings = database.database_settings(Path('/srv'), environ)
+        self.assertTrue(settings['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_invalid(self):
+        """Test invalid environment raises ImproperlyConfigured."""
+        for environ in ({'QCS_DB_ENGINE': 'oracle'},
+                        {'QCS_DB_ENGINE': 'postgresql',
+                         'QCS_DB_POOLER': 'pgpool'},
+                        {'QCS_SQLITE_TIMEOUT': 'long'}):
+            with self.subTest(environ=environ):
+                with self.assertRaises(ImproperlyConfigured):
+                    database.database_settings(Path('/srv'), environ)
+
+    def test_health_checks(self):
+        """Test health checks are enabled by default."""
+        self.assertTrue(database.health_checks({}))
+        self.assertFalse(
+            database.health_checks({'QCS_DB_HEALTH_CHECKS': 'off'})
+        )
+
+    def test_sqlite_pragmas(self):
+        """Test pragmas are applied to new SQLite connections."""
+        self.assertEqual(
+            database.sqlite_pragmas({'QCS_SQLITE_TIMEOUT': '5',
+                                     'QCS_SQLITE_MMAP_SIZE': '0'}),
+            {'journal_mode': 'WAL', 'synchronous': 'NORMAL',
+             'busy_timeout': 5000, 'cache_size': -65536, 'mmap_size': '0',
+             'temp_store': 'MEMORY'}
+        )
+        # Pragma -> value read back, journal of in memory database stays
+        expected = {
+            'synchronous': 1, 'busy_timeout': 20000, 'cache_size': -65536,
+            'temp_store': 2,
+        }
+        with connection.cursor() as cursor:
+            for name, value in expected.items():
+                cursor.execute(f'PRAGMA {name}')
+                self.assertEqual(cursor.fetchone()[0], value, name)
+        with override_settings(SQLITE_PRAGMAS={'journal_mode': 'WAL; --'}):
+            with self.assertRaises(ImproperlyConfigured):
+                database.apply_sqlite_pragmas(None, connection)
+
+    def test_check_connections(self):
+        """Test broken persistent connection is closed before request."""
+        connection.ensure_connection()
+        with mock.patch.dict(connection.settings_dict, CONN_MAX_AGE=60), \
+                mock.patch.object(connection, 'is_usable',
+                                  return_value=False), \
+                mock.patch.object(connection, 'in_atomic_block', False), \
+                mock.patch.object(connection, 'close') as close:
+            database.check_connections()
+            close.assert_called_once_with()
+            close.reset_mock()
+            with override_settings(DATABASE_HEALTH_CHECKS=False):
+                database.check_connections()
+            close.assert_not_called()
+
+
+class BenchmarkConcurrencyTest(TransactionTestCase):
+    def test_command(self):
+        """Test benchmark stores readings and removes its data."""
+        out = StringIO()
+        # Writer threads open own connections, data must be committed
+        call_command('benchmark_concurrency', '--writers', '1',
+                     '--readers', '1', '--readings', '20',
+                     '--chunk-size', '10', stdout=out)
+        # Shared cache test database locks whole tables, busy_timeout
+        # does not wait for them, so reads and writes may fail here
+        stored, failed = map(int, re.search(
+            r'Stored (\d+) readings .* (\d+) failed transactions',
+            out.getvalue()
+        ).groups())
+        self.assertEqual(stored + failed * 10, 20)
+        self.assertIn('failed reads', out.getvalue())
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(Batch.objects.exists())
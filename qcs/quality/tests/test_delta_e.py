@@ -0,0 +1,180 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from products.models import Product, Supplier
+from ..models import Batch, ColorData, ColorStandard
+from .. import delta_e
+
+# Sharma, Wu, Dalal CIEDE2000 test data: reference, sample, dE2000
+CIEDE2000_DATA = [
+    ((50.0000, 2.6772, -79.7751), (50.0000, 0.0000, -82.7485), 2.0425),
+    ((50.0000, 0.0000, 0.0000), (50.0000, -1.0000, 2.0000), 2.3669),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 0.0000, -2.5000), 4.3065),
+    ((50.0000, 2.5000, 0.0000), (73.0000, 25.0000, -18.0000), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+    ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+
+class DeltaEFormulaTest(SimpleTestCase):
+
+    def test_ciede2000(self):
+        """Test CIEDE2000 against published reference data."""
+        references, samples, expected = zip(*CIEDE2000_DATA)
+        np.testing.assert_allclose(
+            delta_e.ciede2000(references, samples), expected, atol=1e-4
+        )
+
+    def test_cie76(self):
+        """Test CIE76 is euclidean distance."""
+        self.assertAlmostEqual(
+            float(delta_e.cie76([50, 0, 0], [53, 4, 0])), 5.0
+        )
+
+    def test_cie94(self):
+        """Test CIE94 against reference value."""
+        self.assertAlmostEqual(
+            float(delta_e.cie94([50.0, 2.6772, -79.7751],
+                                [50.0, 0.0, -82.7485])),
+            1.3950,
+            places=4
+        )
+
+    def test_broadcasting(self):
+        """Test single reference is compared against many samples."""
+        samples = np.zeros((4, 3, 3))
+        for method in delta_e.METHODS:
+            with self.subTest(method=method):
+                self.assertEqual(
+                    delta_e.delta_e([0, 0, 0], samples, method).shape, (4, 3)
+                )
+
+    def test_unknown_method(self):
+        """Test unknown method name is rejected."""
+        with self.assertRaises(ValueError):
+            delta_e.delta_e([0, 0, 0], [0, 0, 0], 'CMC')
+
+
+class RecomputeDeltaETest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier
+        )
+        cls.other_product = Product.objects.create(
+            product_id='YZR124',
+            code='234-3',
+            name='some base coat 124',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier
+        )
+        for product in (cls.product, cls.other_product):
+            batch = Batch.objects.create(
+                product=product,
+                number='bx123',
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            # L is 3 units and a is 4 units off standard: CIE76 dE is 5
+            values = {'l': 53.00, 'a': 54.00, 'b': 50.00, 'de': 0}
+            for _ in range(5):
+                ColorData.objects.create(
+                    batch=batch,
+                    category='QC',
+                    **{name: values[name.split('_')[0]]
+                       for name in ColorData.MEASUREMENT_FIELDS}
+                )
+        # Standard added after readings were stored
+        ColorStandard.objects.create(
+            product=cls.product,
+            method='CIE76',
+            **{f'{channel}_{angle}': 50.00
+               for channel in 'lab' for angle in ('25', '45', '75')}
+        )
+
+    def test_save(self):
+        """Test dE is computed on save when product has color standard."""
+        values = {'l': 53.00, 'a': 54.00, 'b': 50.00}
+        reading = ColorData(
+            batch=Batch.objects.get(product=self.product),
+            category='QC',
+            **{name: values[name.split('_')[0]]
+               for name in ColorData.MEASUREMENT_FIELDS
+               if name not in ColorData.DELTA_E_FIELDS}
+        )
+        reading.full_clean()
+        reading.save()
+        reading.refresh_from_db()
+        self.assertEqual([reading.de_25, reading.de_45, reading.de_75],
+                         [5, 5, 5])
+        # Entered dE is kept while L/a/b values do not change
+        reading = ColorData.objects.get(pk=reading.pk)
+        reading.de_25 = Decimal('4.00')
+        reading.l_25 = '53.0'
+        reading.save()
+        reading.refresh_from_db()
+        self.assertEqual(reading.de_25, Decimal('4.00'))
+        reading = ColorData.objects.get(pk=reading.pk)
+        reading.l_25 = Decimal('57.00')
+        reading.save()
+        reading.refresh_from_db()
+        self.assertNotEqual(reading.de_25, Decimal('4.00'))
+        reading = ColorData(
+            batch=Batch.objects.get(product=self.other_product),
+            category='QC',
+            **{name: values[name.split('_')[0]]
+               for name in ColorData.MEASUREMENT_FIELDS
+               if name not in ColorData.DELTA_E_FIELDS}
+        )
+        with self.assertRaises(ValidationError) as context:
+            reading.full_clean()
+        self.assertCountEqual(context.exception.message_dict,
+                              ColorData.DELTA_E_FIELDS)
+
+    def test_delta_e_matrix(self):
+        """Test dE is computed only for products with color standard."""
+        ids, computed, stored = ColorData.objects.delta_e_matrix()
+        self.assertEqual(len(ids), 5)
+        np.testing.assert_allclose(computed, 5.0)
+        np.testing.assert_allclose(stored, 0.0)
+        _, computed, _ = ColorData.objects.delta_e_matrix(method='CIEDE2000')
+        self.assertTrue(np.all(computed != 5.0))
+
+    def test_command_verify_and_backfill(self):
+        """Test command reports mismatches and backfills dE in chunks."""
+        out = StringIO()
+        call_command('recompute_delta_e', '--verify', stdout=out)
+        self.assertIn('5 readings checked, 5 mismatched', out.getvalue())
+        self.assertFalse(
+            ColorData.objects.filter(de_45=5).exists(),
+            'Verification must not update stored values'
+        )
+        out = StringIO()
+        call_command('recompute_delta_e', '--chunk-size', '2', stdout=out)
+        self.assertIn('5 readings checked, 5 updated', out.getvalue())
+        self.assertEqual(
+            ColorData.objects.filter(de_25=5, de_45=5, de_75=5).count(), 5
+        )
+        out = StringIO()
+        call_command('recompute_delta_e', '--verify', stdout=out)
+        self.assertIn('5 readings checked, 0 mismatched', out.getvalue())
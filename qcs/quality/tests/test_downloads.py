@@ -0,0 +1,154 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import Permission, User
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from products.models import Product, Supplier
+from ..downloads import byte_range
+from ..models import Batch
+from ..storage import ContentAddressedStorage
+
+CONTENT = b'%PDF-1.4 certificate of analysis ' * 100
+
+
+class ByteRangeTest(SimpleTestCase):
+    def test_byte_range(self):
+        """Test parsing of single byte range header."""
+        for header, expected in (
+            (None, None),
+            ('bytes=0-99', (0, 99)),
+            ('bytes=100-', (100, 999)),
+            ('bytes=-100', (900, 999)),
+            ('bytes=-5000', (0, 999)),
+            ('bytes=500-5000', (500, 999)),
+            ('bytes=0-1,5-6', None),
+            ('bytes=9-1', None),
+            ('lines=1-2', None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(byte_range(header, 1000), expected)
+        for header in ('bytes=1000-', 'bytes=-0'):
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    byte_range(header, 1000)
+
+
+class DocumentDownloadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=supplier
+        )
+        cls.user = User.objects.create_user('reviewer', password='pass')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_batch')
+        )
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            SENDFILE_BACKEND='',
+            SENDFILE_URL_PREFIX='/protected-media/'
+        )
+        self.settings_override.enable()
+        ContentAddressedStorage().save('coa/base coat coa.pdf',
+                                       ContentFile(CONTENT))
+        self.batch = Batch.objects.create(
+            product=DocumentDownloadTest.product,
+            number='bx123',
+            size=3500,
+            m_date=datetime.date(2022, 1, 31),
+            exp_date=datetime.date(2022, 7, 31),
+            coa='coa/base coat coa.pdf'
+        )
+        self.url = reverse('quality:batch_document',
+                           args=[self.batch.pk, 'coa'])
+        self.client.force_login(DocumentDownloadTest.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_file_response(self):
+        """Test document is streamed with byte range support."""
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'private')
+        self.assertEqual(response['Content-Disposition'],
+                         'inline; filename="base coat coa.pdf"')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=4-99')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'],
+                         f'bytes 4-99/{len(CONTENT)}')
+        self.assertEqual(b''.join(response.streaming_content),
+                         CONTENT[4:100])
+        last_modified = response['Last-Modified']
+        response = self.client.get(self.url, HTTP_RANGE='bytes=4-99',
+                                   HTTP_IF_RANGE=last_modified)
+        self.assertEqual(response.status_code, 206)
+        response.close()
+        # Changed file is sent whole
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=4-99',
+            HTTP_IF_RANGE='Mon, 31 Jan 2022 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_sendfile(self):
+        """Test transfer is handed off to front-end server."""
+        with override_settings(SENDFILE_BACKEND='nginx'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/coa/base%20coat%20coa.pdf')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'')
+        with override_settings(SENDFILE_BACKEND='apache'):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response['X-Sendfile'],
+            os.path.join(self.media_root, 'coa', 'base coat coa.pdf')
+        )
+
+    def test_permissions(self):
+        """Test documents are only sent to users allowed to view batches."""
+        response = self.client.get(
+            reverse('quality:batch_detail', args=[self.batch.pk])
+        )
+        self.assertEqual(response.context['documents'],
+                         [('Certificate of analysis', self.url)])
+        # Batch list links documents through the protected view
+        response = self.client.get(reverse('quality:batch_list'))
+        self.assertContains(response, f'href="{self.url}"')
+        self.assertNotContains(response, 'href="/media/')
+        for field in ('color_sheet', 'package'):
+            with self.subTest(field=field):
+                response = self.client.get(reverse(
+                    'quality:batch_document', args=[self.batch.pk, field]
+                ))
+                self.assertEqual(response.status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,131 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import Permission, User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from products.models import Product, Supplier
+from .. import expiry
+from ..models import Batch
+
+
+class BatchExpiryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        today = timezone.localdate()
+        suppliers = [
+            Supplier.objects.create(
+                name=name,
+                country='Country',
+                city='City'
+            )
+            for name in ('Company A', 'Company B')
+        ]
+        cls.products = [
+            Product.objects.create(
+                product_id=f'YZR12{index}',
+                code='234-2',
+                name=f'product {index}',
+                formula='WB',
+                product_type='BC',
+                supplier=suppliers[index // 2]
+            )
+            for index in range(3)
+        ]
+        # (product index, expires in days, size)
+        batches = [
+            (0, 5, 100), (0, 20, 200), (1, 10, 50), (2, 25, 1000),
+            (2, 40, 3000), (1, -1, 10)
+        ]
+        for number, (index, days, size) in enumerate(batches):
+            Batch.objects.create(
+                product=cls.products[index],
+                number=f'bx{number}',
+                size=size,
+                m_date=datetime.date(2022, 1, number + 1),
+                exp_date=today + datetime.timedelta(days=days)
+            )
+        cls.today = today
+
+    def test_report(self):
+        """Test expiring batches are grouped by supplier and product."""
+        with self.assertNumQueries(1):
+            suppliers = expiry.report(expiry.expiring_batches(30))
+        self.assertEqual(
+            [(supplier['name'], supplier['batches'], supplier['stock'])
+             for supplier in suppliers],
+            [('Company A', 3, 350), ('Company B', 1, 1000)]
+        )
+        products = suppliers[0]['products']
+        self.assertEqual(
+            [(product['name'], product['stock']) for product in products],
+            [('product 0', 300), ('product 1', 50)]
+        )
+        self.assertEqual(
+            products[0]['first_expiry'],
+            BatchExpiryTest.today + datetime.timedelta(days=5)
+        )
+        self.assertEqual(
+            products[0]['last_expiry'],
+            BatchExpiryTest.today + datetime.timedelta(days=20)
+        )
+
+    def test_windows(self):
+        """Test expiry and manufacturing windows."""
+        today = BatchExpiryTest.today
+        self.assertEqual(expiry.window(7), (
+            today, today + datetime.timedelta(days=7)
+        ))
+        self.assertEqual(expiry.expiring_batches(0).count(), 0)
+        self.assertEqual(
+            expiry.batches_in_window(end=today).get().number, 'bx5'
+        )
+        manufactured = expiry.manufactured_batches(
+            datetime.date(2022, 1, 2), datetime.date(2022, 1, 3)
+        )
+        self.assertCountEqual(
+            manufactured.values_list('number', flat=True), ['bx1', 'bx2']
+        )
+        with self.assertRaises(ValueError):
+            expiry.batches_in_window(field='size')
+
+    def test_view(self):
+        """Test expiry report view."""
+        url = reverse('quality:batch_expiry_report')
+        user = User.objects.create_user('viewer')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        user.user_permissions.add(
+            Permission.objects.get(codename='view_batch')
+        )
+        response = self.client.get(url, {'days': 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [supplier['stock'] for supplier in response.json()['suppliers']],
+            [350, 1000]
+        )
+        response = self.client.get(url, {
+            'field': 'm_date', 'from': '2022-01-04', 'to': '2022-01-05'
+        })
+        self.assertEqual(response.json()['suppliers'][0]['stock'], 4000)
+        for params in ({'days': 'x'}, {'from': '2022-13-01'},
+                       {'field': 'size'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        """Test nightly report command output formats."""
+        out = StringIO()
+        call_command('expiry_report', '--days', '30', stdout=out)
+        self.assertIn('Company A: 3 batches, stock 350', out.getvalue())
+        out = StringIO()
+        call_command('expiry_report', '--days', '30', '--format', 'csv',
+                     stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith('Company A,YZR120,product 0,2,'))
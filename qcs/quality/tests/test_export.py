@@ -0,0 +1,161 @@
+import csv
+import datetime
+import io
+import tracemalloc
+import unittest
+
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from products.models import Product, Supplier
+from ..export import HEADER, Workbook, export_queryset, export_rows, stream
+from ..models import Batch, ColorData
+
+
+class ColorDataExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.suppliers = [
+            Supplier.objects.create(
+                name=f'Company {index}',
+                country='Country',
+                city='City'
+            )
+            for index in range(2)
+        ]
+        cls.batches = [
+            Batch.objects.create(
+                product=Product.objects.create(
+                    product_id=f'YZR12{index}',
+                    code='234-2',
+                    name=f'some base coat 12{index}',
+                    formula='WB',
+                    product_type='BC',
+                    supplier=supplier
+                ),
+                number='bx123',
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            for index, supplier in enumerate(cls.suppliers)
+        ]
+        cls.create_readings(cls.batches[0], 3)
+        cls.create_readings(cls.batches[1], 2)
+        cls.user = User.objects.create_user('viewer', password='password')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_colordata')
+        )
+        cls.url = reverse('quality:color_data_export')
+
+    @staticmethod
+    def create_readings(batch, count):
+        ColorData.objects.bulk_create(
+            [
+                ColorData(
+                    batch=batch,
+                    category=ColorData.QC,
+                    comment='Station 1',
+                    **{name: '50.50' for name in ColorData.MEASUREMENT_FIELDS}
+                )
+                for _ in range(count)
+            ],
+            batch_size=500
+        )
+
+    def setUp(self):
+        self.client.force_login(ColorDataExportTest.user)
+
+    def read_csv(self, params=None):
+        response = self.client.get(ColorDataExportTest.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming, 'Export is not streamed')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_csv_export(self):
+        """Test CSV export contains header and all readings."""
+        rows = self.read_csv()
+        self.assertEqual(rows[0], HEADER)
+        self.assertEqual(len(rows), 6)
+        row = dict(zip(HEADER, rows[1]))
+        self.assertEqual(row['supplier'], 'Company 0')
+        self.assertEqual(row['product_id'], 'YZR120')
+        self.assertEqual(row['batch'], 'bx123')
+        self.assertEqual(row['l_25'], '50.50')
+        self.assertEqual(row['comment'], 'Station 1')
+
+    def test_filters(self):
+        """Test export filters by product and supplier."""
+        supplier = ColorDataExportTest.suppliers[1]
+        rows = self.read_csv({'supplier': supplier.pk})
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row[1] for row in rows[1:]}, {supplier.name})
+        product_id = ColorDataExportTest.batches[0].product_id
+        self.assertEqual(len(self.read_csv({'product': product_id})), 4)
+
+    def test_single_query(self):
+        """Test related objects are fetched with readings."""
+        queryset = export_queryset()
+        with CaptureQueriesContext(connection) as context:
+            rows = list(export_rows(queryset, chunk_size=2))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len(context), 1, 'Related objects queried per row')
+
+    def test_invalid_request(self):
+        """Test invalid parameters and missing permission are rejected."""
+        for params in ({'format': 'ods'}, {'product': 'x'},
+                       {'supplier': 'x'}, {'batch': '-1'}):
+            with self.subTest(params=params):
+                response = self.client.get(ColorDataExportTest.url, params)
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get(ColorDataExportTest.url, {'product': 'x'})
+        self.assertEqual(response.json(), {'error': 'Invalid product'})
+        self.client.force_login(User.objects.create_user('nobody'))
+        response = self.client.get(ColorDataExportTest.url)
+        self.assertEqual(response.status_code, 403)
+
+    @unittest.skipIf(Workbook is None, 'openpyxl is not installed')
+    def test_xlsx_export(self):
+        """Test XLSX export is a readable workbook."""
+        from openpyxl import load_workbook
+        response = self.client.get(
+            ColorDataExportTest.url, {'format': 'xlsx'}
+        )
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(
+            io.BytesIO(b''.join(response.streaming_content)), read_only=True
+        )
+        rows = list(workbook.active.values)
+        self.assertEqual(list(rows[0]), HEADER)
+        self.assertEqual(len(rows), 6)
+
+    def test_memory_is_flat(self):
+        """Benchmark: peak memory of export does not grow with row count."""
+
+        def peak_memory():
+            tracemalloc.start()
+            try:
+                for _ in stream('csv', export_rows(
+                    export_queryset(), chunk_size=100
+                )):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        batch = ColorDataExportTest.batches[0]
+        ColorDataExportTest.create_readings(batch, 300)
+        small = peak_memory()
+        ColorDataExportTest.create_readings(batch, 2700)
+        large = peak_memory()
+        self.assertLess(
+            large, small * 1.5,
+            f'Peak memory grows with rows: {small} B for 300 rows, '
+            f'{large} B for 3000 rows'
+        )
@@ -0,0 +1,125 @@
+import datetime
+from unittest import skipUnless
+
+from django.db import IntegrityError, connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from products.models import Product, Supplier
+from .. import expiry
+from ..models import Batch, ColorData
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are SQLite specific')
+class QueryPlanTest(TestCase):
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Assert query plan of queryset reads table through index."""
+        plan = queryset.explain()
+        self.assertIn(
+            f'USING INDEX {index_name}', plan,
+            f'Index {index_name} is not used:\n{plan}'
+        )
+
+    def assertNoSort(self, queryset):
+        """Assert query plan of queryset needs no separate sort step."""
+        plan = queryset.explain()
+        self.assertNotIn(
+            'TEMP B-TREE', plan, f'Query needs separate sort:\n{plan}'
+        )
+
+    def test_color_data_list_queries(self):
+        """Test color data ordering and lookups use indexes."""
+        ordered = ColorData.objects.order_by(
+            '-timestamp', 'batch_id', 'category'
+        )
+        self.assertUsesIndex(ordered, 'colordata_timestamp_idx')
+        self.assertNoSort(ordered)
+        self.assertUsesIndex(
+            ColorData.objects.all(), 'colordata_timestamp_idx'
+        )
+        self.assertUsesIndex(
+            ColorData.objects.filter(
+                batch_id=1, category=ColorData.CS
+            ).order_by(),
+            'colordata_batch_category_idx'
+        )
+
+    def test_color_data_cursor_queries(self):
+        """Test keyset pagination queries seek in cursor indexes."""
+        # Prepare test data
+        timestamp = timezone.now()
+        querysets = {
+            'colordata_cursor_idx': ColorData.objects.all(),
+            'colordata_batch_cursor_idx': ColorData.objects.filter(
+                batch_id=1
+            ),
+        }
+        # Run test
+        for index_name, queryset in querysets.items():
+            queryset = queryset.order_by('-timestamp', '-id').filter(
+                timestamp__lte=timestamp
+            ).filter(Q(timestamp__lt=timestamp) | Q(id__lt=1))
+            with self.subTest(index_name=index_name):
+                self.assertUsesIndex(queryset, index_name)
+                self.assertNoSort(queryset)
+
+    def test_batch_list_queries(self):
+        """Test batch ordering and lookups use product/number index."""
+        ordered = Batch.objects.order_by('product_id', 'number')
+        self.assertUsesIndex(ordered, 'sqlite_autoindex_quality_batch')
+        self.assertNoSort(ordered)
+        self.assertUsesIndex(
+            Batch.objects.filter(product_id=1, number='bx123'),
+            'sqlite_autoindex_quality_batch'
+        )
+
+    def test_batch_date_window_queries(self):
+        """Test expiry and manufacturing windows range scan indexes."""
+        start, end = datetime.date(2022, 1, 1), datetime.date(2022, 1, 31)
+        self.assertUsesIndex(
+            expiry.batches_in_window(start, end), 'batch_exp_date_idx'
+        )
+        self.assertUsesIndex(
+            expiry.manufactured_batches(start, end), 'batch_m_date_idx'
+        )
+        self.assertUsesIndex(
+            expiry.product_totals(expiry.batches_in_window(start, end)),
+            'batch_exp_date_idx'
+        )
+        ordered = expiry.batches_in_window(start, end).order_by(
+            'exp_date', 'id'
+        )
+        self.assertNoSort(ordered)
+
+
+class BatchUniqueConstraintTest(TestCase):
+
+    def test_product_batch_number_unique(self):
+        """Test batch number is unique per product."""
+        # Prepare test data
+        supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=supplier
+        )
+        batch_data = {
+            'product': product,
+            'number': 'bx123',
+            'size': 3500,
+            'm_date': datetime.date(2022, 5, 31),
+            'exp_date': datetime.date(2022, 8, 31)
+        }
+        Batch.objects.create(**batch_data)
+        # Run test
+        with self.assertRaises(IntegrityError):
+            Batch.objects.create(**batch_data)
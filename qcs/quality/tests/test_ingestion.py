@@ -0,0 +1,246 @@
+import csv
+import datetime
+import io
+import json
+from io import StringIO
+
+from django.contrib.auth.models import Permission, User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from products.models import Product, Supplier, Package
+from .. import tokens
+from ..models import ApiToken, Batch, ColorData, ColorStandard
+from ..ingestion import ingest_readings
+
+
+def make_reading(product_id='YZR123', batch='bx123', category='CS'):
+    """Return valid color data reading."""
+    reading = {
+        'product_id': product_id,
+        'batch': batch,
+        'category': category,
+        'comment': 'Station 1'
+    }
+    for name in ColorData.MEASUREMENT_FIELDS:
+        reading[name] = '1.25' if name.startswith('de') else '50.50'
+    return reading
+
+
+class ColorDataIngestionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.package = Package.objects.create(
+            package_type='TOTE',
+            uom='KG',
+            size=1000
+        )
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier,
+            package=cls.package
+        )
+        cls.batches = [
+            Batch.objects.create(
+                product=cls.product,
+                number=number,
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            for number in ('bx123', 'bx124')
+        ]
+        cls.user = User.objects.create_user('station', password='password')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='add_colordata')
+        )
+        cls.url = reverse('quality:color_data_ingest')
+
+    def setUp(self):
+        self.client.force_login(ColorDataIngestionTest.user)
+
+    def test_ingest_readings(self):
+        """Test valid readings are stored."""
+        # Prepare test data
+        readings = [make_reading(), make_reading(batch='bx124')]
+        # Run test
+        created, errors = ingest_readings(readings)
+        self.assertEqual(created, 2, 'Incorrect number of created readings')
+        self.assertEqual(errors, [], 'Unexpected ingestion errors')
+        self.assertCountEqual(
+            ColorData.objects.values_list('batch__number', flat=True),
+            ['bx123', 'bx124'],
+            'Readings stored for incorrect batches'
+        )
+
+    def test_ingest_readings_errors(self):
+        """Test invalid rows are reported and skipped."""
+        # Prepare test data
+        readings = [
+            make_reading(),
+            make_reading(batch='unknown'),
+            {**make_reading(), 'l_25': 'abc'},
+            {**make_reading(), 'a_45': '1000.00'},
+            {**make_reading(), 'category': 'XX'},
+            'not a reading'
+        ]
+        invalid_fields = {
+            1: 'batch', 2: 'l_25', 3: 'a_45', 4: 'category', 5: '__all__'
+        }
+        # Run test
+        created, errors = ingest_readings(readings)
+        self.assertEqual(created, 1, 'Incorrect number of created readings')
+        self.assertEqual(
+            [error['row'] for error in errors],
+            list(invalid_fields),
+            'Incorrect rows reported as invalid'
+        )
+        for error in errors:
+            with self.subTest(row=error['row']):
+                self.assertIn(
+                    invalid_fields[error['row']],
+                    error['errors'],
+                    'Incorrect field reported as invalid'
+                )
+
+    def test_ingest_readings_delta_e(self):
+        """Test dE is computed against product color standard."""
+        # Prepare test data
+        without_de = make_reading()
+        for name in ColorData.DELTA_E_FIELDS:
+            del without_de[name]
+        # Run test
+        created, errors = ingest_readings([without_de])
+        self.assertEqual(created, 0, 'Reading without dE stored')
+        self.assertCountEqual(errors[0]['errors'], ColorData.DELTA_E_FIELDS)
+        ColorStandard.objects.create(
+            product=ColorDataIngestionTest.product,
+            method='CIE76',
+            **{f'{channel}_{angle}': 50.00
+               for channel in 'lab' for angle in ('25', '45', '75')}
+        )
+        # Submitted dE is replaced by computed value
+        created, errors = ingest_readings([without_de, make_reading()])
+        self.assertEqual(created, 2, 'Incorrect number of created readings')
+        self.assertEqual(errors, [], 'Unexpected ingestion errors')
+        self.assertEqual(
+            ColorData.objects.filter(
+                de_25='0.87', de_45='0.87', de_75='0.87'
+            ).count(),
+            2,
+            'Incorrect computed dE'
+        )
+
+    def test_ingest_readings_query_count(self):
+        """Test number of queries does not depend on number of readings."""
+        # Prepare test data
+        readings = [make_reading(batch=f'bx12{i % 2 + 3}') for i in range(40)]
+        # Run test
+        # Batch and color standard lookups, single INSERT, id lookup and
+        # summary upkeep for two batches (summary INSERT, UPDATE per
+        # batch, pass flag UPDATE), each in its own savepoint, then
+        # tolerance, product and control chart lookups
+        for size in (10, 40):
+            with self.subTest(size=size):
+                with self.assertNumQueries(15):
+                    created, _ = ingest_readings(readings[:size])
+                self.assertEqual(
+                    created, size, 'Incorrect number of created readings'
+                )
+
+    def test_ingest_view_json(self):
+        """Test JSON ingestion endpoint."""
+        # Prepare test data
+        body = json.dumps({'readings': [make_reading(), {}]})
+        # Run test
+        response = self.client.post(
+            ColorDataIngestionTest.url, body, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['received'], 2)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(response.json()['errors'][0]['row'], 1)
+
+    def test_ingest_view_csv(self):
+        """Test CSV ingestion endpoint."""
+        # Prepare test data
+        reading = make_reading()
+        body = io.StringIO()
+        writer = csv.DictWriter(body, fieldnames=list(reading))
+        writer.writeheader()
+        writer.writerows([reading, reading])
+        # Run test
+        response = self.client.post(
+            ColorDataIngestionTest.url, body.getvalue(),
+            content_type='text/csv'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(ColorData.objects.count(), 2)
+
+    def test_ingest_view_invalid_payload(self):
+        """Test malformed payload is rejected."""
+        response = self.client.post(
+            ColorDataIngestionTest.url, '{"foo": 1}',
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_ingest_view_permission(self):
+        """Test ingestion requires add color data permission."""
+        self.client.logout()
+        response = self.client.post(
+            ColorDataIngestionTest.url, '[]', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_ingest_view_token(self):
+        """Test stations authenticate with API token without CSRF token."""
+        _, key = tokens.create_token(ColorDataIngestionTest.user, 'Station 1')
+        client = Client(enforce_csrf_checks=True)
+        body = json.dumps([make_reading()])
+        response = client.post(
+            ColorDataIngestionTest.url, body,
+            content_type='application/json', HTTP_AUTHORIZATION=f'Token {key}'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        for header in (f'Token {key}x', f'Bearer {key}'):
+            with self.subTest(header=header):
+                response = client.post(
+                    ColorDataIngestionTest.url, body,
+                    content_type='application/json',
+                    HTTP_AUTHORIZATION=header
+                )
+                self.assertEqual(response.status_code, 401)
+        # Session requests are still checked for CSRF token
+        client.force_login(ColorDataIngestionTest.user)
+        response = client.post(ColorDataIngestionTest.url, body,
+                               content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_create_api_token(self):
+        """Test create_api_token command stores digest of printed key."""
+        out = StringIO()
+        call_command('create_api_token', 'station', '--name', 'Station 2',
+                     stdout=out)
+        key = out.getvalue().splitlines()[0]
+        token = ApiToken.objects.get(name='Station 2')
+        self.assertEqual(token.digest, tokens.digest(key))
+        self.assertEqual(tokens.authenticate(f'Token {key}'),
+                         ColorDataIngestionTest.user)
+        with self.assertRaises(CommandError):
+            call_command('create_api_token', 'nobody', '--name', 'x',
+                         stdout=out)
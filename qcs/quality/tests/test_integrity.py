@@ -0,0 +1,148 @@
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from products.models import Product, Supplier
+from .. import integrity
+from ..models import Batch
+from ..storage import ContentAddressedStorage
+
+SAMPLES = os.path.join(os.path.dirname(__file__), 'valid_sample_files')
+INVALID_SAMPLES = os.path.join(os.path.dirname(__file__),
+                               'invalid_sample_files')
+
+
+class MediaIntegrityTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=supplier
+        )
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            DOCUMENT_BLOB_DIR='blobs/'
+        )
+        self.settings_override.enable()
+        storage = ContentAddressedStorage()
+        with open(os.path.join(SAMPLES, 'sample.pdf'), 'rb') as f:
+            storage.save('coa/valid coa.pdf', ContentFile(f.read()))
+        with open(os.path.join(INVALID_SAMPLES, 'sample.html'), 'rb') as f:
+            storage.save('color/html color.png', ContentFile(f.read()))
+        storage.save('color/old/orphan color.png', ContentFile(b'orphan'))
+        self.batches = [
+            Batch.objects.create(
+                product=MediaIntegrityTest.product,
+                number=number,
+                size=3500,
+                m_date=datetime.date(2022, 1, 31),
+                exp_date=datetime.date(2022, 7, 31),
+                coa=coa,
+                color_sheet=color_sheet
+            )
+            for number, coa, color_sheet in (
+                ('bx1', 'coa/valid coa.pdf', 'color/html color.png'),
+                ('bx2', 'coa/missing coa.pdf', None),
+                ('bx3', None, None),
+            )
+        ]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_scan(self):
+        """Test missing, invalid and orphan documents are reported."""
+        report = integrity.scan(workers=0, chunk_size=1)
+        self.assertEqual(report['files'], 3)
+        self.assertEqual(report['references'], 3)
+        self.assertEqual(report['missing'], [{
+            'batch': self.batches[1].pk, 'field': 'coa',
+            'name': 'coa/missing coa.pdf'
+        }])
+        self.assertEqual(report['invalid'], [{
+            'batch': self.batches[0].pk, 'field': 'color_sheet',
+            'name': 'color/html color.png', 'type': 'text/html'
+        }])
+        # Blob store is not scanned
+        self.assertEqual(report['orphans'], ['color/old/orphan color.png'])
+
+    def test_pending_sniffs_are_bounded(self):
+        """Test results are collected while later chunks are submitted."""
+        outstanding = []
+        peak = 0
+
+        class Sniff(Future):
+            def result(self, timeout=None):
+                outstanding.remove(self)
+                return super().result(timeout)
+
+        class Executor:
+            def __init__(self, workers, initializer):
+                pass
+
+            def submit(self, fn, paths):
+                nonlocal peak
+                future = Sniff()
+                future.set_result(fn(paths))
+                outstanding.append(future)
+                peak = max(peak, len(outstanding))
+                return future
+
+            def shutdown(self):
+                pass
+
+        for number in range(10):
+            Batch.objects.create(
+                product=MediaIntegrityTest.product,
+                number=f'by{number}',
+                size=3500,
+                m_date=datetime.date(2022, 1, 31),
+                exp_date=datetime.date(2022, 7, 31),
+                coa='coa/valid coa.pdf'
+            )
+        with mock.patch.object(integrity, 'ProcessPoolExecutor', Executor):
+            report = integrity.scan(workers=1, chunk_size=1)
+        self.assertEqual(report['references'], 13)
+        self.assertEqual(len(report['invalid']), 1)
+        self.assertEqual(outstanding, [])
+        self.assertEqual(peak, 2)
+
+    def test_command(self):
+        """Test check_media_integrity command sniffs in worker processes."""
+        path = os.path.join(self.media_root, 'report.json')
+        out = StringIO()
+        call_command('check_media_integrity', '--workers', '2',
+                     '--output', path, stdout=out)
+        self.assertIn(
+            f'Missing coa of batch {self.batches[1].pk}: coa/missing coa.pdf',
+            out.getvalue()
+        )
+        self.assertIn('color/html color.png (text/html)', out.getvalue())
+        self.assertIn('Orphan file: color/old/orphan color.png',
+                      out.getvalue())
+        self.assertIn('1 missing, 1 invalid, 1 orphans', out.getvalue())
+        with open(path) as f:
+            self.assertEqual(json.load(f), integrity.scan(workers=0))
@@ -6,7 +6,8 @@ from django.core.validators import FileExtensionValidator
 
 from products.models import Product, Supplier, Package
 from ..models import (
-    Batch, ColorData, file_type_validator, coa_file_path, color_file_path
+    Batch, ColorData, ColorStandard, file_type_validator, coa_file_path,
+    color_file_path
 )
 
 
@@ -46,7 +47,9 @@ class BatchModelTest(TestCase):
         # Prepare test data
         field_names = ['id', 'product', 'number', 'size', 'm_date', 'exp_date',
                        'coa', 'color_sheet']
-        foreign_key_related_names = ['color_data']
+        foreign_key_related_names = ['color_data', 'color_summary',
+                                     'uploads', 'control_violations',
+                                     'color_evaluations']
         all_field_names = [*field_names, *foreign_key_related_names]
         # Run test
         self.assertEqual(
@@ -328,7 +331,7 @@ class ColorDataModelTest(TestCase):
         field_names = ['id', 'timestamp', 'batch', 'category', 'l_25', 'l_45',
                        'l_75', 'a_25', 'a_45', 'a_75', 'b_25', 'b_45', 'b_75',
                        'de_25', 'de_45', 'de_75', 'comment']
-        foreign_key_related_names = []
+        foreign_key_related_names = ['control_violations', 'evaluation']
         all_field_names = [*field_names, *foreign_key_related_names]
         # Run test
         self.assertEqual(
@@ -508,3 +511,89 @@ class ColorDataModelTest(TestCase):
             ('Incorrect object name returned by __str__() method '
              f'in model {ColorData}')
         )
+
+
+class ColorStandardModelTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier
+        )
+        cls.color_standard = ColorStandard.objects.create(
+            product=cls.product,
+            l_25=90.00,
+            l_45=80.00,
+            l_75=70.00,
+            a_25=1.00,
+            a_45=2.00,
+            a_75=3.00,
+            b_25=-1.00,
+            b_45=-2.00,
+            b_75=-3.00
+        )
+
+    def test_model_field_names(self):
+        """Test model field names."""
+        # Prepare test data
+        field_names = ['id', 'product', 'method', 'l_25', 'l_45', 'l_75',
+                       'a_25', 'a_45', 'a_75', 'b_25', 'b_45', 'b_75']
+        # Run test
+        self.assertCountEqual(
+            [field.name for field in ColorStandard._meta.get_fields()],
+            field_names,
+            f'Incorrect model {ColorStandard} field names'
+        )
+
+    def test_model_fields_default(self):
+        """Test model fields default attribute."""
+        self.assertEqual(
+            ColorStandard._meta.get_field('method').default,
+            'CIEDE2000',
+            'Incorrect <field: method.default> attribute'
+        )
+
+    def test_model_meta_class_attributes(self):
+        """Test model class Meta attributes."""
+        self.assertEqual(
+            ColorStandard._meta.ordering,
+            ['product'],
+            'Incorrect <class: Meta.ordering> attribute'
+        )
+        self.assertEqual(
+            ColorStandard._meta.verbose_name,
+            'color standard',
+            'Incorrect <class: Meta.verbose_name> attribute'
+        )
+        self.assertEqual(
+            ColorStandard._meta.verbose_name_plural,
+            'color standards',
+            'Incorrect <class: Meta.verbose_name_plural> attribute'
+        )
+
+    def test_model_object_name(self):
+        """Test model's __str__() method."""
+        self.assertEqual(
+            str(ColorStandardModelTest.color_standard),
+            f'{ColorStandardModelTest.product} color standard',
+            ('Incorrect object name returned by __str__() method '
+             f'in model {ColorStandard}')
+        )
+
+    def test_lab(self):
+        """Test lab() returns L/a/b values per angle."""
+        self.assertEqual(
+            ColorStandardModelTest.color_standard.lab(),
+            [[90.0, 1.0, -1.0], [80.0, 2.0, -2.0], [70.0, 3.0, -3.0]],
+            'Incorrect reference values returned by lab() method'
+        )
@@ -0,0 +1,148 @@
+import datetime
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from products.models import Product, Supplier
+from ..models import Batch, ColorData
+from ..pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, keyset_page
+)
+
+
+class ColorDataHistoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.products = [
+            Product.objects.create(
+                product_id=f'YZR12{index}',
+                code='234-2',
+                name=f'some base coat 12{index}',
+                formula='WB',
+                product_type='BC',
+                supplier=cls.supplier
+            )
+            for index in range(2)
+        ]
+        cls.batches = [
+            Batch.objects.create(
+                product=product,
+                number='bx123',
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            for product in cls.products
+        ]
+        # Several readings share timestamp to cover cursor tie-break by id
+        objs = [
+            ColorData(
+                batch=cls.batches[index % 2],
+                category=ColorData.CS if index % 3 else ColorData.QC,
+                **{name: index for name in ColorData.MEASUREMENT_FIELDS}
+            )
+            for index in range(25)
+        ]
+        ColorData.objects.bulk_create(objs)
+        now = timezone.now()
+        for obj in ColorData.objects.all():
+            obj.timestamp = now - datetime.timedelta(seconds=obj.pk // 4)
+            obj.save(update_fields=['timestamp'])
+        cls.user = User.objects.create_user('viewer', password='password')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_colordata')
+        )
+        cls.url = reverse('quality:color_data_history')
+
+    def setUp(self):
+        self.client.force_login(ColorDataHistoryTest.user)
+
+    def collect_pages(self, params):
+        """Return ids of all rows collected by following next links."""
+        ids = []
+        response = self.client.get(ColorDataHistoryTest.url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.json()['results'])
+            if not response.json()['next']:
+                return ids
+            response = self.client.get(response.json()['next'])
+
+    def test_cursor_round_trip(self):
+        """Test cursor encodes and decodes position."""
+        timestamp = timezone.now()
+        self.assertEqual(
+            decode_cursor(encode_cursor(timestamp, 42)), (timestamp, 42)
+        )
+        for cursor in ('bad', encode_cursor(timestamp, 1)[:-3], ''):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+
+    def test_keyset_page(self):
+        """Test pages follow (-timestamp, -id) order without gaps."""
+        expected = list(
+            ColorData.objects.order_by('-timestamp', '-id')
+            .values_list('id', flat=True)
+        )
+        ids = []
+        cursor = None
+        while True:
+            rows, cursor = keyset_page(ColorData.objects.all(), cursor, 4)
+            ids.extend(row.pk for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(ids, expected)
+
+    def test_history_view_pages(self):
+        """Test history view pages through filtered readings."""
+        # Prepare test data
+        batch = ColorDataHistoryTest.batches[0]
+        filters = {
+            (): ColorData.objects.all(),
+            (('batch', batch.pk),): ColorData.objects.filter(batch=batch),
+            (('product', batch.product_id),
+             ('category', 'CS')): ColorData.objects.filter(
+                batch__product_id=batch.product_id, category='CS'
+            ),
+        }
+        # Run test
+        for params, queryset in filters.items():
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.collect_pages({**dict(params), 'limit': 3}),
+                    list(queryset.order_by('-timestamp', '-id')
+                         .values_list('id', flat=True))
+                )
+
+    def test_history_view_page_query_count(self):
+        """Test deep page costs the same queries as the first one."""
+        response = self.client.get(ColorDataHistoryTest.url, {'limit': 2})
+        # Session, user, two permission queries and one page query
+        with self.assertNumQueries(5):
+            self.client.get(response.json()['next'])
+
+    def test_history_view_invalid_params(self):
+        """Test invalid cursor, limit and filters are rejected."""
+        for params in ({'cursor': 'bad'}, {'limit': 'x'}, {'limit': 0},
+                       {'batch': 'abc'}, {'product': '1.5'},
+                       {'category': 'XX'}):
+            with self.subTest(params=params):
+                response = self.client.get(ColorDataHistoryTest.url, params)
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get(ColorDataHistoryTest.url, {'batch': 'abc'})
+        self.assertEqual(response.json(), {'error': 'Invalid batch'})
+
+    def test_history_view_permission(self):
+        """Test history requires view color data permission."""
+        self.client.logout()
+        response = self.client.get(ColorDataHistoryTest.url)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,140 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from products.models import Product, Supplier
+from .. import previews
+from ..models import Batch
+from ..storage import ContentAddressedStorage
+
+SAMPLES = os.path.join(os.path.dirname(__file__), 'valid_sample_files')
+
+
+def fake_render(source, size, output):
+    with open(output, 'wb') as f:
+        f.write(b'\xff\xd8' + b'x' * size)
+
+
+class PreviewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=supplier
+        )
+        cls.user = User.objects.create_user('reviewer', password='pass')
+        cls.user.user_permissions.add(
+            Permission.objects.get(codename='view_batch')
+        )
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            PREVIEW_CACHE_DIR=os.path.join(self.media_root, 'previews'),
+            PREVIEW_CACHE_MAX_SIZE=1000,
+            PREVIEW_SIZE=300
+        )
+        self.settings_override.enable()
+        storage = ContentAddressedStorage()
+        for name in ('color/sheet.png', 'coa/coa.docx'):
+            storage.save(name, ContentFile(name.encode()))
+        self.batch = Batch.objects.create(
+            product=PreviewTest.product,
+            number='bx123',
+            size=3500,
+            m_date=datetime.date(2022, 1, 31),
+            exp_date=datetime.date(2022, 7, 31),
+            coa='coa/coa.docx',
+            color_sheet='color/sheet.png'
+        )
+        self.client.force_login(PreviewTest.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        previews._cache_size = None
+
+    def test_cache(self):
+        """Test previews are generated once and evicted least used first."""
+        render = mock.Mock(side_effect=fake_render)
+        with mock.patch.object(previews, 'renderer', return_value=render):
+            path, key = previews.get_preview('color/sheet.png')
+            self.assertEqual(previews.get_preview('color/sheet.png'),
+                             (path, key))
+            render.assert_called_once()
+            self.assertIsNone(previews.get_preview('color/missing.png'))
+            # Older preview used again outlives newer unused ones
+            others = [previews.get_preview('color/sheet.png', size)[0]
+                      for size in (100, 200)]
+            for age, preview in enumerate([path] + others):
+                os.utime(preview, (1000 - age, 1000 - age))
+            previews.get_preview('color/sheet.png')
+            # Fourth preview of 402 bytes exceeds 1000 bytes, removing
+            # least recently used one brings cache below 900 bytes
+            new = previews.get_preview('color/sheet.png', 400)[0]
+        self.assertEqual(
+            [os.path.exists(preview) for preview in [path] + others + [new]],
+            [True, True, False, True]
+        )
+        self.assertEqual(previews.evict(), (0, 0))
+
+    def test_view(self):
+        """Test preview is served with long lived cache headers."""
+        with mock.patch.object(previews, 'renderer',
+                               side_effect=lambda name: fake_render
+                               if name.endswith('.png') else None):
+            response = self.client.get(
+                reverse('quality:batch_detail', args=[self.batch.pk])
+            )
+            url = dict(response.context['previews'])['Color sheet']
+            self.assertNotIn('Certificate of analysis',
+                             dict(response.context['previews']))
+            response = self.client.get(url)
+            self.assertEqual(response['Content-Type'], 'image/jpeg')
+            self.assertEqual(len(b''.join(response.streaming_content)), 302)
+            self.assertIn('max-age=31536000', response['Cache-Control'])
+            self.assertIn('immutable', response['Cache-Control'])
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(url.split('?')[0])
+            self.assertIn('no-cache', response['Cache-Control'])
+            for field in ('coa', 'package'):
+                with self.subTest(field=field):
+                    response = self.client.get(reverse(
+                        'quality:batch_preview', args=[self.batch.pk, field]
+                    ))
+                    self.assertEqual(response.status_code, 404)
+            self.client.logout()
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+    @unittest.skipIf(previews.Image is None, 'Pillow is not installed')
+    def test_image(self):
+        """Test image preview fits preview size."""
+        storage = ContentAddressedStorage()
+        with open(os.path.join(SAMPLES, 'sample.jpg'), 'rb') as f:
+            name = storage.save('color/sample.jpg', ContentFile(f.read()))
+        path, _ = previews.get_preview(name, 64)
+        with previews.Image.open(path) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertLessEqual(max(image.size), 64)
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import json
+import logging
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from qcs.middleware import QueryRecorder
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('reviewer', password='pass')
+        user.user_permissions.add(
+            Permission.objects.get(codename='view_batch')
+        )
+        self.client.force_login(user)
+
+    @contextlib.contextmanager
+    def capture_log_output(self):
+        """Yield stream receiving INFO records of qcs.requests logger."""
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        logger = logging.getLogger('qcs.requests')
+        level = logger.level
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            yield stream
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(level)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0,
+                       REQUEST_METRICS_SERVER_TIMING=True)
+    def test_sampled_request(self):
+        """Test sampled request reports its queries and timings."""
+        url = reverse('quality:batch_list')
+        with self.assertLogs('qcs.requests', 'INFO') as logs:
+            # Session, user, two permission queries, count and page
+            with self.assertNumQueries(6) as queries:
+                response = self.client.get(url)
+        metrics = json.loads(logs.records[0].getMessage())
+        self.assertEqual(metrics['path'], url)
+        self.assertEqual(metrics['status'], 200)
+        self.assertEqual(metrics['queries'], len(queries))
+        self.assertEqual(len(metrics['slowest']), 3)
+        self.assertGreaterEqual(metrics['view_ms'], metrics['sql_ms'])
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^sql;dur=\d+\.\d;desc="6 queries", view;dur=\d+\.\d$'
+        )
+        with override_settings(REQUEST_METRICS_SERVER_TIMING=False):
+            with self.assertLogs('qcs.requests', 'INFO'):
+                response = self.client.get(url)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_request(self):
+        """Test request outside sample is not instrumented."""
+        with self.capture_log_output() as output:
+            response = self.client.get(reverse('quality:batch_list'))
+        self.assertEqual(output.getvalue(), '')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_slowest_queries(self):
+        """Test recorder keeps slowest queries only."""
+        recorder = QueryRecorder(slowest=2)
+        # Start and end time of queries a, b, c, d taking 3, 1, 4, 2 ms
+        times = [0.0, 0.003, 0.0, 0.001, 0.0, 0.004, 0.0, 0.002]
+        with mock.patch('qcs.middleware.time.perf_counter',
+                        side_effect=times):
+            for sql in 'abcd':
+                recorder(lambda *args: None, sql, None, False, {})
+        self.assertEqual(recorder.count, 4)
+        self.assertAlmostEqual(recorder.duration, 0.010)
+        self.assertEqual(
+            [sql for _, sql in recorder.slowest_queries()], ['c', 'a']
+        )
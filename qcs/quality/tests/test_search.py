@@ -0,0 +1,161 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from products.models import Product, Supplier
+from qcs import search
+from ..models import Batch
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Coatings Company',
+            country='Country',
+            city='City'
+        )
+        cls.products = [
+            Product.objects.create(
+                product_id=product_id,
+                code=code,
+                name=name,
+                formula='WB',
+                product_type='BC',
+                supplier=cls.supplier
+            )
+            for product_id, code, name in (
+                ('YZR123', '234-2', 'silver base coat'),
+                ('YZR124', '234-3', 'black base coat'),
+                ('QWE900', '777-1', 'clear coat'),
+            )
+        ]
+        cls.batches = [
+            Batch.objects.create(
+                product=product,
+                number=f'bx{product.pk}77',
+                size=3500,
+                m_date=datetime.date(2022, 1, 31),
+                exp_date=datetime.date(2022, 7, 31)
+            )
+            for product in cls.products
+        ]
+
+    def labels(self, term, kinds=None):
+        return [str(result.object) for result in search.search(term, kinds)]
+
+    def test_search(self):
+        """Test ranked substring search over all kinds."""
+        self.assertEqual(search.backend(), search.FTS5)
+        # Index query and objects of each found kind
+        with self.assertNumQueries(3):
+            results = search.search('coat')
+        self.assertCountEqual(
+            [(result.kind, str(result.object)) for result in results],
+            [('supplier', str(SearchTest.supplier)),
+             ('product', 'silver base coat'), ('product', 'black base coat'),
+             ('product', 'clear coat')]
+        )
+        self.assertEqual(results, sorted(results, key=lambda r: -r.rank))
+        self.assertCountEqual(self.labels('ZR12'), ['silver base coat',
+                                                    'black base coat'])
+        self.assertCountEqual(self.labels('base co', ['product']),
+                              ['silver base coat', 'black base coat'])
+        self.assertEqual(self.labels('coat bl'), ['black base coat'])
+        batch = SearchTest.batches[2]
+        self.assertEqual(
+            self.labels(batch.number[1:], ['batch']), [str(batch)]
+        )
+        self.assertEqual(self.labels('"; DROP'), [])
+
+    def test_short_term(self):
+        """Test terms too short for index are scanned."""
+        self.assertCountEqual(self.labels('bx', ['batch']),
+                              [str(batch) for batch in SearchTest.batches])
+
+    def test_signals(self):
+        """Test index follows saved and deleted objects."""
+        product = SearchTest.products[2]
+        product.name = 'matt clear coat'
+        product.save()
+        self.assertEqual(self.labels('matt'), ['matt clear coat'])
+        Batch.objects.filter(product=product).delete()
+        product.delete()
+        self.assertEqual(self.labels('matt'), [])
+
+    def test_rebuild(self):
+        """Test rebuild indexes objects stored without signals."""
+        Product.objects.bulk_create([Product(
+            product_id='BULK1', code='1', name='bulk primer',
+            formula='WB', product_type='PR', supplier=SearchTest.supplier
+        )])
+        self.assertEqual(self.labels('primer'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', '--kind', 'product',
+                     stdout=out)
+        self.assertIn('Search index rebuilt', out.getvalue())
+        self.assertEqual(self.labels('primer'), ['bulk primer'])
+
+    def test_scan_fallback(self):
+        """Test icontains scan without index."""
+        with mock.patch.object(search, 'backend', return_value=None):
+            self.assertCountEqual(
+                self.labels('base coat'),
+                ['silver base coat', 'black base coat']
+            )
+
+    def test_endpoint(self):
+        """Test search endpoint returns ranked results with urls."""
+        url = reverse('products:search')
+        self.assertEqual(self.client.get(url, {'q': 'coat'}).status_code, 302)
+        user = User.objects.create_user('reviewer', password='pass')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url, {'q': 'coat'}).status_code, 403)
+        user.user_permissions.add(
+            Permission.objects.get(codename='view_batch')
+        )
+        response = self.client.get(url, {'q': 'YZR123'})
+        self.assertEqual(response.json()['results'], [{
+            'kind': 'product',
+            'id': SearchTest.products[0].pk,
+            'label': 'silver base coat',
+            'url': reverse('products:product_detail',
+                           args=[SearchTest.products[0].pk]),
+            'rank': response.json()['results'][0]['rank'],
+        }])
+        response = self.client.get(url, {'q': 'coat', 'kind': 'supplier'})
+        self.assertEqual(
+            [result['kind'] for result in response.json()['results']],
+            ['supplier']
+        )
+        response = self.client.get(url, {'q': 'coat', 'limit': 2})
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertEqual(self.client.get(url).json()['results'], [])
+        for params in ({'q': 'coat', 'kind': 'package'},
+                       {'q': 'coat', 'limit': 'all'}):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_admin_search(self):
+        """Test admin search uses index, batches match by product."""
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='pass')
+        )
+        response = self.client.get(
+            reverse('admin:products_product_changelist'), {'q': 'base co'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 2)
+        response = self.client.get(
+            reverse('admin:quality_batch_changelist'), {'q': 'clear'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list),
+            [SearchTest.batches[2]]
+        )
@@ -0,0 +1,192 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from products.models import Product, Supplier
+from ..models import Batch, ColorData, ControlChart, ControlViolation
+from .. import spc
+from ..ingestion import ingest_readings
+from .test_ingestion import make_reading
+
+
+def run(values, center=0.0, sigma=1.0):
+    """Return list of violated rule sets of values fed into new chart."""
+    chart = ControlChart(center=center, sigma=sigma)
+    return [{rule for rule, _ in spc.step(chart, value)} for value in values]
+
+
+@override_settings(SPC_EWMA_LAMBDA=0.2, SPC_EWMA_WIDTH=3.0,
+                   SPC_CUSUM_K=0.5, SPC_CUSUM_H=5.0)
+class ControlRulesTest(SimpleTestCase):
+
+    def test_estimate_xbar_r(self):
+        """Test X-bar/R center line and sigma estimate."""
+        # Prepare test data
+        batch_ids = np.array([1, 1, 2, 2, 2])
+        values = np.tile(np.array([[1.0], [3.0], [2.0], [4.0], [6.0]]), 12)
+        # Run test
+        params = spc.estimate(batch_ids, values)
+        np.testing.assert_allclose(params['center'], 3.0)
+        np.testing.assert_allclose(
+            params['sigma'], (2 / spc.D2[2] + 4 / spc.D2[3]) / 2
+        )
+        np.testing.assert_allclose(params['mean_range'], 3.0)
+        self.assertEqual(params['subgroups'], 2)
+
+    def test_estimate_individuals(self):
+        """Test single reading batches use moving range of means."""
+        params = spc.estimate(
+            np.array([1, 2, 3]), np.tile(np.array([[1.0], [3.0], [2.0]]), 12)
+        )
+        np.testing.assert_allclose(params['center'], 2.0)
+        np.testing.assert_allclose(params['sigma'], 1.5 / spc.D2[2])
+        np.testing.assert_allclose(params['mean_range'], 0.0)
+
+    def test_western_electric_rules(self):
+        """Test each Western Electric rule fires on its pattern only."""
+        # Rule -> (values, index of first violating value)
+        cases = {
+            ControlViolation.WE1: ([0.5, 3.5], 1),
+            ControlViolation.WE2: ([2.5, 0.5, 2.5], 2),
+            ControlViolation.WE3: ([1.5, 1.5, 0.5, 1.5, 1.5], 4),
+            ControlViolation.WE4: ([0.5] * 8, 7),
+        }
+        for rule, (values, index) in cases.items():
+            with self.subTest(rule=rule):
+                results = run(values)
+                self.assertIn(rule, results[index])
+                self.assertFalse(
+                    any(rule in rules for rules in results[:index]),
+                    'Rule fired before pattern was complete'
+                )
+
+    def test_sides_are_not_combined(self):
+        """Test points on opposite sides do not form patterns."""
+        results = run([2.5, -2.5, 0.5, -0.5, 0.5, -0.5, 0.5, -0.5])
+        self.assertEqual(results, [set()] * 8)
+
+    def test_cusum(self):
+        """Test CUSUM detects sustained small shift and restarts."""
+        chart = ControlChart(center=0.0, sigma=1.0)
+        signals = [
+            index for index in range(12)
+            if (ControlViolation.CUSUM, 6.0) in spc.step(chart, 1.5)
+        ]
+        # Upper sum grows by 1.5 - 0.5 per reading, signals above 5
+        self.assertEqual(signals, [5, 11])
+        self.assertEqual(chart.cusum_high, 0.0)
+
+    def test_ewma(self):
+        """Test EWMA follows shift and state is updated."""
+        chart = ControlChart(center=10.0, sigma=1.0)
+        self.assertEqual(spc.step(chart, 10.0), [])
+        self.assertEqual(chart.ewma, 10.0)
+        self.assertEqual(chart.count, 1)
+        results = run([1.5] * 10)
+        self.assertNotIn(ControlViolation.EWMA, results[0])
+        self.assertIn(ControlViolation.EWMA, results[-1])
+
+
+@override_settings(SPC_INLINE=True, SPC_MIN_SUBGROUPS=5)
+class ControlChartMonitoringTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=Supplier.objects.create(
+                name='Company',
+                country='Country',
+                city='City'
+            )
+        )
+        cls.batches = [
+            Batch.objects.create(
+                product=cls.product,
+                number=f'bx12{index}',
+                size=3500,
+                m_date=datetime.date(2022, 5, 31),
+                exp_date=datetime.date(2022, 8, 31)
+            )
+            for index in range(5)
+        ]
+        # Two readings per batch, batch means alternate around 50.9
+        ColorData.objects.bulk_create([
+            ColorData(
+                batch=batch,
+                category='QC',
+                **{name: 50 + index % 2 + offset
+                   for name in ColorData.MEASUREMENT_FIELDS}
+            )
+            for index, batch in enumerate(cls.batches)
+            for offset in (0, 1)
+        ])
+
+    def compute(self):
+        out = StringIO()
+        call_command('compute_control_limits', stdout=out)
+        self.assertIn('12 control charts computed', out.getvalue())
+
+    def test_compute_limits(self):
+        """Test control charts are computed per measurement field."""
+        self.compute()
+        chart = ControlChart.objects.get(
+            product=ControlChartMonitoringTest.product, field='de_45'
+        )
+        self.assertAlmostEqual(chart.center, 50.9)
+        self.assertAlmostEqual(chart.sigma, 1 / spc.D2[2])
+        self.assertEqual(chart.subgroups, 5)
+        self.assertEqual(chart.count, 0)
+        with override_settings(SPC_MIN_SUBGROUPS=6):
+            self.assertEqual(spc.compute_limits([chart.product]), 0)
+        self.assertFalse(ControlChart.objects.exists())
+
+    def test_inline_evaluation(self):
+        """Test ingested and saved readings are evaluated."""
+        self.compute()
+        readings = [make_reading(batch='bx120') for _ in range(3)]
+        for reading, value in zip(readings, ('50.50', '51.00', '60.00')):
+            reading.update(dict.fromkeys(ColorData.MEASUREMENT_FIELDS, value))
+        created, errors = ingest_readings(readings)
+        self.assertEqual((created, errors), (3, []))
+        violations = ControlViolation.objects.filter(
+            rule=ControlViolation.WE1
+        )
+        self.assertEqual(violations.count(), 12)
+        self.assertEqual(
+            {violation.batch_id for violation in violations},
+            {ControlChartMonitoringTest.batches[0].pk}
+        )
+        # Violations refer to bulk inserted readings
+        self.assertEqual(
+            {violation.reading.l_25 for violation in violations},
+            {Decimal('60.00')}
+        )
+        self.assertEqual(
+            set(ControlChart.objects.values_list('count', flat=True)), {3}
+        )
+        saved = ColorData.objects.create(
+            batch=ControlChartMonitoringTest.batches[1],
+            category='QC',
+            **{name: 40 for name in ColorData.MEASUREMENT_FIELDS}
+        )
+        self.assertEqual(
+            ControlViolation.objects.filter(
+                reading=saved, rule=ControlViolation.WE1
+            ).count(),
+            12
+        )
+
+    def test_evaluation_without_charts(self):
+        """Test readings of products without charts are skipped."""
+        readings = list(ColorData.objects.all()[:3])
+        with self.assertNumQueries(2):
+            self.assertEqual(spc.evaluate(readings), [])
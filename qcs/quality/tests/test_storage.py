@@ -0,0 +1,80 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            DOCUMENT_BLOB_DIR='blobs/'
+        )
+        self.settings_override.enable()
+        self.storage = ContentAddressedStorage()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_identical_files_are_deduplicated(self):
+        """Test identical documents share one blob."""
+        # Prepare test data
+        content = b'%PDF-1.4 certificate of analysis' * 1000
+        digest = hashlib.sha256(content).hexdigest()
+        # Run test
+        first = self.storage.save(
+            'coa/product_1_coa.pdf', ContentFile(content)
+        )
+        second = self.storage.save(
+            'coa/product_2_coa.pdf', ContentFile(content)
+        )
+        blob_path = self.storage.blob_path(digest, '.pdf')
+        self.assertEqual(first, 'coa/product_1_coa.pdf')
+        self.assertEqual(second, 'coa/product_2_coa.pdf')
+        self.assertTrue(os.path.exists(blob_path))
+        self.assertEqual(os.stat(blob_path).st_nlink, 3)
+        self.assertEqual(
+            os.stat(self.storage.path(first)).st_ino,
+            os.stat(self.storage.path(second)).st_ino,
+            'Identical documents are stored twice'
+        )
+        self.assertEqual(self.storage.digest(second), digest)
+        with self.storage.open(first) as file_obj:
+            self.assertEqual(file_obj.read(), content)
+
+    def test_name_conflict(self):
+        """Test existing name is not overwritten."""
+        first = self.storage.save('coa/a.pdf', ContentFile(b'first'))
+        second = self.storage.save('coa/a.pdf', ContentFile(b'second'))
+        self.assertNotEqual(first, second)
+        with self.storage.open(first) as file_obj:
+            self.assertEqual(file_obj.read(), b'first')
+
+    def test_collect_garbage(self):
+        """Test only blobs without documents are collected."""
+        # Prepare test data
+        kept = self.storage.save('coa/kept.pdf', ContentFile(b'kept'))
+        deleted = self.storage.save('coa/deleted.pdf', ContentFile(b'gone'))
+        self.storage.delete(deleted)
+        # Run test
+        self.assertEqual(self.storage.collect_garbage(), (0, 0))
+        out = StringIO()
+        call_command(
+            'collect_document_blobs', '--grace-period', '0', stdout=out
+        )
+        self.assertIn('1 orphan blobs removed (4 bytes)', out.getvalue())
+        self.assertFalse(os.path.exists(self.storage.blob_path(
+            hashlib.sha256(b'gone').hexdigest(), '.pdf'
+        )))
+        with self.storage.open(kept) as file_obj:
+            self.assertEqual(file_obj.read(), b'kept')
@@ -0,0 +1,120 @@
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from products.models import Product, Supplier
+from ..models import Batch, BatchColorSummary, ColorData
+from .. import summaries
+from ..ingestion import ingest_readings
+from .test_ingestion import make_reading
+
+
+def make_color_data(batch, value, de=0.5):
+    """Create reading with all L/a/b values set to value."""
+    return ColorData.objects.create(
+        batch=batch,
+        category='QC',
+        **{name: de if name.startswith('de') else value
+           for name in ColorData.MEASUREMENT_FIELDS}
+    )
+
+
+@override_settings(BATCH_MAX_DELTA_E=1.0)
+class BatchColorSummaryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier
+        )
+        cls.batch = Batch.objects.create(
+            product=cls.product,
+            number='bx123',
+            size=3500,
+            m_date=datetime.date(2022, 5, 31),
+            exp_date=datetime.date(2022, 8, 31)
+        )
+
+    def get_summary(self):
+        """Return summary of test batch."""
+        return BatchColorSummary.objects.get(batch=BatchColorSummaryTest.batch)
+
+    def test_insert_updates_summary(self):
+        """Test new readings are folded into summary."""
+        for value in (10, 30, 20):
+            last = make_color_data(BatchColorSummaryTest.batch, value)
+        summary = self.get_summary()
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(summary.mean('l_25'), 20)
+        self.assertEqual(summary.min_a_45, 10)
+        self.assertEqual(summary.max_b_75, 30)
+        self.assertEqual(summary.last_timestamp, last.timestamp)
+        self.assertTrue(summary.passed)
+
+    def test_update_and_delete(self):
+        """Test changed and deleted readings are subtracted."""
+        readings = [
+            make_color_data(BatchColorSummaryTest.batch, value)
+            for value in (10, 30, 20)
+        ]
+        readings[0].l_25 = 40
+        readings[0].de_45 = 2
+        readings[0].save()
+        summary = self.get_summary()
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(summary.sum_l_25, 90)
+        self.assertEqual(summary.max_l_25, 40)
+        self.assertEqual(summary.min_l_25, 20)
+        self.assertFalse(summary.passed)
+        readings[0].delete()
+        summary = self.get_summary()
+        self.assertEqual(summary.count, 2)
+        self.assertEqual(summary.max_l_25, 30)
+        self.assertTrue(summary.passed)
+        for reading in readings[1:]:
+            reading.delete()
+        summary = self.get_summary()
+        self.assertEqual(summary.count, 0)
+        self.assertIsNone(summary.min_l_25)
+        self.assertIsNone(summary.passed)
+        self.assertEqual(summaries.check(), [])
+
+    def test_bulk_ingestion_updates_summary(self):
+        """Test bulk ingestion keeps summary up to date."""
+        make_color_data(BatchColorSummaryTest.batch, 10)
+        ingest_readings([make_reading() for _ in range(4)])
+        summary = self.get_summary()
+        self.assertEqual(summary.count, 5)
+        self.assertEqual(summary.max_l_25, 50.5)
+        self.assertEqual(summaries.check(), [])
+
+    def test_rebuild_and_check_commands(self):
+        """Test consistency check detects drift and rebuild fixes it."""
+        for value in (10, 30):
+            make_color_data(BatchColorSummaryTest.batch, value)
+        BatchColorSummary.objects.update(count=7)
+        with self.assertRaises(CommandError):
+            call_command(
+                'rebuild_color_summaries', '--check', stdout=StringIO()
+            )
+        out = StringIO()
+        call_command('rebuild_color_summaries', '--chunk-size', '1',
+                     stdout=out)
+        self.assertIn('1 batch summaries rebuilt', out.getvalue())
+        self.assertEqual(self.get_summary().count, 2)
+        self.assertTrue(self.get_summary().passed)
+        out = StringIO()
+        call_command('rebuild_color_summaries', '--check', stdout=out)
+        self.assertIn('All summaries consistent', out.getvalue())
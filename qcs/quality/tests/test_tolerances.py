@@ -0,0 +1,150 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from products.models import Product, Supplier
+from .. import tolerances
+from ..ingestion import ingest_readings
+from ..models import Batch, ColorData, ColorEvaluation, ColorTolerance
+from .test_ingestion import make_reading
+
+
+class ColorToleranceTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.products = [
+            Product.objects.create(
+                product_id=product_id,
+                code='234-2',
+                name=f'some base coat {product_id}',
+                formula='WB',
+                product_type='BC',
+                supplier=supplier
+            )
+            for product_id in ('YZR123', 'YZR124')
+        ]
+        cls.batches = [
+            Batch.objects.create(
+                product=product,
+                number='bx123',
+                size=3500,
+                m_date=datetime.date(2022, 1, 31),
+                exp_date=datetime.date(2022, 7, 31)
+            )
+            for product in cls.products
+        ]
+        # Only first product has tolerance
+        ColorTolerance.objects.create(
+            product=cls.products[0],
+            max_de_45='1.50',
+            min_l_25='50.00',
+            max_l_25='51.00'
+        )
+        out_of_window = make_reading()
+        out_of_window['l_25'] = '49.80'
+        too_different = make_reading()
+        too_different['de_45'] = '1.75'
+        too_different['l_25'] = '51.20'
+        ingest_readings([
+            make_reading(), out_of_window, too_different,
+            make_reading(product_id='YZR124')
+        ])
+
+    def test_evaluate(self):
+        """Test readings are evaluated against product tolerance."""
+        batch = ColorToleranceTest.batches[0]
+        # Ingested readings are evaluated as they are stored
+        self.assertEqual(
+            list(ColorEvaluation.objects.order_by('reading_id').values_list(
+                'reading__l_25', 'passed'
+            )),
+            [(Decimal('50.50'), True), (Decimal('49.80'), False),
+             (Decimal('51.20'), False)]
+        )
+        # Readings, tolerances, delete and insert of evaluations
+        with self.assertNumQueries(4):
+            counts = tolerances.evaluate(ColorData.objects.all())
+        self.assertEqual(counts, {'passed': 1, 'failed': 2, 'skipped': 1})
+        self.assertEqual(
+            list(ColorEvaluation.objects.order_by('reading_id').values_list(
+                'batch_id', 'passed', 'reasons'
+            )),
+            [
+                (batch.pk, True, ''),
+                (batch.pk, False, 'L25 49.80 < 50.00'),
+                (batch.pk, False, 'L25 51.20 > 51.00; dE45 1.75 > 1.50'),
+            ]
+        )
+        # Evaluating again replaces results
+        tolerances.evaluate(tolerances.batch_readings([batch.pk]))
+        self.assertEqual(ColorEvaluation.objects.count(), 3)
+        # Readings, delete and insert of evaluations per chunk, tolerance
+        # of each product loaded once, last empty chunk
+        with self.assertNumQueries(14):
+            self.assertEqual(
+                tolerances.evaluate(ColorData.objects.all(), chunk_size=1),
+                counts
+            )
+        self.assertEqual(ColorEvaluation.objects.count(), 3)
+
+    def test_batch_results(self):
+        """Test batch passes only with all readings passed."""
+        batches = [batch.pk for batch in ColorToleranceTest.batches]
+        tolerances.evaluate(tolerances.day_readings())
+        self.assertEqual(tolerances.batch_results(batches), {
+            batches[0]: {'evaluated': 3, 'failed': 2, 'passed': False},
+            batches[1]: {'evaluated': 0, 'failed': 0, 'passed': None},
+        })
+        ColorEvaluation.objects.all().delete()
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+        self.assertEqual(
+            tolerances.evaluate(tolerances.day_readings(tomorrow)),
+            {'passed': 0, 'failed': 0, 'skipped': 0}
+        )
+        self.assertFalse(ColorEvaluation.objects.exists())
+
+    def test_invalidation(self):
+        """Test changed readings and tolerances replace evaluations."""
+        tolerances.evaluate(ColorData.objects.all())
+        reading = ColorData.objects.get(
+            evaluation__passed=False, l_25='49.80'
+        )
+        reading.l_25 = '50.50'
+        reading.save()
+        self.assertTrue(ColorEvaluation.objects.get(reading=reading).passed)
+        reading.pk = None
+        reading.l_25 = '49.00'
+        reading.save()
+        self.assertFalse(ColorEvaluation.objects.get(reading=reading).passed)
+        reading.delete()
+        tolerance = ColorTolerance.objects.get(
+            product=ColorToleranceTest.products[0]
+        )
+        tolerance.max_de_45 = '2.00'
+        tolerance.max_l_25 = '52.00'
+        # Product readings are evaluated again after commit
+        with self.captureOnCommitCallbacks(execute=True):
+            tolerance.save()
+        self.assertFalse(
+            ColorEvaluation.objects.filter(passed=False).exists()
+        )
+        tolerance.delete()
+        self.assertFalse(ColorEvaluation.objects.exists())
+
+    def test_command(self):
+        """Test evaluate_color_data command."""
+        out = StringIO()
+        call_command('evaluate_color_data', '--batch',
+                     str(ColorToleranceTest.batches[0].pk), stdout=out)
+        self.assertIn('failed, 2 of 3 readings failed', out.getvalue())
+        self.assertIn('3 readings evaluated', out.getvalue())
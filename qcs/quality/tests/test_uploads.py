@@ -0,0 +1,184 @@
+import datetime
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from products.models import Product, Supplier
+from .. import uploads
+from ..forms import BatchForm
+from ..models import Batch, BatchUpload
+
+SAMPLE_FILES_PATH = Path(__file__).parent
+
+
+class AsyncUploadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.supplier = Supplier.objects.create(
+            name='Company',
+            country='Country',
+            city='City'
+        )
+        cls.product = Product.objects.create(
+            product_id='YZR123',
+            code='234-2',
+            name='some base coat 123',
+            formula='WB',
+            product_type='BC',
+            supplier=cls.supplier
+        )
+        cls.batch = Batch.objects.create(
+            product=cls.product,
+            number='bx123',
+            size=3500,
+            m_date=datetime.date(2022, 5, 31),
+            exp_date=datetime.date(2022, 8, 31)
+        )
+        cls.user = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.settings_override = override_settings(
+            MEDIA_ROOT=AsyncUploadTest.media_root,
+            UPLOAD_SPOOL_DIR=Path(AsyncUploadTest.media_root) / 'spool',
+            ASYNC_UPLOADS=True,
+            UPLOAD_WORKERS=0
+        )
+        self.settings_override.enable()
+        self.client.force_login(AsyncUploadTest.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def sample_file(self, path, name):
+        """Return uploaded file with content of sample file."""
+        return SimpleUploadedFile(
+            name, (SAMPLE_FILES_PATH / path).read_bytes()
+        )
+
+    def form_data(self):
+        """Return batch form data of test batch."""
+        batch = AsyncUploadTest.batch
+        return {
+            'product': batch.product_id,
+            'number': batch.number,
+            'size': batch.size,
+            'm_date': batch.m_date,
+            'exp_date': batch.exp_date,
+        }
+
+    def test_form_defers_uploads(self):
+        """Test form keeps new uploads out of model validation."""
+        # Prepare test data
+        files = {
+            'coa': self.sample_file('invalid_sample_files/sample.html',
+                                    'coa.pdf')
+        }
+        # Run test
+        form = BatchForm(
+            self.form_data(), files, instance=AsyncUploadTest.batch
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(list(form.pending_uploads), ['coa'])
+        self.assertFalse(form.cleaned_data['coa'])
+        with override_settings(ASYNC_UPLOADS=False):
+            form = BatchForm(
+                self.form_data(), files, instance=AsyncUploadTest.batch
+            )
+            self.assertFalse(form.is_valid())
+
+    def test_admin_upload_processed(self):
+        """Test admin upload is spooled, validated and attached."""
+        # Prepare test data
+        data = {
+            **self.form_data(),
+            'uploads-TOTAL_FORMS': 0,
+            'uploads-INITIAL_FORMS': 0,
+            'coa': self.sample_file('valid_sample_files/sample.pdf',
+                                    'scan.pdf'),
+            'color_sheet': self.sample_file(
+                'invalid_sample_files/sample.html', 'color.png'
+            ),
+        }
+        url = reverse(
+            'admin:quality_batch_change', args=[AsyncUploadTest.batch.pk]
+        )
+        # Run test
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        batch = Batch.objects.get(pk=AsyncUploadTest.batch.pk)
+        self.assertEqual(
+            batch.coa.name, 'coa/some_base_coat_123_bx123_coa.pdf'
+        )
+        self.assertFalse(batch.color_sheet)
+        statuses = dict(batch.uploads.values_list('field', 'status'))
+        self.assertEqual(
+            statuses,
+            {'coa': BatchUpload.DONE, 'color_sheet': BatchUpload.FAILED}
+        )
+        self.assertIn(
+            'Invalid file type',
+            batch.uploads.get(field='color_sheet').error
+        )
+        self.assertEqual(
+            list((Path(AsyncUploadTest.media_root) / 'spool').iterdir()), [],
+            'Spooled files were not removed'
+        )
+
+    def test_recover_uploads(self):
+        """Test uploads orphaned by restart are processed or failed."""
+        # Prepare test data
+        batch = AsyncUploadTest.batch
+        spool_dir = Path(AsyncUploadTest.media_root) / 'spool'
+        pending = uploads.submit(
+            batch, 'coa',
+            self.sample_file('valid_sample_files/sample.pdf', 'scan.pdf')
+        )
+        stale = BatchUpload.objects.create(
+            batch=batch, field='color_sheet', original_name='color.png',
+            spool_path=str(spool_dir / 'lost.png'),
+            status=BatchUpload.PROCESSING
+        )
+        running = BatchUpload.objects.create(
+            batch=batch, field='color_sheet', original_name='color.png',
+            spool_path=str(spool_dir / 'running.png'),
+            status=BatchUpload.PROCESSING
+        )
+        BatchUpload.objects.filter(pk=stale.pk).update(
+            updated=timezone.now() - datetime.timedelta(hours=2)
+        )
+        orphan = spool_dir / 'orphan.pdf'
+        orphan.write_bytes(b'orphan')
+        os.utime(orphan, (0, 0))
+        fresh = spool_dir / 'fresh.pdf'
+        fresh.write_bytes(b'fresh')
+        # Run test
+        out = StringIO()
+        call_command('recover_uploads', stdout=out)
+        self.assertIn('1 uploads processed, 1 failed, 1 spooled files '
+                      'removed', out.getvalue())
+        statuses = dict(BatchUpload.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {
+            pending.pk: BatchUpload.DONE,
+            stale.pk: BatchUpload.FAILED,
+            running.pk: BatchUpload.PROCESSING
+        })
+        self.assertEqual(list(spool_dir.iterdir()), [fresh])
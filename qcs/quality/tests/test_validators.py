@@ -12,10 +12,12 @@ import magic
 from pathlib import Path
 from dataclasses import dataclass
 
+from django.conf import settings
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 
 from ..models import file_type_validator
+from ..filetypes import guess_file_type
 
 
 @dataclass
@@ -30,6 +32,22 @@ class DjangoFieldFileMimic():
         return self.file_obj
 
 
+class ReadCountingFile():
+    """Binary file wrapper counting bytes read."""
+
+    def __init__(self, file_path):
+        self.file_obj = open(file_path, mode='rb')
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.file_obj.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.file_obj, name)
+
+
 class CoaFileTypeValidatorTest(TestCase):
 
     def test_valid_file_types(self):
@@ -78,3 +96,53 @@ class CoaFileTypeValidatorTest(TestCase):
                     django_field_file.file_obj.closed,
                     'File object was closed by coa_file_type_validator()'
                 )
+
+    def test_validator_rewinds_file(self):
+        """Test file position is restored after validation."""
+        # Get directory with sample files 'quality/tests/valid_sample_files'
+        valid_files_path = Path(__file__).parent / 'valid_sample_files'
+        # Run test
+        for file_path in valid_files_path.iterdir():
+            django_field_file = DjangoFieldFileMimic(file_path)
+            with self.subTest(django_field_file=django_field_file):
+                file_type_validator(django_field_file)
+                self.assertEqual(
+                    django_field_file.file_obj.tell(),
+                    0,
+                    'File position was not restored by file_type_validator()'
+                )
+
+
+class GuessFileTypeTest(TestCase):
+
+    def test_detected_file_types(self):
+        """Test header-only detection matches full file detection."""
+        # Get directory with sample files 'quality/tests/valid_sample_files'
+        valid_files_path = Path(__file__).parent / 'valid_sample_files'
+        # Run test
+        for file_path in valid_files_path.iterdir():
+            with self.subTest(file_path=file_path):
+                with open(file_path, mode='rb') as file_obj:
+                    self.assertEqual(
+                        guess_file_type(file_obj),
+                        magic.from_buffer(file_obj.read(), mime=True),
+                        f'Incorrect file type detected for {file_path}'
+                    )
+
+    def test_bounded_read(self):
+        """Test only file header and container directory are read."""
+        # Prepare test data
+        # Container directory lookup may read one extra OLE2 sector
+        max_bytes_read = settings.FILE_TYPE_SNIFF_SIZE + 4096
+        valid_files_path = Path(__file__).parent / 'valid_sample_files'
+        # Run test
+        for file_path in valid_files_path.iterdir():
+            counting_file = ReadCountingFile(file_path)
+            with self.subTest(file_path=file_path):
+                guess_file_type(counting_file)
+                self.assertLessEqual(
+                    counting_file.bytes_read,
+                    max_bytes_read,
+                    f'Too many bytes read to detect type of {file_path}'
+                )
+            counting_file.close()
@@ -0,0 +1,73 @@
+"""
+API token authentication of machine clients.
+
+Spectrophotometer stations can not obtain session cookies and CSRF
+tokens, they send 'Authorization: Token <key>' instead. Only the SHA-256
+digest of a key is stored (ApiToken.digest), new keys are issued by the
+create_api_token command. A client acts with the permissions of the
+token user.
+
+token_auth views accept token and session authenticated requests:
+requests with a token are exempt from CSRF checks, session requests are
+still checked.
+"""
+import functools
+import hashlib
+import secrets
+
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+
+from .models import ApiToken
+
+SCHEME = 'Token'
+
+
+def digest(key):
+    """Return stored digest of token key."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def create_token(user, name):
+    """Create ApiToken of user, return (token, key) shown only once."""
+    key = secrets.token_urlsafe(32)
+    token = ApiToken.objects.create(user=user, name=name, digest=digest(key))
+    return token, key
+
+
+def authenticate(header):
+    """Return active user of Authorization header token or None."""
+    scheme, _, key = header.partition(' ')
+    if scheme != SCHEME or not key.strip():
+        return None
+    token = ApiToken.objects.select_related('user').filter(
+        digest=digest(key.strip()), user__is_active=True
+    ).first()
+    return token.user if token else None
+
+
+def _csrf_check(request):
+    return CsrfViewMiddleware(lambda request: None).process_view(
+        request, None, (), {}
+    )
+
+
+def token_auth(view):
+    """View decorator authenticating requests by API token or session."""
+    @csrf_exempt
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        header = request.headers.get('Authorization')
+        if header:
+            user = authenticate(header)
+            if user is None:
+                return JsonResponse({'error': 'Invalid API token'},
+                                    status=401)
+            request.user = user
+        else:
+            response = _csrf_check(request)
+            if response is not None:
+                return response
+        return view(request, *args, **kwargs)
+    return wrapper
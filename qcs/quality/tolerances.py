@@ -0,0 +1,244 @@
+"""
+Vectorized evaluation of color data against product tolerances.
+
+Readings are loaded as one float matrix (columns in
+ColorData.MEASUREMENT_FIELDS order). Tolerances become lower and upper
+bound matrices, with -inf/inf for limits that are not set, and are
+indexed by the product of every reading. One comparison then checks all
+readings and fields at once. Failure reasons are formatted only for
+failed readings.
+
+Results replace earlier ColorEvaluation rows of the same readings.
+Querysets are read in primary key chunks, so memory is bounded by the
+chunk size. New readings are evaluated as they are stored, changed
+readings and tolerances are evaluated again by quality.signals.
+Readings of products without a ColorTolerance are skipped. A batch
+passes when all of its evaluated readings pass.
+"""
+import datetime
+
+import numpy as np
+from django.db import models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import ColorData, ColorEvaluation, ColorTolerance
+
+FIELDS = ColorData.MEASUREMENT_FIELDS
+
+# Measurement field -> label used in failure reasons
+LABELS = {
+    name: ColorData._meta.get_field(name).verbose_name for name in FIELDS
+}
+
+
+def bounds(tolerances):
+    """Return (lower, upper) float arrays of shape (tolerances, fields)."""
+    lower = np.full((len(tolerances), len(FIELDS)), -np.inf)
+    upper = np.full((len(tolerances), len(FIELDS)), np.inf)
+    for row, tolerance in enumerate(tolerances):
+        for column, name in enumerate(FIELDS):
+            minimum = getattr(tolerance, f'min_{name}', None)
+            maximum = getattr(tolerance, f'max_{name}')
+            if minimum is not None:
+                lower[row, column] = float(minimum)
+            if maximum is not None:
+                upper[row, column] = float(maximum)
+    return lower, upper
+
+
+def check(values, lower, upper):
+    """
+    Return (below, above) boolean arrays of values outside bounds.
+
+    Values, lower and upper bounds broadcast, typically (readings, fields)
+    values against bounds indexed by reading product.
+    """
+    return values < lower, values > upper
+
+
+def reasons(values, lower, upper, below, above):
+    """Return failure reason text of one reading row."""
+    messages = []
+    for column in np.flatnonzero(below | above):
+        if below[column]:
+            sign, limit = '<', lower[column]
+        else:
+            sign, limit = '>', upper[column]
+        messages.append(
+            f'{LABELS[FIELDS[column]]} {values[column]:.2f} '
+            f'{sign} {limit:.2f}'
+        )
+    return '; '.join(messages)
+
+
+def _matrix(readings, chunk_size):
+    """
+    Yield (ids, batch ids, product ids, values) arrays of readings.
+
+    Readings are read in primary key chunks of chunk_size rows.
+    """
+    last = 0
+    while True:
+        rows = list(readings.filter(pk__gt=last).order_by('pk').values_list(
+            'pk', 'batch_id', 'batch__product_id',
+            *[Cast(name, models.FloatField()) for name in FIELDS]
+        )[:chunk_size])
+        if not rows:
+            return
+        last = rows[-1][0]
+        data = np.array(rows, dtype=np.float64)
+        ids = data[:, :3].astype(np.int64)
+        yield ids[:, 0], ids[:, 1], ids[:, 2], data[:, 3:]
+        if len(rows) < chunk_size:
+            return
+
+
+def _evaluations(ids, batch_ids, keys, values, tolerances):
+    """
+    Return (evaluations, counts) of reading arrays.
+
+    Tolerances is {key: ColorTolerance}, keys holds the tolerance key of
+    every reading. Readings without tolerance are skipped.
+    """
+    tolerance_keys = np.array(sorted(tolerances), dtype=np.int64)
+    known = np.isin(keys, tolerance_keys)
+    ids, batch_ids, values = ids[known], batch_ids[known], values[known]
+    index = np.searchsorted(tolerance_keys, keys[known])
+    lower, upper = bounds(
+        [tolerances[key] for key in tolerance_keys.tolist()]
+    )
+    lower, upper = lower[index], upper[index]
+    below, above = check(values, lower, upper)
+    failed = (below | above).any(axis=1)
+    evaluations = [
+        ColorEvaluation(
+            reading_id=reading_id,
+            batch_id=batch_id,
+            passed=True
+        )
+        for reading_id, batch_id in zip(ids.tolist(), batch_ids.tolist())
+    ]
+    for row in np.flatnonzero(failed):
+        evaluations[row].passed = False
+        evaluations[row].reasons = reasons(
+            values[row], lower[row], upper[row], below[row], above[row]
+        )
+    return evaluations, {
+        'passed': int(len(failed) - failed.sum()),
+        'failed': int(failed.sum()),
+        'skipped': int(len(known) - known.sum()),
+    }
+
+
+def evaluate(readings, chunk_size=2000):
+    """
+    Evaluate ColorData queryset against tolerances of reading products.
+
+    Readings are evaluated in chunks of chunk_size, results of each chunk
+    replace earlier ones in one transaction. Returns dict with numbers of
+    'passed', 'failed' and 'skipped' readings, skipped readings belong to
+    products without tolerance.
+    """
+    counts = {'passed': 0, 'failed': 0, 'skipped': 0}
+    # Product id -> tolerance, of products seen in earlier chunks too
+    tolerances = {}
+    loaded = set()
+    for ids, batch_ids, product_ids, values in _matrix(readings,
+                                                       chunk_size):
+        products = set(product_ids.tolist()) - loaded
+        if products:
+            tolerances.update(
+                (tolerance.product_id, tolerance)
+                for tolerance in ColorTolerance.objects.filter(
+                    product_id__in=products
+                )
+            )
+            loaded |= products
+        evaluations, chunk_counts = _evaluations(
+            ids, batch_ids, product_ids, values, tolerances
+        )
+        with transaction.atomic(savepoint=False):
+            ColorEvaluation.objects.filter(
+                reading_id__in=ids.tolist()
+            ).delete()
+            ColorEvaluation.objects.bulk_create(evaluations)
+        for key, count in chunk_counts.items():
+            counts[key] += count
+    return counts
+
+
+def evaluate_new(readings):
+    """
+    Evaluate newly stored ColorData objects against product tolerances.
+
+    Tolerances are fetched with one query, readings without primary key
+    are skipped. Returns list of created ColorEvaluation objects.
+    """
+    readings = [reading for reading in readings if reading.pk]
+    if not readings:
+        return []
+    # Batch id -> tolerance of batch product
+    tolerances = {
+        tolerance.batch_pk: tolerance
+        for tolerance in ColorTolerance.objects.filter(
+            product__batches__in={reading.batch_id for reading in readings}
+        ).annotate(batch_pk=F('product__batches'))
+    }
+    if not tolerances:
+        return []
+    ids = np.array([reading.pk for reading in readings], dtype=np.int64)
+    batch_ids = np.array([reading.batch_id for reading in readings],
+                         dtype=np.int64)
+    values = np.array([
+        [np.nan if getattr(reading, name) is None
+         else float(getattr(reading, name)) for name in FIELDS]
+        for reading in readings
+    ], dtype=np.float64)
+    evaluations, _ = _evaluations(ids, batch_ids, batch_ids, values,
+                                  tolerances)
+    return ColorEvaluation.objects.bulk_create(evaluations)
+
+
+def batch_readings(batch_ids):
+    """Return readings of batches."""
+    return ColorData.objects.filter(batch_id__in=batch_ids)
+
+
+def day_readings(date=None):
+    """Return readings taken on local date, today by default."""
+    date = date or timezone.localdate()
+    start = timezone.make_aware(
+        datetime.datetime.combine(date, datetime.time())
+    )
+    # Timestamp range instead of __date lookup keeps index usable
+    return ColorData.objects.filter(
+        timestamp__gte=start,
+        timestamp__lt=start + datetime.timedelta(days=1)
+    )
+
+
+def batch_results(batch_ids):
+    """
+    Return {batch id: {'evaluated', 'failed', 'passed'}} of batches.
+
+    'passed' is None for batches without evaluated readings.
+    """
+    rows = ColorEvaluation.objects.filter(
+        batch_id__in=batch_ids
+    ).order_by().values('batch_id').annotate(
+        evaluated=Count('id'),
+        failed=Count('id', filter=Q(passed=False))
+    )
+    results = {
+        batch_id: {'evaluated': 0, 'failed': 0, 'passed': None}
+        for batch_id in batch_ids
+    }
+    for row in rows:
+        results[row['batch_id']] = {
+            'evaluated': row['evaluated'],
+            'failed': row['failed'],
+            'passed': not row['failed'],
+        }
+    return results
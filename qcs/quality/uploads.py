@@ -0,0 +1,173 @@
+"""
+Background processing of batch document uploads.
+
+With settings.ASYNC_UPLOADS enabled, uploaded COA and color sheet files
+are spooled to settings.UPLOAD_SPOOL_DIR and a BatchUpload record is
+queued, so the request returns without validating or storing the file.
+A local thread pool of settings.UPLOAD_WORKERS threads then runs the
+Batch field validators, stores the file through the field upload_to
+callable (coa_file_path/color_file_path) and attaches it to the batch.
+
+Queued uploads do not survive a restart of the process running them, the
+recover_uploads management command (run on deployment) processes uploads
+left pending or processing and cleans the spool directory.
+"""
+import datetime
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Batch, BatchUpload
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return shared upload worker pool, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_WORKERS,
+                thread_name_prefix='qcs-upload'
+            )
+    return _executor
+
+
+def spool(uploaded_file):
+    """Move or copy uploaded file to spool directory and return its path."""
+    spool_dir = Path(settings.UPLOAD_SPOOL_DIR)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f'{uuid.uuid4().hex}{Path(uploaded_file.name).suffix}'
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        # Large uploads already sit in a temporary file, rename it
+        file_move_safe(uploaded_file.temporary_file_path(), str(path))
+    else:
+        with open(path, 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+    return str(path)
+
+
+def submit(batch, field, uploaded_file):
+    """Spool uploaded file for batch field and queue its processing."""
+    upload = BatchUpload.objects.create(
+        batch=batch,
+        field=field,
+        original_name=os.path.basename(uploaded_file.name),
+        spool_path=spool(uploaded_file)
+    )
+    if settings.UPLOAD_WORKERS:
+        transaction.on_commit(lambda: get_executor().submit(run, upload.pk))
+    else:
+        transaction.on_commit(lambda: process(upload.pk))
+    return upload
+
+
+def run(upload_id):
+    """Worker thread entry point."""
+    close_old_connections()
+    try:
+        process_or_fail(upload_id)
+    finally:
+        close_old_connections()
+
+
+def process_or_fail(upload_id):
+    """Process upload, marking it failed on unexpected errors."""
+    try:
+        process(upload_id)
+    except Exception:
+        logger.exception('Batch upload %s processing failed', upload_id)
+        BatchUpload.objects.filter(pk=upload_id).update(
+            status=BatchUpload.FAILED, error='Internal processing error'
+        )
+
+
+def process(upload_id):
+    """Validate spooled file and attach it to batch."""
+    updated = BatchUpload.objects.filter(
+        pk=upload_id, status=BatchUpload.PENDING
+    ).update(status=BatchUpload.PROCESSING)
+    if not updated:
+        return
+    upload = BatchUpload.objects.get(pk=upload_id)
+    batch = Batch.objects.select_related('product').get(pk=upload.batch_id)
+    field = Batch._meta.get_field(upload.field)
+    try:
+        with open(upload.spool_path, 'rb') as spooled:
+            file_obj = File(spooled, name=upload.original_name)
+            try:
+                field.run_validators(file_obj)
+            except ValidationError as error:
+                upload.status = BatchUpload.FAILED
+                upload.error = ' '.join(error.messages)
+            else:
+                getattr(batch, upload.field).save(
+                    upload.original_name, file_obj, save=False
+                )
+                batch.save(update_fields=[upload.field])
+                upload.status = BatchUpload.DONE
+    finally:
+        if os.path.exists(upload.spool_path):
+            os.remove(upload.spool_path)
+    upload.spool_path = ''
+    upload.save(update_fields=['status', 'error', 'spool_path', 'updated'])
+
+
+def recover(grace_period=3600):
+    """
+    Process uploads orphaned by a restart and clean the spool directory.
+
+    Uploads processing for longer than grace_period seconds lost their
+    worker and are queued again. Pending uploads are processed in the
+    calling thread, those without spooled file are failed. Spooled files
+    older than grace_period no queued upload refers to are removed.
+    Returns (processed, failed, removed) counts.
+    """
+    now = timezone.now()
+    cutoff = now - datetime.timedelta(seconds=grace_period)
+    BatchUpload.objects.filter(
+        status=BatchUpload.PROCESSING, updated__lt=cutoff
+    ).update(status=BatchUpload.PENDING, updated=now)
+    processed = failed = 0
+    pending = BatchUpload.objects.filter(
+        status=BatchUpload.PENDING
+    ).order_by('pk').values_list('pk', 'spool_path')
+    for upload_id, spool_path in pending:
+        if spool_path and os.path.exists(spool_path):
+            process_or_fail(upload_id)
+            processed += 1
+        else:
+            failed += BatchUpload.objects.filter(
+                pk=upload_id, status=BatchUpload.PENDING
+            ).update(
+                status=BatchUpload.FAILED, error='Spooled file is missing',
+                spool_path='', updated=now
+            )
+    queued = set(BatchUpload.objects.filter(
+        status__in=[BatchUpload.PENDING, BatchUpload.PROCESSING]
+    ).values_list('spool_path', flat=True))
+    removed = 0
+    spool_dir = Path(settings.UPLOAD_SPOOL_DIR)
+    if spool_dir.is_dir():
+        for path in spool_dir.iterdir():
+            if (str(path) in queued
+                    or path.stat().st_mtime > cutoff.timestamp()):
+                continue
+            path.unlink()
+            removed += 1
+    return processed, failed, removed
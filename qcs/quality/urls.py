@@ -4,5 +4,18 @@ from . import views
 app_name = 'quality'
 
 urlpatterns = [
-
+    path('batches/', views.batch_list, name='batch_list'),
+    path('batches/expiry/', views.batch_expiry_report,
+         name='batch_expiry_report'),
+    path('batches/<int:pk>/', views.batch_detail, name='batch_detail'),
+    path('batches/<int:pk>/<str:field>/', views.batch_document,
+         name='batch_document'),
+    path('batches/<int:pk>/<str:field>/preview/', views.batch_preview,
+         name='batch_preview'),
+    path('color-data/', views.color_data_history,
+         name='color_data_history'),
+    path('color-data/export/', views.color_data_export,
+         name='color_data_export'),
+    path('color-data/ingest/', views.color_data_ingest,
+         name='color_data_ingest'),
 ]
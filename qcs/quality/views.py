@@ -1,3 +1,258 @@
-from django.shortcuts import render
+import datetime
+import hashlib
 
-# Create your views here.
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, permission_required
+from django.core.paginator import Paginator
+from django.http import (
+    FileResponse, Http404, JsonResponse, StreamingHttpResponse
+)
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition, require_GET, require_POST
+
+from products import versions
+from products.views import lazy_page, page_query
+
+from . import downloads, expiry, export, previews
+from .forms import (
+    BatchFilterForm, ColorDataExportForm, ColorDataFilterForm
+)
+from .ingestion import IngestionError, ingest_readings, parse_readings
+from .models import Batch, BatchColorSummary, ColorData
+from .pagination import InvalidCursor, keyset_page
+from .tokens import token_auth
+
+
+@token_auth
+@require_POST
+@permission_required('quality.add_colordata', raise_exception=True)
+def color_data_ingest(request):
+    """
+    Bulk color data ingestion (JSON array or CSV with header row).
+
+    Stations authenticate with API token, see quality.tokens.
+    """
+    try:
+        readings = parse_readings(request.body, request.content_type)
+    except IngestionError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    created, errors = ingest_readings(readings)
+    return JsonResponse({
+        'received': len(readings),
+        'created': created,
+        'errors': errors
+    })
+
+
+@require_GET
+@permission_required('quality.view_colordata', raise_exception=True)
+def color_data_history(request):
+    """Color data history, newest first, paged by opaque cursor."""
+    form = ColorDataFilterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse(
+            {'error': f"Invalid {', '.join(form.errors)}"}, status=400
+        )
+    queryset = form.filter(ColorData.objects.values(
+        'id', 'timestamp', 'batch_id', 'batch__number',
+        'batch__product_id', 'batch__product__name', 'category',
+        *ColorData.MEASUREMENT_FIELDS, 'comment'
+    ))
+    try:
+        limit = int(request.GET.get('limit', settings.COLOR_DATA_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    limit = min(limit, settings.COLOR_DATA_MAX_PAGE_SIZE)
+    try:
+        rows, next_cursor = keyset_page(
+            queryset, request.GET.get('cursor'), limit
+        )
+    except InvalidCursor as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = f'{request.path}?{params.urlencode()}'
+    return JsonResponse({'results': rows, 'next': next_url})
+
+
+@require_GET
+@permission_required('quality.view_colordata', raise_exception=True)
+def color_data_export(request):
+    """Color data export streamed as CSV (default) or XLSX."""
+    export_format = request.GET.get('format', export.CSV)
+    form = ColorDataExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse(
+            {'error': f"Invalid {', '.join(form.errors)}"}, status=400
+        )
+    queryset = form.filter(export.export_queryset())
+    try:
+        content = export.stream(export_format, export.export_rows(queryset))
+    except export.ExportError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    response = StreamingHttpResponse(
+        content, content_type=export.CONTENT_TYPES[export_format]
+    )
+    filename = f'color_data_{timezone.localdate():%Y%m%d}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_GET
+@permission_required('quality.view_batch', raise_exception=True)
+def batch_expiry_report(request):
+    """Batches in expiry (or manufacturing) date window by supplier."""
+    field = request.GET.get('field', expiry.EXPIRY)
+    try:
+        days = int(request.GET.get('days', settings.EXPIRY_REPORT_DAYS))
+        start, end = [
+            datetime.date.fromisoformat(request.GET[param])
+            if request.GET.get(param) else None
+            for param in ('from', 'to')
+        ]
+        if start is None and end is None:
+            start, end = expiry.window(days)
+        batches = expiry.batches_in_window(start, end, field=field)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    return JsonResponse({
+        'field': field,
+        'from': start,
+        'to': end,
+        'suppliers': expiry.report(batches),
+    })
+
+
+@login_required
+@permission_required('quality.view_batch', raise_exception=True)
+@condition(etag_func=versions.etag, last_modified_func=versions.last_modified)
+def batch_list(request):
+    """Batch list ordered by expiry date."""
+    template = 'quality/batch_list.html'
+    form = BatchFilterForm(request.GET)
+    batches = form.filter(
+        Batch.objects.select_related('product__supplier').order_by(
+            'exp_date', 'id'
+        )
+    )
+    context = {
+        'form': form,
+        'page': lazy_page(request, batches),
+        'query': page_query(request),
+        'version': versions.get_version()[0],
+        'timeout': settings.BROWSER_CACHE_TIMEOUT,
+    }
+    return render(request, context=context, template_name=template)
+
+
+def batch_version(request, pk):
+    """
+    Return (version, last modified) of batch page.
+
+    Combines catalogue version with batch color summary, which changes
+    with every stored, changed or deleted reading of the batch.
+    """
+    if getattr(request, '_batch_version', None) is None:
+        version, modified = versions.get_version()
+        summary = BatchColorSummary.objects.filter(batch_id=pk).values_list(
+            'count', 'last_timestamp',
+            *[f'sum_{name}' for name in ColorData.MEASUREMENT_FIELDS]
+        ).first()
+        if summary is not None and summary[1] is not None:
+            modified = max(modified, summary[1].replace(microsecond=0))
+        digest = hashlib.md5(f'{version}{summary}'.encode()).hexdigest()
+        request._batch_version = digest, modified
+    return request._batch_version
+
+
+@login_required
+@permission_required('quality.view_batch', raise_exception=True)
+@condition(
+    etag_func=lambda request, pk: batch_version(request, pk)[0],
+    last_modified_func=lambda request, pk: batch_version(request, pk)[1]
+)
+def batch_detail(request, pk):
+    """Batch page with color summary and color data readings."""
+    template = 'quality/batch_detail.html'
+    batch = get_object_or_404(
+        Batch.objects.select_related('product__supplier', 'color_summary'),
+        pk=pk
+    )
+    summary = getattr(batch, 'color_summary', None)
+
+    def get_page():
+        paginator = Paginator(
+            batch.color_data.order_by('-timestamp', '-id'),
+            settings.BROWSER_PAGE_SIZE
+        )
+        # Reading count is maintained in summary, skip COUNT(*) query
+        paginator.count = summary.count if summary else 0
+        return paginator.get_page(request.GET.get('page'))
+
+    documents = []
+    thumbnails = []
+    for field in Batch.DOCUMENT_FIELDS:
+        label = Batch._meta.get_field(field).verbose_name
+        if getattr(batch, field):
+            documents.append((label, reverse(
+                'quality:batch_document', args=[batch.pk, field]
+            )))
+        url = previews.preview_url(batch, field)
+        if url:
+            thumbnails.append((label, url))
+    context = {
+        'batch': batch,
+        'summary': summary,
+        'documents': documents,
+        'previews': thumbnails,
+        'page': SimpleLazyObject(get_page),
+        'version': batch_version(request, pk)[0],
+        'timeout': settings.BROWSER_CACHE_TIMEOUT,
+    }
+    return render(request, context=context, template_name=template)
+
+
+@require_GET
+@permission_required('quality.view_batch', raise_exception=True)
+def batch_preview(request, pk, field):
+    """Thumbnail of batch document, generated and cached on first use."""
+    if field not in Batch.DOCUMENT_FIELDS:
+        raise Http404('Unknown document')
+    name = Batch.objects.filter(pk=pk).values_list(field, flat=True).first()
+    preview = previews.get_preview(name) if name else None
+    if preview is None:
+        raise Http404('No preview available')
+    path, key = preview
+    etag = f'"{key}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FileResponse(open(path, 'rb'),
+                                content_type=previews.CONTENT_TYPE)
+    response['ETag'] = etag
+    if request.GET.get('v') == key[:previews.VERSION_LENGTH]:
+        patch_cache_control(response, private=True, immutable=True,
+                            max_age=settings.PREVIEW_MAX_AGE)
+    else:
+        # Unversioned URL, revalidate with ETag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@require_GET
+@permission_required('quality.view_batch', raise_exception=True)
+def batch_document(request, pk, field):
+    """Batch document download, sent by front-end server if configured."""
+    if field not in Batch.DOCUMENT_FIELDS:
+        raise Http404('Unknown document')
+    name = Batch.objects.filter(pk=pk).values_list(field, flat=True).first()
+    if not name:
+        raise Http404('No document')
+    return downloads.serve(request, name)